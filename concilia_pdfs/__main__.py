@@ -5,13 +5,19 @@ from pathlib import Path
 import sys
 import os
 import getpass
+import time
+from decimal import Decimal
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from concilia_pdfs.parsers.btg_parser import parse_btg_pdf
-from concilia_pdfs.parsers.organize_parser import parse_organize_pdf
-from concilia_pdfs.core.reconciliation import reconcile_transactions
-from concilia_pdfs.reporting.excel_writer import generate_excel_report
+from concilia_pdfs.cli_types import tolerance_brl, tolerance_rel
+from concilia_pdfs.core.engines import ENGINES
+from concilia_pdfs.core.records import to_cents
+from concilia_pdfs.reporting.sinks import DEFAULT_FORMATS, FORMATS, check_formats
+from concilia_pdfs.utils.memory import MEMORY
+from concilia_pdfs.utils.metrics import METRICS
+from concilia_pdfs.utils.parse_cache import DEFAULT_MAX_BYTES, ParseCache, default_cache_dir
+from concilia_pdfs.utils.pdf_backends import BACKEND_CHOICES, DEFAULT_BACKEND, resolve_backend
 
 
 def _resolve_pdf_password(args) -> str | None:
@@ -27,6 +33,17 @@ def _resolve_pdf_password(args) -> str | None:
         return None
 
 
+def _dump_profile(profiler, path: Path, top: int = 25) -> None:
+    import io
+    import pstats
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(str(path))
+    buf = io.StringIO()
+    pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(top)
+    logging.info(f"Perfil (cProfile) gravado em {path}; {top} funções por tempo acumulado:\n{buf.getvalue()}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Reconcilia extratos BTG x Organize.")
     parser.add_argument("--pdf_password", type=str, default=None)
@@ -34,13 +51,112 @@ def main():
     parser.add_argument("--organize_dir", type=str, required=True)
     parser.add_argument("--out", type=str, required=True)
     parser.add_argument("--debug", action="store_true")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processos para extrair as páginas do PDF do BTG em paralelo (1 = serial).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processos para ler os PDFs do Organize enquanto o BTG é lido (1 = um arquivo por vez).",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="python",
+        help="Motor de conciliação: python (padrão) ou numpy (colunar, para volumes grandes).",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=tolerance_brl,
+        default=Decimal("0"),
+        help="Tolerância absoluta de valor em R$ (ex.: 0.05). Padrão 0 = só valor exato.",
+    )
+    parser.add_argument(
+        "--tolerance-rel",
+        type=tolerance_rel,
+        default=0.0,
+        help="Tolerância relativa ao valor do BTG (ex.: 0.005 = 0,5%%). Padrão 0.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Guarda o estado da conciliação e, nas próximas execuções, só concilia o que mudou no Organize.",
+    )
+    parser.add_argument(
+        "--state-dir",
+        type=str,
+        default=None,
+        help="Diretório do estado incremental (padrão: <diretório do cache>/estado).",
+    )
+    parser.add_argument(
+        "--pdf-backend",
+        choices=BACKEND_CHOICES,
+        default=DEFAULT_BACKEND,
+        help="Extrator de PDF: pdfplumber (padrão), pdfminer (direto, mais rápido), pymupdf (se instalado) "
+        "ou auto (o mais rápido instalado).",
+    )
+    parser.add_argument(
+        "--max-memory-mb",
+        type=int,
+        default=None,
+        help="Teto de memória (RSS) da leitura dos PDFs; acima dele avisa e passa a esvaziar o cache "
+        "de objetos do PDF a cada página (mais lento, memória plana). Padrão: sem teto.",
+    )
+    parser.add_argument(
+        "--format",
+        dest="formats",
+        action="append",
+        choices=FORMATS,
+        default=None,
+        help="Formato do relatório; repita para gerar vários (ex.: --format xlsx --format csv). Padrão: xlsx.",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        default=None,
+        help="Grava tempos por etapa (página/cartão) e contadores em JSON neste arquivo.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        help="Roda sob cProfile e grava as estatísticas (padrão: <out>/perfil.prof). Só o processo principal.",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Não lê nem grava o cache de transações extraídas.")
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Diretório do cache (padrão: $CONCILIA_CACHE_DIR ou ~/.cache/concilia_pdfs).",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Tamanho máximo do cache; os itens usados há mais tempo são removidos.",
+    )
     args = parser.parse_args()
 
+    formats = tuple(dict.fromkeys(args.formats or DEFAULT_FORMATS))
+    try:
+        check_formats(formats)
+        pdf_backend = resolve_backend(args.pdf_backend)
+    except ValueError as e:
+        parser.error(str(e))
+
     log_level = logging.DEBUG if args.debug else logging.INFO
     logging.basicConfig(level=log_level, format="%(asctime)s - %(levelname)s - %(message)s")
 
     logging.info("--- Iniciando Processo de Reconciliação ---")
 
+    # pipeline (parsers, relatórios) só depois do argparse: --help e erro de argumento saem na hora
+    from concilia_pdfs.core.pipeline import run_pipeline
+
     pdf_password = _resolve_pdf_password(args)
 
     btg_file = Path(args.btg)
@@ -48,45 +164,67 @@ def main():
         logging.error(f"Arquivo BTG não encontrado: {btg_file}")
         return
 
-    all_btg_txs = list(parse_btg_pdf(str(btg_file), pdf_password=pdf_password))
-    logging.info(f"BTG carregado: {len(all_btg_txs)} transações")
-
     organize_dir = Path(args.organize_dir)
     if not organize_dir.is_dir():
         logging.error(f"Diretório do Organize não encontrado: {organize_dir}")
         return
 
-    # BTG por cartão
-    btg_by_card = {}
-    for tx in all_btg_txs:
-        btg_by_card.setdefault(tx.card_final, []).append(tx)
-
-    reconciliation_results_all = {}
-
-    for card_final in sorted(btg_by_card.keys()):
-        candidate_a = organize_dir / f"{card_final}.pdf"
-        candidate_b = organize_dir / f"final_{card_final}.pdf"
-
-        org_file = candidate_a if candidate_a.is_file() else (candidate_b if candidate_b.is_file() else None)
-
-        if not org_file:
-            logging.warning(
-                f"[SKIP] Cartão {card_final}: PDF do Organize não encontrado "
-                f"(esperado {candidate_a.name} ou {candidate_b.name}). NÃO vou gerar diferenças para este cartão."
-            )
-            continue
-
-        org_txs = list(parse_organize_pdf(str(org_file), pdf_password=pdf_password))
-        logging.info(f"[Organize] Cartão {card_final}: {len(org_txs)} transações (arquivo={org_file.name})")
-
-        # concilia SOMENTE este cartão
-        btg_txs = btg_by_card[card_final]
-        rec_one = reconcile_transactions(btg_txs, org_txs)
-        # reconcile_transactions retorna dict; pegamos a chave do próprio cartão
-        if card_final in rec_one:
-            reconciliation_results_all[card_final] = rec_one[card_final]
-
-    generate_excel_report(reconciliation_results_all, all_btg_txs, [], args.out)
+    cache = None
+    if not args.no_cache:
+        cache_dir = Path(args.cache_dir) if args.cache_dir else default_cache_dir()
+        cache = ParseCache(cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+
+    state_dir = None
+    if args.incremental:
+        state_dir = Path(args.state_dir) if args.state_dir else default_cache_dir() / "estado"
+
+    MEMORY.configure(args.max_memory_mb)
+    if args.metrics:
+        METRICS.reset(enabled=True)
+    profiler = None
+    if args.profile is not None:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        # processos do pool nascem por fork com o profiler ligado: desliga neles (só custaria tempo)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=profiler.disable)
+        profiler.enable()
+
+    start = time.perf_counter()
+    try:
+        results = run_pipeline(
+            btg_file,
+            organize_dir,
+            args.out,
+            pdf_password=pdf_password,
+            workers=args.workers,
+            jobs=args.jobs,
+            cache=cache,
+            engine=args.engine,
+            tolerance_cents=to_cents(args.tolerance),
+            tolerance_rel=args.tolerance_rel,
+            state_dir=state_dir,
+            formats=formats,
+            pdf_backend=pdf_backend,
+        )
+    finally:
+        elapsed = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            _dump_profile(profiler, Path(args.profile) if args.profile else Path(args.out) / "perfil.prof")
+
+    if args.metrics:
+        path = METRICS.write(
+            args.metrics,
+            total_s=round(elapsed, 6),
+            btg=str(btg_file),
+            cards=len(results),
+            workers=args.workers,
+            jobs=args.jobs,
+            engine=args.engine,
+        )
+        logging.info(f"Métricas gravadas em {path}")
 
     logging.info("--- Processo Finalizado ---")
 
@@ -0,0 +1,354 @@
+# concilia_pdfs/batch.py
+"""
+Modo em lote: vários extratos (famílias x meses) numa única execução.
+
+    python -m concilia_pdfs.batch --root ./familias --out ./saidas --jobs 8
+    python -m concilia_pdfs.batch --manifest lote.json --out ./saidas --timeout 600 --retries 1
+
+Cada job (PDF do BTG, pasta do Organize, pasta de saída) roda no pool de processos
+compartilhado; os módulos pesados (pdfplumber, rapidfuzz, openpyxl) são importados uma
+vez por worker. Falha ou timeout de um job não afeta os outros. No fim sai um resumo JSON.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+ORGANIZE_DIR_NAMES = ("organize_pdfs", "organize")
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+STATUS_OK = "ok"
+STATUS_ERROR = "erro"
+STATUS_TIMEOUT = "timeout"
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    name: str
+    btg: str
+    organize_dir: str
+    out: str
+
+
+class JobTimeout(BaseException):
+    """
+    Estoura quando o job passa do tempo. É BaseException de propósito: o pipeline
+    captura `Exception` por arquivo e não pode engolir o timeout.
+    """
+
+
+@contextmanager
+def _alarm(seconds: Optional[int]) -> Iterator[None]:
+    """Timeout por job via SIGALRM (só Unix; em outras plataformas o job roda sem limite)."""
+    if not seconds or not hasattr(signal, "SIGALRM"):
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise JobTimeout(f"job passou de {seconds}s")
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.alarm(seconds)
+    try:
+        yield
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _find_btg_pdf(job_dir: Path) -> Optional[Path]:
+    pdfs = sorted(job_dir.glob("*.pdf"))
+    return pdfs[0] if len(pdfs) == 1 else None
+
+
+def discover_jobs(root: Path, out_root: Path) -> List[BatchJob]:
+    """
+    Procura jobs numa árvore de diretórios: cada pasta com uma subpasta `organize_pdfs/`
+    (ou `organize/`) e exatamente um PDF solto (o do BTG) é um job.
+    A saída espelha o caminho relativo dentro de `out_root`.
+    """
+    jobs: List[BatchJob] = []
+    for org_dir in sorted(p for name in ORGANIZE_DIR_NAMES for p in root.rglob(name) if p.is_dir()):
+        job_dir = org_dir.parent
+        btg = _find_btg_pdf(job_dir)
+        if btg is None:
+            logging.warning(f"[lote] {job_dir}: esperado exatamente 1 PDF do BTG ao lado de {org_dir.name}/. Ignorando.")
+            continue
+        rel = job_dir.relative_to(root)
+        name = rel.as_posix() if rel.parts else job_dir.name
+        jobs.append(BatchJob(name=name, btg=str(btg), organize_dir=str(org_dir), out=str(out_root / rel)))
+    return jobs
+
+
+def load_manifest(path: Path, out_root: Path) -> List[BatchJob]:
+    """
+    Manifesto JSON: lista de objetos {"btg", "organize_dir", "out"?, "name"?}.
+    Caminhos relativos são resolvidos a partir da pasta do manifesto;
+    sem "out", a saída vai para `out_root/<name>`.
+    O nome identifica o job no resumo, na saída e no estado incremental: repetido -> ValueError.
+    """
+    base = path.parent
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    jobs: List[BatchJob] = []
+    positions: Dict[str, List[int]] = {}
+    for i, entry in enumerate(entries):
+        btg = base / entry["btg"]
+        name = entry.get("name") or f"{i:03d}_{btg.stem}"
+        out = base / entry["out"] if entry.get("out") else out_root / name
+        jobs.append(BatchJob(name=name, btg=str(btg), organize_dir=str(base / entry["organize_dir"]), out=str(out)))
+        positions.setdefault(name, []).append(i)
+    repeated = {name: pos for name, pos in positions.items() if len(pos) > 1}
+    if repeated:
+        detail = "; ".join(f"{name!r} nas entradas {', '.join(map(str, pos))}" for name, pos in repeated.items())
+        raise ValueError(f"manifesto {path}: nome de job repetido ({detail})")
+    return jobs
+
+
+def _init_worker(log_level: int) -> None:
+    """Roda uma vez por processo do pool: logging e imports pesados."""
+    logging.basicConfig(level=log_level, format=LOG_FORMAT)
+    # o pipeline importa pdfplumber/openpyxl sob demanda; no lote cada worker já carrega tudo uma vez
+    import openpyxl  # noqa: F401
+    import pdfplumber  # noqa: F401
+    import rapidfuzz.fuzz  # noqa: F401
+
+    import concilia_pdfs.core.pipeline  # noqa: F401
+
+
+def _run_job(job: BatchJob, settings: Dict[str, Any], timeout: Optional[int]) -> Dict[str, Any]:
+    """Executa um job no worker. Nunca levanta: o status vai no dicionário."""
+    from concilia_pdfs.core.pipeline import run_pipeline
+    from concilia_pdfs.utils.memory import MEMORY
+    from concilia_pdfs.utils.parse_cache import DEFAULT_MAX_BYTES, ParseCache
+
+    start = time.perf_counter()
+    MEMORY.configure(settings.get("max_memory_mb"))
+    cache = None
+    if settings.get("cache_dir"):
+        cache = ParseCache(Path(settings["cache_dir"]), max_bytes=settings.get("cache_max_bytes", DEFAULT_MAX_BYTES))
+    state_dir = Path(settings["state_dir"]) / job.name if settings.get("state_dir") else None
+
+    try:
+        if not Path(job.btg).is_file():
+            raise FileNotFoundError(f"Arquivo BTG não encontrado: {job.btg}")
+        if not Path(job.organize_dir).is_dir():
+            raise FileNotFoundError(f"Diretório do Organize não encontrado: {job.organize_dir}")
+        with _alarm(timeout):
+            results = run_pipeline(
+                Path(job.btg),
+                Path(job.organize_dir),
+                job.out,
+                pdf_password=settings.get("pdf_password"),
+                workers=1,
+                jobs=1,
+                cache=cache,
+                engine=settings.get("engine", "python"),
+                tolerance_cents=settings.get("tolerance_cents", 0),
+                tolerance_rel=settings.get("tolerance_rel", 0.0),
+                state_dir=state_dir,
+                strict=True,
+                formats=settings.get("formats", ["xlsx"]),
+                pdf_backend=settings.get("pdf_backend", "pdfplumber"),
+            )
+    except JobTimeout as e:
+        return {"status": STATUS_TIMEOUT, "error": str(e), "seconds": round(time.perf_counter() - start, 3)}
+    except Exception as e:
+        return {
+            "status": STATUS_ERROR,
+            "error": f"{type(e).__name__}: {e}",
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+    return {
+        "status": STATUS_OK,
+        "seconds": round(time.perf_counter() - start, 3),
+        "cards": len(results),
+        "incluir": sum(len(r.missing_in_organize) for r in results.values()),
+        "excluir": sum(len(r.extra_in_organize) for r in results.values()),
+    }
+
+
+def run_batch(
+    jobs: List[BatchJob],
+    settings: Dict[str, Any],
+    max_workers: int = 1,
+    timeout: Optional[int] = None,
+    retries: int = 0,
+    log_level: int = logging.INFO,
+) -> Dict[str, Any]:
+    """
+    Roda os jobs num pool compartilhado e devolve o resumo.
+    Job com erro/timeout é reenviado até `retries` vezes. Se um worker morrer
+    (o pool quebra), o pool é recriado e os jobs em andamento contam como tentativa.
+    """
+    start = time.perf_counter()
+    attempts: Dict[str, int] = {job.name: 0 for job in jobs}
+    outcomes: Dict[str, Dict[str, Any]] = {}
+
+    def new_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(log_level,))
+
+    pool = new_pool()
+    futures: Dict[Future, BatchJob] = {}
+    try:
+        for job in jobs:
+            futures[pool.submit(_run_job, job, settings, timeout)] = job
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            broken = False
+            retry: List[BatchJob] = []
+
+            for fut in done:
+                job = futures.pop(fut)
+                attempts[job.name] += 1
+                try:
+                    outcome = fut.result()
+                except BrokenProcessPool:
+                    broken = True
+                    outcome = {"status": STATUS_ERROR, "error": "processo do worker morreu"}
+                except Exception as e:
+                    outcome = {"status": STATUS_ERROR, "error": f"{type(e).__name__}: {e}"}
+
+                outcomes[job.name] = outcome
+                if outcome["status"] == STATUS_OK:
+                    logging.info(f"[lote] {job.name}: ok ({outcome['seconds']}s, {outcome['cards']} cartões)")
+                elif attempts[job.name] <= retries:
+                    logging.warning(f"[lote] {job.name}: {outcome['status']} ({outcome['error']}); tentando de novo")
+                    retry.append(job)
+                else:
+                    logging.error(f"[lote] {job.name}: {outcome['status']} ({outcome['error']})")
+
+            if broken:
+                # os demais futures do pool quebrado também vão falhar; contam como tentativa
+                for fut, job in list(futures.items()):
+                    futures.pop(fut)
+                    attempts[job.name] += 1
+                    if attempts[job.name] <= retries:
+                        retry.append(job)
+                    else:
+                        outcomes[job.name] = {"status": STATUS_ERROR, "error": "processo do worker morreu"}
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = new_pool()
+
+            for job in retry:
+                futures[pool.submit(_run_job, job, settings, timeout)] = job
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    summary_jobs = [{**asdict(job), "attempts": attempts[job.name], **outcomes[job.name]} for job in jobs]
+    return {
+        "total": len(jobs),
+        "ok": sum(1 for j in summary_jobs if j["status"] == STATUS_OK),
+        "failed": sum(1 for j in summary_jobs if j["status"] != STATUS_OK),
+        "seconds": round(time.perf_counter() - start, 3),
+        "jobs": summary_jobs,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from concilia_pdfs.cli_types import tolerance_brl, tolerance_rel
+    from concilia_pdfs.core.engines import ENGINES
+    from concilia_pdfs.reporting.sinks import DEFAULT_FORMATS, FORMATS, check_formats
+    from concilia_pdfs.utils.parse_cache import DEFAULT_MAX_BYTES, default_cache_dir
+    from concilia_pdfs.utils.pdf_backends import BACKEND_CHOICES, DEFAULT_BACKEND, resolve_backend
+
+    parser = argparse.ArgumentParser(description="Reconcilia vários extratos BTG x Organize de uma vez.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--manifest", type=str, help="JSON com a lista de jobs {btg, organize_dir, out?, name?}.")
+    source.add_argument("--root", type=str, help="Árvore de pastas; cada pasta com organize_pdfs/ + 1 PDF é um job.")
+    parser.add_argument("--out", type=str, required=True, help="Pasta base das saídas.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Processos do pool (padrão: nº de CPUs).")
+    parser.add_argument("--timeout", type=int, default=None, help="Tempo máximo por job, em segundos (Unix).")
+    parser.add_argument("--retries", type=int, default=0, help="Novas tentativas para job com erro/timeout.")
+    parser.add_argument("--summary", type=str, default=None, help="Arquivo do resumo JSON (padrão: <out>/resumo_lote.json).")
+    parser.add_argument("--pdf_password", type=str, default=None)
+    parser.add_argument("--engine", choices=ENGINES, default="python")
+    parser.add_argument("--tolerance", type=tolerance_brl, default=Decimal("0"))
+    parser.add_argument("--tolerance-rel", type=tolerance_rel, default=0.0)
+    parser.add_argument("--format", dest="formats", action="append", choices=FORMATS, default=None)
+    parser.add_argument("--pdf-backend", choices=BACKEND_CHOICES, default=DEFAULT_BACKEND)
+    parser.add_argument("--max-memory-mb", type=int, default=None, help="Teto de memória por processo na leitura dos PDFs.")
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--state-dir", type=str, default=None)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--cache-dir", type=str, default=None)
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Tamanho máximo do cache em MB (padrão: %(default)s).",
+    )
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args(argv)
+    formats = tuple(dict.fromkeys(args.formats or DEFAULT_FORMATS))
+    try:
+        check_formats(formats)
+        pdf_backend = resolve_backend(args.pdf_backend)
+    except ValueError as e:
+        parser.error(str(e))
+
+    log_level = logging.DEBUG if args.debug else logging.INFO
+    logging.basicConfig(level=log_level, format=LOG_FORMAT)
+
+    from concilia_pdfs.core.records import to_cents
+
+    out_root = Path(args.out)
+    if args.manifest:
+        try:
+            jobs = load_manifest(Path(args.manifest), out_root)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        jobs = discover_jobs(Path(args.root), out_root)
+    if not jobs:
+        logging.error("[lote] Nenhum job encontrado.")
+        return 1
+
+    settings: Dict[str, Any] = {
+        # sem prompt interativo no lote: senha por argumento ou variável de ambiente
+        "pdf_password": args.pdf_password or os.getenv("CONCILIA_PDF_PASSWORD"),
+        "engine": args.engine,
+        "tolerance_cents": to_cents(args.tolerance),
+        "tolerance_rel": args.tolerance_rel,
+        "formats": list(formats),
+        "pdf_backend": pdf_backend,
+        "max_memory_mb": args.max_memory_mb,
+        "cache_dir": None if args.no_cache else str(Path(args.cache_dir) if args.cache_dir else default_cache_dir()),
+        "cache_max_bytes": args.cache_max_mb * 1024 * 1024,
+        "state_dir": None,
+    }
+    if args.incremental:
+        settings["state_dir"] = str(Path(args.state_dir) if args.state_dir else default_cache_dir() / "estado")
+
+    logging.info(f"[lote] {len(jobs)} jobs, {args.jobs} processos")
+    summary = run_batch(
+        jobs,
+        settings,
+        max_workers=max(1, min(args.jobs, len(jobs))),
+        timeout=args.timeout,
+        retries=args.retries,
+        log_level=log_level,
+    )
+
+    summary_path = Path(args.summary) if args.summary else out_root / "resumo_lote.json"
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+    logging.info(f"[lote] {summary['ok']}/{summary['total']} ok em {summary['seconds']}s. Resumo: {summary_path}")
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+# concilia_pdfs/bench/__main__.py
+import sys
+
+from concilia_pdfs.bench.runner import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# concilia_pdfs/bench/pdfgen.py
+"""
+Escritor mínimo de PDF (texto Helvetica/WinAnsi + linhas), sem dependências.
+
+Só o necessário para os extratos sintéticos: o pdfplumber lê o texto com posição
+e as linhas da tabela do Organize (extract_tables). Texto pode ir para um Form XObject
+da página (`form=True`), como fazem alguns geradores de PDF.
+"""
+from __future__ import annotations
+
+from typing import List
+
+PAGE_WIDTH = 595.0
+PAGE_HEIGHT = 842.0
+
+
+def _escape(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+class PdfCanvas:
+    """Páginas A4 com texto e linhas; coordenadas `top` medidas do topo, como no pdfplumber."""
+
+    def __init__(self, width: float = PAGE_WIDTH, height: float = PAGE_HEIGHT):
+        self.width = width
+        self.height = height
+        self._pages: List[List[bytes]] = []
+        self._forms: List[List[bytes]] = []
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    def new_page(self) -> None:
+        self._pages.append([])
+        self._forms.append([])
+
+    def _ops(self, form: bool = False) -> List[bytes]:
+        if not self._pages:
+            self.new_page()
+        return self._forms[-1] if form else self._pages[-1]
+
+    def text(self, x: float, top: float, text: str, size: float = 9.0, form: bool = False) -> None:
+        """form=True: o texto vai para o Form XObject da página (desenhado no fim do conteúdo)."""
+        y = self.height - top - size
+        self._ops(form).append(
+            b"BT /F1 %s Tf %.2f %.2f Td (%s) Tj ET" % (str(size).encode(), x, y, _escape(text))
+        )
+
+    def line(self, x0: float, top0: float, x1: float, top1: float) -> None:
+        self._ops().append(
+            b"%.2f %.2f m %.2f %.2f l S" % (x0, self.height - top0, x1, self.height - top1)
+        )
+
+    def to_bytes(self) -> bytes:
+        if not self._pages:
+            self.new_page()
+        n_pages = len(self._pages)
+        # 1 catalog, 2 pages, 3 font, depois (page, content) por página e os Form XObjects no fim
+        objects: List[bytes] = []
+        forms: List[bytes] = []
+        kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(n_pages)).encode()
+        objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+        objects.append(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, n_pages))
+        objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        for i, (ops, form_ops) in enumerate(zip(self._pages, self._forms)):
+            content_id = 5 + 2 * i
+            xobjects = b""
+            if form_ops:
+                form_id = 4 + 2 * n_pages + len(forms)
+                xobjects = b" /XObject << /Fm0 %d 0 R >>" % form_id
+                ops = ops + [b"q /Fm0 Do Q"]
+                form_stream = b"\n".join(form_ops)
+                forms.append(
+                    b"<< /Type /XObject /Subtype /Form /BBox [0 0 %.0f %.0f] "
+                    b"/Resources << /Font << /F1 3 0 R >> >> /Length %d >>\nstream\n%s\nendstream"
+                    % (self.width, self.height, len(form_stream), form_stream)
+                )
+            objects.append(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.0f %.0f] "
+                b"/Resources << /Font << /F1 3 0 R >>%s >> /Contents %d 0 R >>"
+                % (self.width, self.height, xobjects, content_id)
+            )
+            stream = b"\n".join(ops)
+            objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.extend(forms)
+
+        out = bytearray(b"%PDF-1.4\n")
+        offsets = []
+        for num, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (num, body)
+        xref_at = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        for off in offsets:
+            out += b"%010d 00000 n \n" % off
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_at)
+        return bytes(out)
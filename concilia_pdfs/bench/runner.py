@@ -0,0 +1,213 @@
+# concilia_pdfs/bench/runner.py
+"""
+Benchmark com extratos sintéticos (nenhum dado real, nenhuma rede).
+
+    python -m concilia_pdfs.bench --cards 5 --tx 400 --repeat 3 --out bench.json
+    python -m concilia_pdfs.bench --cards 5 --tx 400 --compare bench.json
+
+Mede separadamente parse_btg_pdf, parse_organize_pdf, reconcile_transactions e
+generate_excel_report, e o pipeline completo (run_pipeline, sem cache). Cada etapa
+roda `repeat` vezes; o JSON guarda min/mediana/todas as medidas, o tamanho do
+conjunto e o commit, para comparar entre commits.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from concilia_pdfs.bench.synthetic import ORGANIZE_LAYOUTS, generate_dataset, write_dataset
+from concilia_pdfs.utils.pdf_backends import BACKEND_CHOICES, DEFAULT_BACKEND
+
+BENCH_FORMAT_VERSION = 1
+STAGES = (
+    "parse_btg_pdf",
+    "parse_organize_pdf",
+    "reconcile_transactions",
+    "generate_excel_report",
+    "end_to_end",
+)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _timed(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    runs: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {
+        "min": round(min(runs), 6),
+        "median": round(statistics.median(runs), 6),
+        "runs": [round(r, 6) for r in runs],
+    }
+
+
+def run_benchmark(
+    workdir: Path,
+    cards: int = 3,
+    tx_per_card: int = 200,
+    seed: int = 0,
+    layout: str = "table",
+    repeat: int = 3,
+    workers: int = 1,
+    jobs: int = 1,
+    pdf_backend: str = DEFAULT_BACKEND,
+) -> Dict[str, Any]:
+    """Gera o conjunto em `workdir`, mede cada etapa e devolve o resultado (pronto para JSON)."""
+    from concilia_pdfs.core.pipeline import run_pipeline
+    from concilia_pdfs.core.reconciliation import reconcile_transactions
+    from concilia_pdfs.parsers.btg_parser import parse_btg_pdf
+    from concilia_pdfs.parsers.organize_parser import parse_organize_pdf
+    from concilia_pdfs.reporting.excel_writer import generate_excel_report
+
+    ds = generate_dataset(n_cards=cards, tx_per_card=tx_per_card, seed=seed)
+    btg_path, org_dir = write_dataset(ds, workdir / "dados", organize_layout=layout)
+    org_files = sorted(org_dir.glob("*.pdf"))
+
+    btg_txs = list(parse_btg_pdf(str(btg_path), workers=workers, backend=pdf_backend))
+    org_txs = [tx for f in org_files for tx in parse_organize_pdf(str(f), backend=pdf_backend)]
+    results = reconcile_transactions(btg_txs, org_txs)
+
+    timings = {
+        "parse_btg_pdf": _timed(
+            lambda: list(parse_btg_pdf(str(btg_path), workers=workers, backend=pdf_backend)), repeat
+        ),
+        "parse_organize_pdf": _timed(
+            lambda: [tx for f in org_files for tx in parse_organize_pdf(str(f), backend=pdf_backend)], repeat
+        ),
+        "reconcile_transactions": _timed(lambda: reconcile_transactions(btg_txs, org_txs), repeat),
+        "generate_excel_report": _timed(
+            lambda: generate_excel_report(results, btg_txs, org_txs, str(workdir / "saida_relatorio")), repeat
+        ),
+        "end_to_end": _timed(
+            lambda: run_pipeline(
+                btg_path, org_dir, str(workdir / "saida_pipeline"), workers=workers, jobs=jobs, pdf_backend=pdf_backend
+            ),
+            repeat,
+        ),
+    }
+
+    return {
+        "version": BENCH_FORMAT_VERSION,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "cards": cards,
+            "tx_per_card": tx_per_card,
+            "seed": seed,
+            "layout": layout,
+            "repeat": repeat,
+            "workers": workers,
+            "jobs": jobs,
+            "pdf_backend": pdf_backend,
+        },
+        "counts": {
+            "btg_transactions": len(btg_txs),
+            "organize_transactions": len(org_txs),
+            "btg_pages": btg_path.read_bytes().count(b"/Type /Page "),
+            "reports": sum(1 for r in results.values() if r.missing_in_organize or r.extra_in_organize),
+        },
+        "timings": timings,
+    }
+
+
+def format_report(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Tabela de texto por etapa; com baseline, mostra também a razão atual/baseline das medianas."""
+    lines = [f"{'etapa':<24}{'min (s)':>10}{'mediana (s)':>13}" + (f"{'x base':>10}" if baseline else "")]
+    for stage in STAGES:
+        t = result["timings"][stage]
+        line = f"{stage:<24}{t['min']:>10.3f}{t['median']:>13.3f}"
+        if baseline:
+            base = baseline.get("timings", {}).get(stage)
+            line += f"{t['median'] / base['median']:>10.2f}" if base and base["median"] else f"{'-':>10}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do concilia_pdfs com extratos sintéticos.")
+    parser.add_argument("--cards", type=int, default=3, help="Cartões no BTG (um PDF do Organize por cartão).")
+    parser.add_argument("--tx", type=int, default=200, help="Lançamentos por cartão.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--layout", choices=ORGANIZE_LAYOUTS, default="table", help="Layout dos PDFs do Organize.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições de cada etapa.")
+    parser.add_argument("--workers", type=int, default=1, help="Repassado ao parser do BTG e ao pipeline.")
+    parser.add_argument("--jobs", type=int, default=1, help="Repassado ao pipeline (end_to_end).")
+    parser.add_argument(
+        "--pdf-backend",
+        choices=BACKEND_CHOICES,
+        default=DEFAULT_BACKEND,
+        help="Extrator de PDF dos parsers e do pipeline.",
+    )
+    parser.add_argument("--workdir", type=str, default=None, help="Mantém os PDFs e saídas aqui (padrão: temporário).")
+    parser.add_argument("--out", type=str, default=None, help="Grava o resultado em JSON.")
+    parser.add_argument("--compare", type=str, default=None, help="JSON de uma execução anterior para comparar.")
+    parser.add_argument("--debug", action="store_true", help="Mostra os logs do pipeline.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    params = dict(
+        cards=args.cards,
+        tx_per_card=args.tx,
+        seed=args.seed,
+        layout=args.layout,
+        repeat=max(1, args.repeat),
+        workers=args.workers,
+        jobs=args.jobs,
+        pdf_backend=args.pdf_backend,
+    )
+    if args.workdir:
+        workdir = Path(args.workdir)
+        workdir.mkdir(parents=True, exist_ok=True)
+        result = run_benchmark(workdir, **params)
+    else:
+        with tempfile.TemporaryDirectory(prefix="concilia_bench_") as tmp:
+            result = run_benchmark(Path(tmp), **params)
+
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else None
+    counts = result["counts"]
+    print(
+        f"BTG: {counts['btg_transactions']} transações em {counts['btg_pages']} páginas, "
+        f"Organize: {counts['organize_transactions']}, commit {result['commit'] or '?'}"
+    )
+    print(format_report(result, baseline))
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Resultado: {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+# concilia_pdfs/bench/synthetic.py
+"""
+Extratos sintéticos (BTG com vários cartões e Organize por cartão), gerados offline.
+
+O BTG sai em duas colunas, com seções "Final NNNN", estornos (crédito) e blocos de
+compra internacional (moeda, cotação, conversão). O Organize sai em tabela (com
+bordas) ou texto corrido. O `SyntheticDataset` guarda a verdade: o que o parser deve ler.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from concilia_pdfs.bench.pdfgen import PdfCanvas
+
+MONTH_ABBR = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
+MONTH_NAME = [
+    "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+    "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro",
+]
+
+MERCHANTS = [
+    "UBER TRIP", "IFOOD *RESTAURANTE", "PADARIA SÃO JOÃO", "POSTO IPIRANGA", "NETFLIX.COM",
+    "SPOTIFY", "DROGARIA SÃO PAULO", "AÇAÍ DA PRAÇA", "MERCADO LIVRE", "AMAZON BR",
+    "PEDÁGIO SEM PARAR", "CAFÉ DO PONTO", "LOJAS AMERICANAS", "RAPPI*MERCADO", "ESTAC. CENTRAL",
+    "FARMÁCIA PACHECO", "CINEMARK", "LIVRARIA CULTURA", "ZARA BRASIL", "OMERCADEIRO",
+]
+ORGANIZE_LAYOUTS = ("table", "text")
+FOREIGN = [("USD", "5,12"), ("EUR", "5,61"), ("PEN", "1,70")]
+LEFT_X = 40.0
+RIGHT_X = 310.0
+ROW_HEIGHT = 14.0
+FIRST_ROW_TOP = 80.0
+LAST_ROW_TOP = 790.0
+
+
+def format_brl(value: Decimal) -> str:
+    """Decimal -> "1.234,56" (sem R$)."""
+    sign = "-" if value < 0 else ""
+    cents = int(abs(value) * 100)
+    inteiro, frac = divmod(cents, 100)
+    return f"{sign}{inteiro:,}".replace(",", ".") + f",{frac:02d}"
+
+
+@dataclass
+class SyntheticTx:
+    card_final: str
+    day: int
+    month: int
+    year: int
+    description: str
+    amount: Decimal
+    foreign_currency: Optional[str] = None
+    foreign_amount: Optional[Decimal] = None
+    fx_rate: Optional[str] = None
+
+
+@dataclass
+class SyntheticDataset:
+    year: int
+    month: int
+    btg: Dict[str, List[SyntheticTx]] = field(default_factory=dict)
+    organize: Dict[str, List[SyntheticTx]] = field(default_factory=dict)
+
+
+def generate_dataset(
+    n_cards: int = 3,
+    tx_per_card: int = 40,
+    year: int = 2026,
+    month: int = 2,
+    seed: int = 0,
+    credit_ratio: float = 0.05,
+    international_ratio: float = 0.05,
+    missing_ratio: float = 0.05,
+    extra_ratio: float = 0.05,
+) -> SyntheticDataset:
+    """
+    Mesma semente -> mesmo conjunto. Cada cartão tem `tx_per_card` lançamentos no BTG;
+    o Organize copia o BTG, perde `missing_ratio` deles e ganha `extra_ratio` avulsos.
+    """
+    rng = random.Random(seed)
+    ds = SyntheticDataset(year=year, month=month)
+    finals = sorted({f"{rng.randrange(1000, 10000)}" for _ in range(n_cards * 3)})[:n_cards]
+    for card in finals:
+        btg: List[SyntheticTx] = []
+        for _ in range(tx_per_card):
+            day = rng.randint(1, 28)
+            desc = rng.choice(MERCHANTS)
+            amount = Decimal(rng.randint(100, 250000)) / 100
+            r = rng.random()
+            if r < international_ratio:
+                cur, rate = rng.choice(FOREIGN)
+                famt = (amount / Decimal(rate.replace(",", "."))).quantize(Decimal("0.01"))
+                btg.append(SyntheticTx(card, day, month, year, desc, amount, cur, famt, rate))
+            elif r < international_ratio + credit_ratio:
+                btg.append(SyntheticTx(card, day, month, year, f"ESTORNO {desc}", -amount))
+            else:
+                btg.append(SyntheticTx(card, day, month, year, desc, amount))
+        org = [t for t in btg if rng.random() >= missing_ratio]
+        for _ in range(int(tx_per_card * extra_ratio)):
+            org.insert(
+                rng.randrange(len(org) + 1),
+                SyntheticTx(card, rng.randint(1, 28), month, year, rng.choice(MERCHANTS),
+                            Decimal(rng.randint(100, 50000)) / 100),
+            )
+        ds.btg[card] = btg
+        ds.organize[card] = org
+    return ds
+
+
+def _btg_blocks(ds: SyntheticDataset) -> List[Tuple[str, List[str]]]:
+    """Blocos na ordem de leitura: ("full", [linhas]) ou ("pair", [esq, dir])."""
+    blocks: List[Tuple[str, List[str]]] = []
+    for card, txs in ds.btg.items():
+        blocks.append(("full", [f"Lançamentos do cartão Final {card}"]))
+        pending: List[str] = []
+        for t in txs:
+            date_str = f"{t.day:02d} {MONTH_ABBR[t.month - 1]}"
+            if t.foreign_currency:
+                if pending:
+                    blocks.append(("pair", pending))
+                    pending = []
+                blocks.append(("full", [
+                    f"{date_str} {t.description} {t.foreign_currency} {format_brl(t.foreign_amount)}",
+                    f"Cotação da moeda - R$ {t.fx_rate}",
+                    f"Conversão para Real - R$ {format_brl(t.amount)}",
+                ]))
+                continue
+            if t.amount < 0:
+                line = f"{date_str} {t.description} - R$ {format_brl(-t.amount)}"
+            else:
+                line = f"{date_str} {t.description} R$ {format_brl(t.amount)}"
+            pending.append(line)
+            if len(pending) == 2:
+                blocks.append(("pair", pending))
+                pending = []
+        if pending:
+            blocks.append(("pair", pending))
+    return blocks
+
+
+def render_btg_pdf(ds: SyntheticDataset) -> bytes:
+    """Fatura do BTG: lançamentos em duas colunas; compra internacional ocupa a linha toda."""
+    c = PdfCanvas()
+    c.new_page()
+    c.text(LEFT_X, 30, f"Fatura de {MONTH_NAME[ds.month - 1]} de {ds.year}", size=12)
+    top = FIRST_ROW_TOP
+
+    def next_row() -> float:
+        nonlocal top
+        if top > LAST_ROW_TOP:
+            c.new_page()
+            top = FIRST_ROW_TOP
+        row = top
+        top += ROW_HEIGHT
+        return row
+
+    for kind, lines in _btg_blocks(ds):
+        if kind == "full":
+            for ln in lines:
+                c.text(LEFT_X, next_row(), ln, size=8)
+        else:
+            row = next_row()
+            c.text(LEFT_X, row, lines[0], size=8)
+            if len(lines) > 1:
+                c.text(RIGHT_X, row, lines[1], size=8)
+    return c.to_bytes()
+
+
+def render_organize_pdf(ds: SyntheticDataset, card: str, layout: str = "table") -> bytes:
+    """PDF do Organize de um cartão; layout "table" (com bordas) ou "text" (uma linha por lançamento)."""
+    if layout not in ORGANIZE_LAYOUTS:
+        raise ValueError(f"layout desconhecido: {layout} (opções: {', '.join(ORGANIZE_LAYOUTS)})")
+    c = PdfCanvas()
+    c.new_page()
+    c.text(LEFT_X, 30, f"Organize - Cartão Final {card}", size=12)
+    rows = ds.organize[card]
+    cols = [40.0, 110.0, 350.0, 450.0, 555.0]
+    row_h = 16.0
+    top = FIRST_ROW_TOP
+
+    def table_row(cells: List[str], row_top: float) -> None:
+        c.line(cols[0], row_top, cols[-1], row_top)
+        c.line(cols[0], row_top + row_h, cols[-1], row_top + row_h)
+        for x in cols:
+            c.line(x, row_top, x, row_top + row_h)
+        for x, cell in zip(cols, cells):
+            c.text(x + 3, row_top + 3, cell, size=8)
+
+    if layout == "table":
+        table_row(["Data", "Descrição", "Categoria", "Valor"], top)
+        top += row_h
+    for t in rows:
+        if top > LAST_ROW_TOP:
+            c.new_page()
+            top = FIRST_ROW_TOP
+            if layout == "table":
+                table_row(["Data", "Descrição", "Categoria", "Valor"], top)
+                top += row_h
+        date_str = f"{t.day:02d}/{t.month:02d}/{t.year}"
+        value = format_brl(-t.amount)
+        if layout == "table":
+            table_row([date_str, t.description, "Geral", f"R$ {value}"], top)
+            top += row_h
+        else:
+            c.text(LEFT_X, top, f"{date_str} {t.description} R$ {value}", size=8)
+            top += ROW_HEIGHT
+    return c.to_bytes()
+
+
+def write_dataset(ds: SyntheticDataset, out_dir, organize_layout: str = "table") -> Tuple[Path, Path]:
+    """Grava out_dir/btg.pdf e out_dir/organize_pdfs/final_NNNN.pdf; devolve (btg, pasta do Organize)."""
+    out = Path(out_dir)
+    org_dir = out / "organize_pdfs"
+    org_dir.mkdir(parents=True, exist_ok=True)
+    btg_path = out / "btg.pdf"
+    btg_path.write_bytes(render_btg_pdf(ds))
+    for card in ds.organize:
+        (org_dir / f"final_{card}.pdf").write_bytes(render_organize_pdf(ds, card, organize_layout))
+    return btg_path, org_dir
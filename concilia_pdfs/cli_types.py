@@ -0,0 +1,36 @@
+# concilia_pdfs/cli_types.py
+"""
+Tipos de argumento compartilhados pelas linhas de comando (`python -m concilia_pdfs` e o modo em lote).
+Valor inválido vira `argparse.ArgumentTypeError`: o argparse mostra a mensagem e sai com código 2.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+from decimal import Decimal, InvalidOperation
+
+from concilia_pdfs.core.records import to_cents
+
+
+def tolerance_brl(value: str) -> Decimal:
+    """--tolerance: valor em R$, finito, >= 0 e com pelo menos 1 centavo (0 = desligada)."""
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise argparse.ArgumentTypeError(f"valor inválido: {value!r} (use R$ com ponto, ex.: 0.05)") from None
+    if not amount.is_finite() or amount < 0:
+        raise argparse.ArgumentTypeError(f"valor inválido: {value!r} (precisa ser um número >= 0)")
+    if amount and to_cents(amount) == 0:
+        raise argparse.ArgumentTypeError(f"{value} arredonda para 0 centavos (mínimo 0.01)")
+    return amount
+
+
+def tolerance_rel(value: str) -> float:
+    """--tolerance-rel: fração do valor do BTG, 0 <= x < 1."""
+    try:
+        rel = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"valor inválido: {value!r} (fração, ex.: 0.005 = 0,5%)") from None
+    if math.isnan(rel) or not 0 <= rel < 1:
+        raise argparse.ArgumentTypeError(f"valor inválido: {value!r} (precisa estar em [0, 1))")
+    return rel
@@ -0,0 +1,4 @@
+# concilia_pdfs/core/engines.py
+"""Motores de conciliação aceitos por `reconcile_records` (sem dependências: o --help da CLI importa daqui)."""
+
+ENGINES = ("python", "numpy")
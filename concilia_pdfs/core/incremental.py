@@ -0,0 +1,226 @@
+# concilia_pdfs/core/incremental.py
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from concilia_pdfs.core.matching import CardMatch, MatchOptions, reconcile_records
+from concilia_pdfs.core.records import TxRecord
+
+logger = logging.getLogger(__name__)
+
+# Sobe quando o formato do estado mudar (estado antigo -> recálculo completo)
+STATE_FORMAT_VERSION = 1
+
+MATCH_EXACT = "exato"
+MATCH_TOLERANCE = "tolerancia"
+
+# (data, centavos, descrição, ocorrência): identifica um lançamento do Organize entre execuções
+OrgKey = Tuple[int, int, str, int]
+
+
+def _btg_hash(btg: Sequence[TxRecord]) -> str:
+    h = hashlib.sha256()
+    for r in btg:
+        h.update(
+            json.dumps(
+                [r.date_ord, r.cents, r.description_raw, r.foreign_currency, str(r.foreign_amount)],
+                ensure_ascii=False,
+            ).encode("utf-8")
+        )
+    return h.hexdigest()
+
+
+def config_fingerprint(options: MatchOptions) -> str:
+    """Só o que muda o resultado (motor e workers não mudam)."""
+    payload = [STATE_FORMAT_VERSION, options.score_cutoff, options.tolerance_cents, options.tolerance_rel]
+    return hashlib.sha256(json.dumps(payload).encode()).hexdigest()[:16]
+
+
+def org_keys(org: Sequence[TxRecord]) -> List[OrgKey]:
+    """Chave de cada lançamento; repetições idênticas são numeradas na ordem do PDF."""
+    seen: Dict[Tuple[int, int, str], int] = {}
+    keys: List[OrgKey] = []
+    for r in org:
+        base = (r.date_ord, r.cents, r.description_raw)
+        occ = seen.get(base, 0)
+        seen[base] = occ + 1
+        keys.append((*base, occ))
+    return keys
+
+
+class IncrementalState:
+    """
+    Estado da conciliação por cartão e ciclo (um JSON por cartão em `state_dir/ciclo`).
+
+    Guarda, para cada transação do BTG, o lançamento do Organize casado (ou nada) e a
+    lista de lançamentos do Organize da última execução. Na execução seguinte:
+    - pares exatos cujo lançamento do Organize continua lá são mantidos; os pares pela
+      tolerância só são mantidos se o Organize não mudou (senão voltam para pendentes);
+    - só o BTG pendente (nunca casado, que perdeu o par ou casado pela tolerância) é
+      conciliado contra o Organize pendente (sobras + lançamentos novos);
+    - BTG diferente (hash) ou outra configuração de match -> recálculo completo.
+    """
+
+    def __init__(self, state_dir: Path, cycle: str):
+        self.state_dir = Path(state_dir) / cycle
+        self.cycle = cycle
+
+    def _path(self, card_final: str) -> Path:
+        return self.state_dir / f"{card_final}.json"
+
+    def load(self, card_final: str) -> Optional[dict]:
+        path = self._path(card_final)
+        try:
+            state = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Estado incremental inválido, ignorando: {path} ({type(e).__name__})")
+            return None
+        if state.get("version") != STATE_FORMAT_VERSION:
+            return None
+        return state
+
+    def save(self, card_final: str, state: dict) -> None:
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(card_final)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(state, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o estado incremental em {self.state_dir}: {e!r}")
+
+    def reconcile_card(
+        self,
+        card_final: str,
+        btg: Sequence[TxRecord],
+        org: Sequence[TxRecord],
+        options: MatchOptions,
+    ) -> CardMatch:
+        btg_hash = _btg_hash(btg)
+        config = config_fingerprint(options)
+        keys = org_keys(org)
+
+        state = self.load(card_final)
+        if state is None:
+            reason = "sem estado anterior"
+        elif state["btg_hash"] != btg_hash:
+            reason = "BTG mudou"
+        elif state["config"] != config:
+            reason = "configuração mudou"
+        else:
+            reason = None
+
+        if reason is not None:
+            logger.info(f"[incremental] Cartão {card_final}: recálculo completo ({reason})")
+            result = reconcile_records(btg, org, **options.as_kwargs()).get(card_final, CardMatch(card_final))
+            matched = self._matched_from_result(btg, org, keys, result)
+        else:
+            result, matched = self._reconcile_delta(card_final, btg, org, keys, state, options)
+
+        self.save(
+            card_final,
+            {
+                "version": STATE_FORMAT_VERSION,
+                "cycle": self.cycle,
+                "btg_hash": btg_hash,
+                "config": config,
+                "org_keys": keys,
+                "matched": matched,
+            },
+        )
+        return result
+
+    @staticmethod
+    def _matched_from_result(
+        btg: Sequence[TxRecord],
+        org: Sequence[TxRecord],
+        keys: List[OrgKey],
+        result: CardMatch,
+    ) -> List[Optional[list]]:
+        """Para cada posição do BTG: [chave do Organize, tipo do match] ou None."""
+        key_of = {id(o): list(k) for o, k in zip(org, keys)}
+        entry_of = {id(b): [key_of[id(o)], MATCH_EXACT] for b, o in result.matched_pairs}
+        entry_of.update({id(b): [key_of[id(o)], MATCH_TOLERANCE] for b, o in result.tolerance_matches})
+        return [entry_of.get(id(b)) for b in btg]
+
+    def _reconcile_delta(
+        self,
+        card_final: str,
+        btg: Sequence[TxRecord],
+        org: Sequence[TxRecord],
+        keys: List[OrgKey],
+        state: dict,
+        options: MatchOptions,
+    ) -> Tuple[CardMatch, List[Optional[list]]]:
+        pos_by_key = {k: pos for pos, k in enumerate(keys)}
+        old_keys = {tuple(k) for k in state["org_keys"]}
+        added = sum(1 for k in keys if k not in old_keys)
+        removed = len(old_keys) - (len(keys) - added)
+
+        changed = bool(added or removed)
+
+        matched: List[Optional[list]] = []
+        used_org = set()
+        pending_btg: List[int] = []
+        exact_pairs: Dict[int, int] = {}
+        tolerance_pairs: Dict[int, int] = {}
+
+        for i, entry in enumerate(state["matched"]):
+            pos = pos_by_key.get(tuple(entry[0])) if entry else None
+            # par pela tolerância só vale enquanto o Organize não muda: um lançamento novo
+            # (ou um BTG que perdeu o par) pode casar no valor exato com um dos dois lados
+            if pos is None or (changed and entry[1] == MATCH_TOLERANCE):
+                matched.append(None)
+                pending_btg.append(i)
+                continue
+            matched.append(entry)
+            used_org.add(pos)
+            pairs = tolerance_pairs if entry[1] == MATCH_TOLERANCE else exact_pairs
+            pairs[i] = pos
+
+        pending_org = [pos for pos in range(len(org)) if pos not in used_org]
+        missing_pos = set(pending_btg)
+        if not changed:
+            logger.info(f"[incremental] Cartão {card_final}: Organize sem mudanças; resultado reaproveitado")
+        else:
+            logger.info(
+                f"[incremental] Cartão {card_final}: Organize +{added}/-{removed}; "
+                f"conciliando {len(pending_btg)} BTG x {len(pending_org)} Organize pendentes"
+            )
+            delta = reconcile_records(
+                [btg[i] for i in pending_btg],
+                [org[pos] for pos in pending_org],
+                **options.as_kwargs(),
+            ).get(card_final, CardMatch(card_final))
+            sub_matched = self._matched_from_result(
+                [btg[i] for i in pending_btg],
+                [org[pos] for pos in pending_org],
+                [keys[pos] for pos in pending_org],
+                delta,
+            )
+            missing_pos = set()
+            for i, entry in zip(pending_btg, sub_matched):
+                matched[i] = entry
+                if entry is None:
+                    missing_pos.add(i)
+                    continue
+                pos = pos_by_key[tuple(entry[0])]
+                used_org.add(pos)
+                pairs = tolerance_pairs if entry[1] == MATCH_TOLERANCE else exact_pairs
+                pairs[i] = pos
+
+        result = CardMatch(
+            card_final=card_final,
+            missing_in_organize=[btg[i] for i in sorted(missing_pos)],
+            extra_in_organize=[o for pos, o in enumerate(org) if pos not in used_org],
+            tolerance_matches=[(btg[i], org[pos]) for i, pos in sorted(tolerance_pairs.items())],
+            matched_pairs=[(btg[i], org[pos]) for i, pos in sorted(exact_pairs.items())],
+        )
+        return result, matched
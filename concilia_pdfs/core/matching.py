@@ -0,0 +1,353 @@
+# concilia_pdfs/core/matching.py
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from concilia_pdfs.core.engines import ENGINES
+from concilia_pdfs.core.records import TxRecord
+from concilia_pdfs.utils.metrics import METRICS
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# desempates com menos candidatos que isso usam fuzz.ratio direto (cdist não compensa)
+BATCH_MIN_CANDIDATES = 4
+
+
+@dataclass(slots=True)
+class CardMatch:
+    """Resultado da conciliação de um cartão sobre `TxRecord` (mesmos campos do ReconciliationResult)."""
+    card_final: str
+    missing_in_organize: List[TxRecord] = field(default_factory=list)  # INCLUIR
+    extra_in_organize: List[TxRecord] = field(default_factory=list)    # EXCLUIR
+    tolerance_matches: List[Tuple[TxRecord, TxRecord]] = field(default_factory=list)  # (BTG, Organize) só pela tolerância
+    matched_pairs: List[Tuple[TxRecord, TxRecord]] = field(default_factory=list)  # (BTG, Organize) valor exato
+
+
+@dataclass(frozen=True)
+class MatchOptions:
+    """Parâmetros da conciliação que o pipeline repassa para `reconcile_records`."""
+    engine: str = "python"
+    workers: int = 1
+    score_cutoff: float = 0
+    tolerance_cents: int = 0
+    tolerance_rel: float = 0.0
+
+    def as_kwargs(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+def best_candidate(b: TxRecord, candidates: Sequence[TxRecord]) -> Optional[TxRecord]:
+    """Desempate: data mais próxima, depois maior similaridade (empate -> primeiro da lista)."""
+    best = None
+    best_tuple = None
+
+    for c in candidates:
+        date_diff = abs(b.date_ord - c.date_ord)
+        sim = _similarity(b, c)
+        tup = (date_diff, -sim)
+        if best_tuple is None or tup < best_tuple:
+            best_tuple = tup
+            best = c
+
+    return best
+
+
+def _similarity(b: TxRecord, c: TxRecord) -> float:
+    from rapidfuzz import fuzz  # só quando há desempate (o --help e o cache não carregam o rapidfuzz)
+
+    return fuzz.ratio(b.description_norm, c.description_norm) if (b.description_norm and c.description_norm) else 0
+
+
+class _BucketScores:
+    """
+    Similaridade BTG x Organize calculada em lote por balde de |valor|.
+
+    A matriz de um balde só é montada (um `process.cdist`) na primeira vez que um
+    desempate desse balde com pelo menos BATCH_MIN_CANDIDATES candidatos precisa dela.
+    Descrição vazia em qualquer lado vale 0, como no `_similarity`.
+    Com score_cutoff > 0, notas abaixo do corte viram 0 (também no caminho direto).
+    """
+
+    def __init__(self, btg: Sequence[TxRecord], org: Sequence[TxRecord], workers: int = 1, score_cutoff: float = 0):
+        self.btg = btg
+        self.org = org
+        self.workers = workers
+        self.score_cutoff = score_cutoff
+        self._btg_local: List[int] = []
+        self._org_local: List[int] = []
+        self._btg_bucket: Dict[int, List[int]] = defaultdict(list)
+        self._org_bucket: Dict[int, List[int]] = defaultdict(list)
+        self._matrices: Dict[int, "np.ndarray"] = {}
+        self._indexed = False
+        self.examined = 0  # candidatos comparados por similaridade (métricas)
+
+    def _index(self) -> None:
+        """Baldes por |valor| (só montados se algum desempate acontecer)."""
+        self._indexed = True
+        for i, b in enumerate(self.btg):
+            bucket = self._btg_bucket[abs(b.cents)]
+            self._btg_local.append(len(bucket))
+            bucket.append(i)
+        for pos, o in enumerate(self.org):
+            bucket = self._org_bucket[abs(o.cents)]
+            self._org_local.append(len(bucket))
+            bucket.append(pos)
+
+    def _matrix(self, key: int) -> "np.ndarray":
+        matrix = self._matrices.get(key)
+        if matrix is None:
+            if not self._indexed:
+                self._index()
+
+            import numpy as np
+            from rapidfuzz import fuzz, process
+
+            btg_descs = [self.btg[i].description_norm for i in self._btg_bucket[key]]
+            org_descs = [self.org[pos].description_norm for pos in self._org_bucket[key]]
+            matrix = process.cdist(
+                btg_descs,
+                org_descs,
+                scorer=fuzz.ratio,
+                dtype=np.float64,
+                workers=self.workers,
+                score_cutoff=self.score_cutoff,
+            )
+            matrix[[not d for d in btg_descs], :] = 0
+            matrix[:, [not d for d in org_descs]] = 0
+            self._matrices[key] = matrix
+        return matrix
+
+    def scores(self, bi: int, positions: List[int]) -> List[float]:
+        """Similaridade da transação `bi` do BTG contra as posições do Organize."""
+        self.examined += len(positions)
+        if len(positions) < BATCH_MIN_CANDIDATES:
+            b = self.btg[bi]
+            sims = [_similarity(b, self.org[pos]) for pos in positions]
+            return [sim if sim >= self.score_cutoff else 0 for sim in sims]
+        matrix = self._matrix(abs(self.btg[bi].cents))
+        row = matrix[self._btg_local[bi]]
+        return row[[self._org_local[pos] for pos in positions]].tolist()
+
+
+def _build_pools(org: Sequence[TxRecord]) -> Dict[int, List[Tuple[int, int]]]:
+    """Pools consumíveis por valor (centavos): [(data, posição no Organize)] ordenado por data."""
+    pools: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+    for pos, o in enumerate(org):
+        pools[o.cents].append((o.date_ord, pos))
+    for pool in pools.values():
+        pool.sort()
+    return pools
+
+
+def _same_date_run(pool: List[Tuple[int, int]], start: int, step: int) -> range:
+    """Índices contíguos a partir de `start` (andando `step`) com a mesma data de pool[start]."""
+    d = pool[start][0]
+    end = start
+    while 0 <= end + step < len(pool) and pool[end + step][0] == d:
+        end += step
+    return range(start, end + step, step)
+
+
+def _take_nearest(bi: int, bd: int, pool: List[Tuple[int, int]], scores: _BucketScores) -> int:
+    """
+    Remove do pool e devolve a posição do melhor candidato para a transação `bi` (data `bd`).
+    Bisect acha a data mais próxima; só os candidatos nessa distância são comparados
+    por similaridade (empate -> menor posição, i.e. primeiro na ordem do Organize).
+    """
+    i = bisect_left(pool, (bd, -1))
+
+    if i < len(pool) and pool[i][0] == bd:
+        nearest = list(_same_date_run(pool, i, 1))
+    else:
+        left_diff = bd - pool[i - 1][0] if i > 0 else None
+        right_diff = pool[i][0] - bd if i < len(pool) else None
+        best_diff = min(d for d in (left_diff, right_diff) if d is not None)
+        nearest = []
+        if left_diff == best_diff:
+            nearest.extend(_same_date_run(pool, i - 1, -1))
+        if right_diff == best_diff:
+            nearest.extend(_same_date_run(pool, i, 1))
+
+    if len(nearest) == 1:
+        chosen = nearest[0]
+    else:
+        sims = scores.scores(bi, [pool[k][1] for k in nearest])
+        chosen = min(zip(nearest, sims), key=lambda ks: (-ks[1], pool[ks[0]][1]))[0]
+
+    return pool.pop(chosen)[1]
+
+
+def match_greedy(
+    btg: Sequence[TxRecord],
+    org: Sequence[TxRecord],
+    workers: int = 1,
+    score_cutoff: float = 0,
+) -> List[int]:
+    """
+    Guloso na ordem do BTG. Para cada transação devolve a posição do Organize casado (ou -1).
+
+    Candidatos: mesmo valor; se não houver, valor com sinal invertido
+    (o antigo nível "absoluto" é a união desses dois, então não acha nada novo).
+    Os pools são consumidos, então cada busca custa O(log n) mesmo com centenas
+    de lançamentos de mesmo valor (assinaturas, pedágios, corridas iguais).
+    A similaridade dos desempates sai de um `cdist` por balde de valor
+    (`workers` threads; `score_cutoff` > 0 zera notas baixas e pode mudar desempates).
+    """
+    pools = _build_pools(org)
+    scores = _BucketScores(btg, org, workers=workers, score_cutoff=score_cutoff)
+    matches: List[int] = []
+
+    for bi, b in enumerate(btg):
+        pool = pools.get(b.cents)
+        if not pool:
+            pool = pools.get(-b.cents)
+        matches.append(_take_nearest(bi, b.date_ord, pool, scores) if pool else -1)
+
+    METRICS.count("match.candidates_scored", scores.examined)
+    return matches
+
+
+def _allowed_diff(ref_abs_cents: int, tolerance_cents: int, tolerance_rel: float) -> int:
+    """Maior diferença aceita (centavos) para um valor de referência."""
+    # o epsilon evita que 0.29 * 100 vire 28 pelo arredondamento do float
+    return max(tolerance_cents, math.floor(tolerance_rel * ref_abs_cents + 1e-9))
+
+
+def amount_equal(a_cents: int, b_cents: int, tolerance_cents: int = 0, tolerance_rel: float = 0.0) -> bool:
+    """
+    |a| e |b| iguais dentro da tolerância (sinal ignorado, como no match exato).
+    A tolerância relativa é calculada sobre `a` (o lado do BTG na conciliação).
+    """
+    ref = abs(a_cents)
+    return abs(ref - abs(b_cents)) <= _allowed_diff(ref, tolerance_cents, tolerance_rel)
+
+
+def match_tolerance(
+    btg: Sequence[TxRecord],
+    org: Sequence[TxRecord],
+    tolerance_cents: int = 0,
+    tolerance_rel: float = 0.0,
+) -> List[int]:
+    """
+    Segunda passada, sobre o que sobrou do match exato: para cada transação do BTG
+    devolve a posição do Organize casado dentro da tolerância (ou -1).
+
+    Índice ordenado por |valor|; cada busca é um intervalo por bisect, e só os
+    candidatos dentro da faixa são comparados. Desempate: menor diferença de valor,
+    data mais próxima, maior similaridade, primeiro na ordem do Organize.
+    """
+    index = sorted((abs(o.cents), o.date_ord, pos) for pos, o in enumerate(org))
+    matches: List[int] = []
+
+    for b in btg:
+        ref = abs(b.cents)
+        allowed = _allowed_diff(ref, tolerance_cents, tolerance_rel)
+        lo = bisect_left(index, ref - allowed, key=lambda e: e[0])
+        hi = bisect_right(index, ref + allowed, key=lambda e: e[0])
+        if lo == hi:
+            matches.append(-1)
+            continue
+
+        def closeness(k: int) -> Tuple[int, int]:
+            return abs(index[k][0] - ref), abs(index[k][1] - b.date_ord)
+
+        best = min(closeness(k) for k in range(lo, hi))
+        ties = [k for k in range(lo, hi) if closeness(k) == best]
+        if len(ties) > 1:
+            chosen = min(ties, key=lambda k: (-_similarity(b, org[index[k][2]]), index[k][2]))
+        else:
+            chosen = ties[0]
+        matches.append(index.pop(chosen)[2])
+
+    return matches
+
+
+def _apply_tolerance(match: CardMatch, tolerance_cents: int, tolerance_rel: float) -> None:
+    """Move para `tolerance_matches` os pares INCLUIR/EXCLUIR que batem dentro da tolerância."""
+    missing, extra = match.missing_in_organize, match.extra_in_organize
+    if not missing or not extra:
+        return
+    matches = match_tolerance(missing, extra, tolerance_cents, tolerance_rel)
+    used = set(matches)
+    match.tolerance_matches = [(b, extra[m]) for b, m in zip(missing, matches) if m >= 0]
+    match.missing_in_organize = [b for b, m in zip(missing, matches) if m < 0]
+    match.extra_in_organize = [o for pos, o in enumerate(extra) if pos not in used]
+
+
+def _reconcile_greedy(
+    btg_records: Sequence[TxRecord],
+    org_records: Sequence[TxRecord],
+    workers: int,
+    score_cutoff: float,
+) -> Dict[str, CardMatch]:
+    btg_by_card: Dict[str, List[TxRecord]] = defaultdict(list)
+    org_by_card: Dict[str, List[TxRecord]] = defaultdict(list)
+
+    for rec in btg_records:
+        btg_by_card[rec.card_final].append(rec)
+
+    for rec in org_records:
+        org_by_card[rec.card_final].append(rec)
+
+    results: Dict[str, CardMatch] = {}
+
+    for card_final in sorted(set(btg_by_card.keys()) | set(org_by_card.keys())):
+        btg = btg_by_card.get(card_final, [])
+        org = org_by_card.get(card_final, [])
+
+        matches = match_greedy(btg, org, workers=workers, score_cutoff=score_cutoff)
+        used = set(matches)
+
+        results[card_final] = CardMatch(
+            card_final=card_final,
+            missing_in_organize=[b for b, m in zip(btg, matches) if m < 0],
+            extra_in_organize=[o for pos, o in enumerate(org) if pos not in used],
+            matched_pairs=[(b, org[m]) for b, m in zip(btg, matches) if m >= 0],
+        )
+
+    return results
+
+
+def reconcile_records(
+    btg_records: Sequence[TxRecord],
+    org_records: Sequence[TxRecord],
+    engine: str = "python",
+    workers: int = 1,
+    score_cutoff: float = 0,
+    tolerance_cents: int = 0,
+    tolerance_rel: float = 0.0,
+) -> Dict[str, CardMatch]:
+    """
+    Match principal por VALOR (centavos), tolerante a inversão de sinal.
+    Desempate: data mais próxima, depois maior similaridade da descrição.
+
+    engine="numpy": motor colunar (mesmo resultado), para carteiras com dezenas de milhares de linhas.
+    workers/score_cutoff: repassados ao `cdist` dos desempates (ver `match_greedy`).
+    tolerance_cents/tolerance_rel: se algum for > 0, o que sobrou do match exato passa
+    por uma segunda rodada com tolerância de valor; esses pares vão para `tolerance_matches`.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine desconhecido: {engine!r} (opções: {', '.join(ENGINES)})")
+
+    METRICS.count("match.btg", len(btg_records))
+    METRICS.count("match.organize", len(org_records))
+    with METRICS.stage("match"):
+        if engine == "numpy":
+            from concilia_pdfs.core.matching_columnar import reconcile_records_columnar
+
+            results = reconcile_records_columnar(btg_records, org_records, workers=workers, score_cutoff=score_cutoff)
+        else:
+            results = _reconcile_greedy(btg_records, org_records, workers, score_cutoff)
+
+    if tolerance_cents > 0 or tolerance_rel > 0:
+        with METRICS.stage("match.tolerance"):
+            for match in results.values():
+                _apply_tolerance(match, tolerance_cents, tolerance_rel)
+
+    return results
@@ -0,0 +1,118 @@
+# concilia_pdfs/core/matching_columnar.py
+from __future__ import annotations
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from concilia_pdfs.core.matching import CardMatch, match_greedy
+from concilia_pdfs.core.records import TxRecord
+
+# chave composta (cartão, |centavos|) num int64: cartão nos bits altos
+_CARD_SHIFT = 40
+_MAX_ABS_CENTS = (1 << _CARD_SHIFT) - 1
+
+
+def _group_keys(records: Sequence[TxRecord], card_codes: Dict[str, int]) -> np.ndarray:
+    """Coluna int64 com a chave (cartão, |centavos|) de cada registro."""
+    n = len(records)
+    cents = np.fromiter((r.cents for r in records), dtype=np.int64, count=n)
+    cards = np.fromiter((card_codes[r.card_final] for r in records), dtype=np.int64, count=n)
+    abs_cents = np.abs(cents)
+    if n and abs_cents.max() > _MAX_ABS_CENTS:
+        raise ValueError("valor fora do limite suportado pelo motor colunar")
+    return (cards << _CARD_SHIFT) | abs_cents
+
+
+def _match_group(
+    btg_idx: List[int],
+    org_idx: List[int],
+    btg_records: Sequence[TxRecord],
+    org_records: Sequence[TxRecord],
+    btg_match: List[int],
+    workers: int = 1,
+    score_cutoff: float = 0,
+) -> None:
+    """
+    Grupo (cartão, |valor|) com disputa: roda o guloso do motor Python só aqui.
+    btg_idx e org_idx estão na ordem original, então o desempate é o mesmo.
+    """
+    matches = match_greedy(
+        [btg_records[bi] for bi in btg_idx],
+        [org_records[oi] for oi in org_idx],
+        workers=workers,
+        score_cutoff=score_cutoff,
+    )
+    for bi, m in zip(btg_idx, matches):
+        if m >= 0:
+            btg_match[bi] = org_idx[m]
+
+
+def reconcile_records_columnar(
+    btg_records: Sequence[TxRecord],
+    org_records: Sequence[TxRecord],
+    workers: int = 1,
+    score_cutoff: float = 0,
+) -> Dict[str, CardMatch]:
+    """
+    Motor colunar: centavos int64 e cartões codificados num único array de chaves.
+
+    Os candidatos de uma transação do BTG só podem ter o mesmo |valor| no mesmo cartão,
+    então cada grupo (cartão, |valor|) é independente:
+    - grupo sem Organize            -> faltante (vetorizado)
+    - 1 BTG x 1 Organize            -> match direto (vetorizado)
+    - demais (disputa/desempate)    -> guloso em Python, restrito ao grupo
+    Resultado idêntico ao motor "python".
+    """
+    cards = sorted({r.card_final for r in btg_records} | {r.card_final for r in org_records})
+    card_codes = {card: code for code, card in enumerate(cards)}
+
+    b_key = _group_keys(btg_records, card_codes)
+    o_key = _group_keys(org_records, card_codes)
+
+    o_order = np.argsort(o_key, kind="stable")
+    o_sorted = o_key[o_order]
+    lo = np.searchsorted(o_sorted, b_key, side="left")
+    hi = np.searchsorted(o_sorted, b_key, side="right")
+    n_org = hi - lo
+
+    b_order = np.argsort(b_key, kind="stable")
+    b_sorted = b_key[b_order]
+    n_btg = np.searchsorted(b_sorted, b_key, side="right") - np.searchsorted(b_sorted, b_key, side="left")
+
+    btg_match = np.full(len(btg_records), -1, dtype=np.int64)
+
+    simple = (n_btg == 1) & (n_org == 1)
+    btg_match[simple] = o_order[lo[simple]]
+
+    contested = np.flatnonzero((n_org > 0) & ~simple)
+    if contested.size:
+        keys = np.unique(b_key[contested])
+        b_bounds = zip(np.searchsorted(b_sorted, keys, side="left").tolist(),
+                       np.searchsorted(b_sorted, keys, side="right").tolist())
+        o_bounds = zip(np.searchsorted(o_sorted, keys, side="left").tolist(),
+                       np.searchsorted(o_sorted, keys, side="right").tolist())
+        b_order_list, o_order_list = b_order.tolist(), o_order.tolist()
+        match_list = btg_match.tolist()
+        for (b_lo, b_hi), (o_lo, o_hi) in zip(b_bounds, o_bounds):
+            _match_group(
+                b_order_list[b_lo:b_hi], o_order_list[o_lo:o_hi], btg_records, org_records, match_list,
+                workers, score_cutoff,
+            )
+        btg_match = np.asarray(match_list, dtype=np.int64)
+
+    org_used = np.zeros(len(org_records), dtype=bool)
+    org_used[btg_match[btg_match >= 0]] = True
+
+    results: Dict[str, CardMatch] = {card: CardMatch(card_final=card) for card in cards}
+    missing: List[TxRecord] = [btg_records[i] for i in np.flatnonzero(btg_match < 0).tolist()]
+    extra: List[TxRecord] = [org_records[i] for i in np.flatnonzero(~org_used).tolist()]
+    for rec in missing:
+        results[rec.card_final].missing_in_organize.append(rec)
+    for rec in extra:
+        results[rec.card_final].extra_in_organize.append(rec)
+    for bi, oi in zip(np.flatnonzero(btg_match >= 0).tolist(), btg_match[btg_match >= 0].tolist()):
+        rec = btg_records[bi]
+        results[rec.card_final].matched_pairs.append((rec, org_records[oi]))
+
+    return results
@@ -1,15 +1,10 @@
 from datetime import date
 from decimal import Decimal
-from enum import Enum
 from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
-
-class Source(str, Enum):
-    """Enum para identificar a origem da transação."""
-    BTG = "BTG"
-    ORGANIZE = "ORGANIZE"
+from concilia_pdfs.core.records import Source  # noqa: F401  (reexportado: era definido aqui)
 
 
 class Transaction(BaseModel):
@@ -0,0 +1,360 @@
+# concilia_pdfs/core/pipeline.py
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from concilia_pdfs.core.incremental import IncrementalState
+from concilia_pdfs.core.matching import CardMatch, MatchOptions, reconcile_records
+from concilia_pdfs.core.records import TxRecord, pack_records, unpack_records
+from concilia_pdfs.parsers.btg_parser import iter_card_batches, parse_btg_records
+from concilia_pdfs.parsers.organize_parser import parse_organize_records
+from concilia_pdfs.reporting.excel_writer import build_card_report
+from concilia_pdfs.reporting.sinks import DEFAULT_FORMATS, report_paths, write_card_outputs
+from concilia_pdfs.utils.metrics import METRICS, call_in_worker
+from concilia_pdfs.utils.parse_cache import ParseCache
+from concilia_pdfs.utils.pdf_backends import DEFAULT_BACKEND, resolve_backend
+from concilia_pdfs.utils.pdf_open import password_scope
+
+
+def find_organize_files(organize_dir: Path) -> Dict[str, Path]:
+    """
+    Mapeia final do cartão -> PDF do Organize.
+    Aceita "1748.pdf" e "final_1748.pdf" (o primeiro tem prioridade, como antes).
+    """
+    found: Dict[str, Path] = {}
+    for path in sorted(organize_dir.glob("*.pdf")):
+        stem = path.stem
+        if stem.isdigit() and len(stem) == 4:
+            found[stem] = path
+        elif stem.startswith("final_") and stem[6:].isdigit() and len(stem) == 10:
+            found.setdefault(stem[6:], path)
+    return found
+
+
+def _parse_organize_job(
+    pdf_path: str,
+    pdf_password: Optional[str],
+    cache: Optional[ParseCache] = None,
+    cache_key: Optional[str] = None,
+    pdf_backend: str = DEFAULT_BACKEND,
+    data: Optional[bytes] = None,
+) -> List[TxRecord]:
+    txs = list(parse_organize_records(pdf_path, pdf_password=pdf_password, backend=pdf_backend, data=data))
+    if cache is not None and cache_key:
+        cache.put(cache_key, txs)
+    return txs
+
+
+def _cache_lookup(
+    cache: Optional[ParseCache],
+    kind: str,
+    pdf_path: Path,
+    pdf_backend: str = DEFAULT_BACKEND,
+) -> Tuple[Optional[str], Optional[List[TxRecord]], Optional[bytes]]:
+    """
+    (chave, transações do cache, bytes do PDF). Os bytes lidos para a chave voltam só no miss,
+    para o parser abrir o PDF sem ler o arquivo de novo.
+    """
+    if cache is None:
+        return None, None, None
+    data = pdf_path.read_bytes()
+    key, cached = cache.lookup(kind, str(pdf_path), pdf_backend, data)
+    METRICS.count(f"cache.{kind}.{'hits' if cached is not None else 'misses'}")
+    return key, cached, (data if cached is None else None)
+
+
+def _reconcile_card(
+    card_final: str,
+    btg_txs: List[TxRecord],
+    org_txs: List[TxRecord],
+    org_file: Path,
+    options: MatchOptions,
+    incremental: Optional[IncrementalState] = None,
+) -> Optional[CardMatch]:
+    logging.info(f"[Organize] Cartão {card_final}: {len(org_txs)} transações (arquivo={org_file.name})")
+
+    with METRICS.stage("reconcile", key=card_final):
+        if incremental is not None:
+            return incremental.reconcile_card(card_final, btg_txs, org_txs, options)
+
+        # concilia SOMENTE este cartão
+        rec_one = reconcile_records(btg_txs, org_txs, **options.as_kwargs())
+    # reconcile_records retorna dict; pegamos a chave do próprio cartão
+    return rec_one.get(card_final)
+
+
+def _warn_missing_organize(card_final: str) -> None:
+    logging.warning(
+        f"[SKIP] Cartão {card_final}: PDF do Organize não encontrado "
+        f"(esperado {card_final}.pdf ou final_{card_final}.pdf). NÃO vou gerar diferenças para este cartão."
+    )
+
+
+def _iter_btg_batches(
+    btg_file: Path,
+    pdf_password: Optional[str],
+    workers: int,
+    cache: Optional[ParseCache],
+    strict: bool = False,
+    pdf_backend: str = DEFAULT_BACKEND,
+) -> Iterator[Tuple[str, List[TxRecord]]]:
+    """
+    Lotes por cartão do BTG, na ordem do PDF, à medida que cada seção termina.
+    Vem do cache se houver; senão do parser (e grava no cache no fim).
+    Falha ao ler o PDF encerra o fluxo com erro no log; os cartões já emitidos continuam valendo.
+    strict=True: a falha é relançada depois do log.
+    """
+    cache_key, cached, data = _cache_lookup(cache, "btg", btg_file, pdf_backend)
+    if cached is not None:
+        logging.info(f"BTG carregado: {len(cached)} transações")
+        yield from iter_card_batches(cached)
+        return
+
+    # a entrada do cache é gravada à medida que os registros passam (sem lista do extrato inteiro)
+    writer = cache.writer(cache_key) if cache is not None and cache_key else None
+    total = 0
+    complete = False
+
+    def tee(records: Iterator[TxRecord]) -> Iterator[TxRecord]:
+        nonlocal total
+        for rec in records:
+            total += 1
+            if writer is not None:
+                writer.add(rec)
+            yield rec
+
+    try:
+        records = parse_btg_records(
+            str(btg_file), pdf_password=pdf_password, workers=workers, backend=pdf_backend, data=data
+        )
+        yield from iter_card_batches(tee(records))
+        complete = True
+    except Exception as e:
+        logging.error(f"[ERRO] Falha ao ler o PDF do BTG {btg_file.name}: {type(e).__name__} {e!r}")
+        if strict:
+            raise
+        return
+    finally:
+        # leitura incompleta (erro ou consumidor parou) não vira entrada do cache
+        if writer is not None and not complete:
+            writer.discard()
+
+    logging.info(f"BTG carregado: {total} transações")
+    if writer is not None:
+        writer.commit()
+
+
+class _OrganizeLoader:
+    """
+    Transações do Organize por cartão.
+    Com pool, todos os PDFs fora do cache são agendados logo no início (enquanto o BTG
+    é lido no processo principal); sem pool, cada PDF é lido quando o cartão chega.
+    """
+
+    def __init__(
+        self,
+        org_files: Dict[str, Path],
+        pdf_password: Optional[str],
+        cache: Optional[ParseCache],
+        pool: Optional[ProcessPoolExecutor],
+        pdf_backend: str = DEFAULT_BACKEND,
+    ):
+        self.org_files = org_files
+        self.pdf_password = pdf_password
+        self.cache = cache
+        self.pdf_backend = pdf_backend
+        # lista ainda não usada; depois do primeiro uso só a forma compactada (`pack_records`)
+        self.loaded: Dict[str, Union[List[TxRecord], bytes, None]] = {}
+        self.keys: Dict[str, Optional[str]] = {}
+        self.data: Dict[str, Optional[bytes]] = {}
+        self.futures: Dict[str, Future] = {}
+
+        for card_final, org_file in org_files.items():
+            key, cached, data = _cache_lookup(cache, "organize", org_file, pdf_backend)
+            if cached is not None:
+                self.loaded[card_final] = cached
+            elif pool is not None:
+                self.futures[card_final] = pool.submit(
+                    call_in_worker, METRICS.enabled, _parse_organize_job, str(org_file), pdf_password, cache, key,
+                    pdf_backend, data,
+                )
+            else:
+                self.keys[card_final] = key
+                self.data[card_final] = data
+
+    def get(self, card_final: str) -> Optional[List[TxRecord]]:
+        # mantém o resultado (compactado): um cartão que reaparece no BTG é conciliado de novo
+        if card_final in self.loaded:
+            txs = self.loaded[card_final]
+            if isinstance(txs, bytes):
+                return unpack_records(txs)
+            self.loaded[card_final] = pack_records(txs) if txs is not None else None
+            return txs
+        org_file = self.org_files[card_final]
+        try:
+            if card_final in self.futures:
+                txs, worker_metrics = self.futures.pop(card_final).result()
+                METRICS.merge(worker_metrics)
+            else:
+                txs = _parse_organize_job(
+                    str(org_file), self.pdf_password, self.cache, self.keys.get(card_final), self.pdf_backend,
+                    self.data.pop(card_final, None),
+                )
+        except Exception as e:
+            logging.error(f"[ERRO] Cartão {card_final}: falha ao ler {org_file.name}: {type(e).__name__} {e!r}")
+            txs = None
+        self.loaded[card_final] = pack_records(txs) if txs is not None else None
+        return txs
+
+    def unused(self) -> List[str]:
+        return sorted(set(self.org_files) - set(self.loaded))
+
+
+def _wait_write(card_final: str, future: Future) -> bool:
+    """Espera a gravação dos relatórios feita no pool; erro é registrado e não derruba os demais cartões."""
+    try:
+        _, worker_metrics = future.result()
+        METRICS.merge(worker_metrics)
+        return True
+    except Exception as e:
+        logging.error(f"Falha ao gravar o relatório do cartão {card_final}: {e!r}")
+        return False
+
+
+def _run_streaming(
+    btg_file: Path,
+    org_files: Dict[str, Path],
+    out_dir: str,
+    pdf_password: Optional[str],
+    workers: int,
+    pool: Optional[ProcessPoolExecutor],
+    cache: Optional[ParseCache],
+    options: MatchOptions,
+    incremental: Optional[IncrementalState] = None,
+    strict: bool = False,
+    formats: Sequence[str] = DEFAULT_FORMATS,
+    pdf_backend: str = DEFAULT_BACKEND,
+) -> Dict[str, CardMatch]:
+    """
+    Cada cartão do BTG é conciliado e tem o Excel gravado assim que a sua seção termina,
+    enquanto as páginas seguintes ainda estão sendo lidas. Com pool, a gravação do Excel
+    também vai para os processos. Falha num arquivo não derruba o restante.
+    """
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    loader = _OrganizeLoader(org_files, pdf_password, cache, pool, pdf_backend)
+    results: Dict[str, CardMatch] = {}
+    reports: Dict[str, List[Path]] = {}
+    writes: Dict[str, Future] = {}
+    warned = set()
+
+    for card_final, btg_txs in _iter_btg_batches(btg_file, pdf_password, workers, cache, strict, pdf_backend):
+        org_file = org_files.get(card_final)
+        if not org_file:
+            if card_final not in warned:
+                warned.add(card_final)
+                _warn_missing_organize(card_final)
+            continue
+
+        org_txs = loader.get(card_final)
+        if org_txs is None:
+            continue
+
+        result = _reconcile_card(card_final, btg_txs, org_txs, org_file, options, incremental)
+        if result is None:
+            continue
+
+        results[card_final] = result
+        previous = writes.pop(card_final, None)
+        if previous is not None:
+            # cartão reapareceu no BTG: a gravação anterior termina antes de sobrescrever/apagar
+            _wait_write(card_final, previous)
+        with METRICS.stage("report", key=card_final):
+            report = build_card_report(card_final, result)
+        # os pares casados não entram no relatório: soltar os registros (memória do maior cartão,
+        # não do extrato inteiro)
+        result.matched_pairs = []
+        if report is not None:
+            reports[card_final] = report_paths(card_final, out_dir, formats)
+            if pool is not None:
+                writes[card_final] = pool.submit(
+                    call_in_worker, METRICS.enabled, write_card_outputs, report, out_dir, formats
+                )
+            else:
+                write_card_outputs(report, out_dir, formats)
+        elif card_final in reports:
+            # cartão reapareceu no BTG e as diferenças sumiram: relatório anterior não vale mais
+            for path in reports.pop(card_final):
+                path.unlink(missing_ok=True)
+
+        logging.info(
+            f"[{len(results)}] Cartão {card_final} conciliado: "
+            f"incluir={len(result.missing_in_organize)} excluir={len(result.extra_in_organize)}"
+        )
+
+    for card_final, future in writes.items():
+        if not _wait_write(card_final, future):
+            reports.pop(card_final, None)
+
+    for card_final in loader.unused():
+        logging.debug(f"[Organize] Cartão {card_final} não aparece no BTG. Ignorando {org_files[card_final].name}.")
+
+    logging.info(f"Relatórios gerados: {len(reports)}")
+    return {card: results[card] for card in sorted(results)}
+
+
+def run_pipeline(
+    btg_file: Path,
+    organize_dir: Path,
+    out_dir: str,
+    pdf_password: Optional[str] = None,
+    workers: int = 1,
+    jobs: int = 1,
+    cache: Optional[ParseCache] = None,
+    engine: str = "python",
+    tolerance_cents: int = 0,
+    tolerance_rel: float = 0.0,
+    state_dir: Optional[Path] = None,
+    strict: bool = False,
+    formats: Sequence[str] = DEFAULT_FORMATS,
+    pdf_backend: str = DEFAULT_BACKEND,
+) -> Dict[str, CardMatch]:
+    """
+    BTG -> Organize (1 PDF por cartão) -> conciliação por cartão -> relatórios, em streaming:
+    o relatório de um cartão sai assim que a sua seção no BTG termina.
+    jobs > 1: os PDFs do Organize são lidos num pool de processos enquanto o BTG é lido.
+    cache: transações já extraídas de um PDF idêntico são reaproveitadas sem abrir o PDF.
+    engine: motor de conciliação ("python" ou "numpy").
+    tolerance_cents/tolerance_rel: tolerância de valor (0 = só valor exato).
+    state_dir: modo incremental; guarda o estado de cada cartão em state_dir/<nome do PDF do BTG>
+    e, na execução seguinte, só concilia o que mudou no Organize.
+    strict: falha ao ler o PDF do BTG levanta exceção em vez de só ir para o log (modo em lote).
+    formats: saídas do relatório ("xlsx", "csv", "jsonl", "parquet"); as linhas são montadas uma vez.
+    pdf_backend: extrator de PDF ("pdfplumber", "pdfminer", "pymupdf" ou "auto"); entra na chave do cache.
+    Os `CardMatch` devolvidos não guardam `matched_pairs`: os registros casados são soltos
+    assim que o relatório do cartão é montado.
+    """
+    pdf_backend = resolve_backend(pdf_backend)
+    org_files = find_organize_files(organize_dir)
+    options = MatchOptions(engine=engine, tolerance_cents=tolerance_cents, tolerance_rel=tolerance_rel)
+    incremental = IncrementalState(state_dir, cycle=btg_file.stem) if state_dir is not None else None
+
+    # senha lembrada só vale dentro desta execução (no lote, cada job começa do zero)
+    with password_scope():
+        if jobs > 1 and org_files:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(org_files))) as pool:
+                try:
+                    return _run_streaming(
+                        btg_file, org_files, out_dir, pdf_password, workers, pool, cache, options, incremental,
+                        strict, formats, pdf_backend,
+                    )
+                finally:
+                    # PDFs do Organize de cartões que não aparecem no BTG: não precisa esperar
+                    pool.shutdown(wait=True, cancel_futures=True)
+
+        return _run_streaming(
+            btg_file, org_files, out_dir, pdf_password, workers, None, cache, options, incremental, strict, formats,
+            pdf_backend,
+        )
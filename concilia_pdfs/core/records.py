@@ -0,0 +1,201 @@
+# concilia_pdfs/core/records.py
+from __future__ import annotations
+
+import json
+import sys
+import zlib
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from concilia_pdfs.core.models import Transaction
+
+Q = Decimal("0.01")
+
+
+class Source(str, Enum):
+    """Enum para identificar a origem da transação (fica aqui, sem pydantic, para os parsers)."""
+    BTG = "BTG"
+    ORGANIZE = "ORGANIZE"
+
+
+def to_cents(amount: Decimal) -> int:
+    """Decimal em BRL -> centavos inteiros (mesmo arredondamento do `_q` da conciliação)."""
+    return int(amount.quantize(Q).scaleb(2))
+
+
+def from_cents(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+@dataclass(slots=True)
+class TxRecord:
+    """
+    Representação interna e compacta de uma transação (parser -> conciliação -> relatório).
+
+    Valor em centavos inteiros, data como ordinal e cartão/fonte internados.
+    Expõe `tx_date`, `amount` e `amount_abs` com a mesma semântica do `Transaction`,
+    então o relatório lê os dois tipos sem distinção. O `Transaction` (pydantic)
+    continua sendo a fronteira pública validada: use `to_transaction`/`from_transaction`.
+    """
+    card_final: str
+    source: str
+    date_ord: int
+    cents: int
+    description_raw: str
+    description_norm: str
+    foreign_currency: Optional[str] = None
+    foreign_amount: Optional[Decimal] = None
+    fx_rate_brl: Optional[Decimal] = None
+    raw_lines: Tuple[str, ...] = ()
+
+    @property
+    def currency(self) -> str:
+        return "BRL"
+
+    @property
+    def tx_date(self) -> date:
+        return date.fromordinal(self.date_ord)
+
+    @property
+    def amount(self) -> Decimal:
+        return from_cents(self.cents)
+
+    @property
+    def amount_abs(self) -> Decimal:
+        return from_cents(abs(self.cents))
+
+    @classmethod
+    def from_transaction(cls, tx: "Transaction") -> "TxRecord":
+        source = tx.source.value if hasattr(tx.source, "value") else str(tx.source)
+        return cls(
+            card_final=sys.intern(tx.card_final),
+            source=sys.intern(source),
+            date_ord=tx.tx_date.toordinal(),
+            cents=to_cents(tx.amount),
+            description_raw=tx.description_raw,
+            description_norm=tx.description_norm,
+            foreign_currency=tx.foreign_currency,
+            foreign_amount=tx.foreign_amount,
+            fx_rate_brl=tx.fx_rate_brl,
+            raw_lines=tuple(tx.raw_lines),
+        )
+
+    def to_transaction(self) -> "Transaction":
+        from concilia_pdfs.core.models import Transaction
+
+        return Transaction(
+            card_final=self.card_final,
+            source=self.source,
+            tx_date=self.tx_date,
+            description_raw=self.description_raw,
+            description_norm=self.description_norm,
+            amount=self.amount,
+            foreign_currency=self.foreign_currency,
+            foreign_amount=self.foreign_amount,
+            fx_rate_brl=self.fx_rate_brl,
+            raw_lines=list(self.raw_lines),
+        )
+
+
+def make_record(
+    card_final: str,
+    source: str,
+    tx_date: date,
+    description_raw: str,
+    description_norm: str,
+    amount: Decimal,
+    foreign_currency: Optional[str] = None,
+    foreign_amount: Optional[Decimal] = None,
+    raw_lines: Tuple[str, ...] = (),
+) -> TxRecord:
+    """Construtor usado pelos parsers (interna cartão/fonte, converte valor e data)."""
+    return make_record_cents(
+        card_final, source, tx_date, description_raw, description_norm, to_cents(amount),
+        foreign_currency=foreign_currency,
+        foreign_amount=foreign_amount,
+        raw_lines=raw_lines,
+    )
+
+
+def make_record_cents(
+    card_final: str,
+    source: str,
+    tx_date: date,
+    description_raw: str,
+    description_norm: str,
+    cents: int,
+    foreign_currency: Optional[str] = None,
+    foreign_amount: Optional[Decimal] = None,
+    raw_lines: Tuple[str, ...] = (),
+) -> TxRecord:
+    """Como `make_record`, com o valor já em centavos (ex.: vindo de `parse_brl_cents`)."""
+    return TxRecord(
+        card_final=sys.intern(card_final),
+        source=sys.intern(source),
+        date_ord=tx_date.toordinal(),
+        cents=cents,
+        description_raw=description_raw,
+        description_norm=description_norm,
+        foreign_currency=foreign_currency,
+        foreign_amount=foreign_amount,
+        raw_lines=raw_lines,
+    )
+
+
+def _dec(value: Optional[Decimal]) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def _undec(value: Optional[str]) -> Optional[Decimal]:
+    return Decimal(value) if value is not None else None
+
+
+def record_row(r: TxRecord) -> list:
+    """Linha JSON de um registro (formato do cache em disco)."""
+    return [
+        r.card_final,
+        r.source,
+        r.date_ord,
+        r.cents,
+        r.description_raw,
+        r.description_norm,
+        r.foreign_currency,
+        _dec(r.foreign_amount),
+        _dec(r.fx_rate_brl),
+        r.raw_lines,
+    ]
+
+
+def row_json(r: TxRecord) -> str:
+    return json.dumps(record_row(r), ensure_ascii=False, separators=(",", ":"))
+
+
+def pack_records(records: Iterable[TxRecord]) -> bytes:
+    """Registros -> JSON compactado (zlib); bem menor que os objetos em memória."""
+    return zlib.compress(("[" + ",".join(map(row_json, records)) + "]").encode("utf-8"))
+
+
+def unpack_records(blob: bytes) -> List[TxRecord]:
+    rows = json.loads(zlib.decompress(blob).decode("utf-8"))
+    return [
+        TxRecord(
+            card_final=sys.intern(card_final),
+            source=sys.intern(source),
+            date_ord=date_ord,
+            cents=cents,
+            description_raw=description_raw,
+            description_norm=description_norm,
+            foreign_currency=foreign_currency,
+            foreign_amount=_undec(foreign_amount),
+            fx_rate_brl=_undec(fx_rate_brl),
+            raw_lines=tuple(raw_lines),
+        )
+        for (
+            card_final, source, date_ord, cents, description_raw, description_norm,
+            foreign_currency, foreign_amount, fx_rate_brl, raw_lines,
+        ) in rows
+    ]
@@ -3,14 +3,26 @@ from __future__ import annotations
 
 import re
 import logging
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
-from typing import Iterator, Optional, List, Dict, Any, Tuple
-
-from concilia_pdfs.core.models import Transaction, Source
-from concilia_pdfs.utils.normalization import normalize_text, parse_brl_value, parse_date_d_mon
+from itertools import chain, repeat
+from operator import itemgetter
+from typing import TYPE_CHECKING, Deque, Iterable, Iterator, Optional, List, Dict, Any, NamedTuple, Tuple, Union
+
+from concilia_pdfs.core.records import Source, TxRecord, make_record_cents, pack_records, unpack_records
+from concilia_pdfs.utils.memory import iter_pages
+from concilia_pdfs.utils.metrics import METRICS, call_in_worker
+from concilia_pdfs.utils.normalization import normalize_text, parse_brl_cents, parse_brl_value, parse_date
+from concilia_pdfs.utils.pdf_backends import DEFAULT_BACKEND
 from concilia_pdfs.utils.pdf_open import open_pdf
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+if TYPE_CHECKING:
+    import numpy as np
+
+    from concilia_pdfs.core.models import Transaction
 
 YEAR_RE = re.compile(r"de\s+(20\d{2})|Fatura\s+.*?(20\d{2})", re.IGNORECASE)
 
@@ -34,6 +46,20 @@ INTERNATIONAL_BASE_RE = re.compile(
     re.IGNORECASE,
 )
 
+# Uma passada por linha: as três formas acima numa alternância, com a mesma precedência
+# (internacional, crédito, débito); `lastgroup` diz qual casou
+TX_LINE_RE = re.compile(
+    "|".join(
+        f"(?P<{kind}>{rx.pattern})"
+        for kind, rx in (("international", INTERNATIONAL_BASE_RE), ("credit", TX_CREDIT_RE), ("debit", TX_DEBIT_RE))
+    ),
+    re.IGNORECASE,
+)
+# índices dos grupos de cada forma dentro do TX_LINE_RE (logo depois do grupo nomeado)
+_TX_LINE_FIELDS = {
+    kind: tuple(range(TX_LINE_RE.groupindex[kind] + 1, TX_LINE_RE.groupindex[kind] + 1 + rx.groups))
+    for kind, rx in (("international", INTERNATIONAL_BASE_RE), ("credit", TX_CREDIT_RE), ("debit", TX_DEBIT_RE))
+}
 
 CONVERSION_RE = re.compile(
     r"Convers[aã]o\s+para\s+Real\b.*?(?:R\$\s*)?(-?[\d.,]+)",
@@ -43,6 +69,35 @@ CONVERSION_RE = re.compile(
 CONVERSION_WORD_RE = re.compile(r"Convers[aã]o\s+para\s+Real\b", re.IGNORECASE)
 BRL_VALUE_IN_LINE_RE = re.compile(r"(?:R\$\s*)?(-?[\d]{1,3}(?:\.[\d]{3})*,[\d]{2}|-?[\d]+,[\d]{2})")
 
+# Quantas linhas depois da compra internacional procuramos a "Conversão para Real"
+INTERNATIONAL_LOOKAHEAD = 15
+
+# Vão entre colunas: só na faixa central da página, com largura mínima (pt), palavras
+# suficientes dos dois lados e coluna da direita alinhada à esquerda (tolerância em pt).
+# Até GUTTER_MAX_CROSSING das linhas podem atravessar o vão (título, cabeçalho do cartão, notas)
+# e cada lado precisa de GUTTER_MIN_TX_LINES linhas que começam com data ("10 Fev ...").
+GUTTER_REGION = (0.25, 0.75)
+GUTTER_MAX_CROSSING = 0.25
+GUTTER_MIN_WIDTH = 8
+GUTTER_MIN_WORDS = 3
+GUTTER_MIN_TX_LINES = 3
+GUTTER_ALIGN_TOL = 2.0
+
+# Início de lançamento numa linha de palavras: dia com 2 dígitos seguido do mês abreviado
+DAY_WORD_RE = re.compile(r"\d{2}")
+MONTH_WORD_RE = re.compile(r"[^\W\d_]{3}")
+
+# Em modo paralelo, cada worker recebe ~4 fatias para balancear páginas lentas/rápidas
+PAGE_CHUNKS_PER_WORKER = 4
+
+
+class PageLine(NamedTuple):
+    """Linha agrupada de uma página (um trecho de coluna): posição e texto."""
+    top: float
+    x0: float
+    x1: float
+    text: str
+
 
 def _extract_year(text: str) -> int:
     m = YEAR_RE.search(text or "")
@@ -53,201 +108,516 @@ def _extract_year(text: str) -> int:
     return date.today().year
 
 
-def _cluster_words_into_lines_split_columns(
+def _lines_text(lines: List[PageLine]) -> str:
+    return "\n".join(ln.text for ln in lines)
+
+
+def _detect_year(
+    pages: Iterator[List[PageLine]],
+) -> Tuple[int, List[List[PageLine]]]:
+    """
+    Detecta o ano da fatura a partir das linhas JÁ agrupadas das primeiras páginas.
+    Consome páginas do iterador só até achar o ano (normalmente a 1ª página) e devolve
+    as páginas consumidas para que o parse continue a partir delas, sem reextrair nada.
+    """
+    consumed: List[List[PageLine]] = []
+    for lines in pages:
+        consumed.append(lines)
+        m = YEAR_RE.search(_lines_text(lines))
+        if m:
+            return int(m.group(1) or m.group(2)), consumed
+    return date.today().year, consumed
+
+
+def _row_bounds(tops: List[float], y_tol: float) -> List[Tuple[int, int]]:
+    """
+    Faixas [início, fim) das linhas em `tops` (ordenado). Uma linha vai até a última
+    palavra com top - top_da_primeira <= y_tol, e a seguinte recomeça dali.
+    """
+    bounds: List[Tuple[int, int]] = []
+    n = len(tops)
+    start = 0
+    while start < n:
+        anchor = tops[start]
+        end = bisect_right(tops, anchor + y_tol, start)
+        # a busca soma e a regra original subtrai: acerta a borda no arredondamento
+        while end < n and tops[end] - anchor <= y_tol:
+            end += 1
+        while end > start + 1 and tops[end - 1] - anchor > y_tol:
+            end -= 1
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _find_gutters(
+    x0: "np.ndarray",
+    x1: "np.ndarray",
+    row_id: "np.ndarray",
+    date_start: "np.ndarray",
+    n_rows: int,
+    page_x0: float,
+    page_x1: float,
+) -> List[float]:
+    """
+    Posições x que separam colunas, pela distribuição horizontal das palavras.
+
+    Conta quantas palavras cobrem cada faixa de 1pt da página; um vão candidato é uma
+    sequência de faixas na região central com pelo menos GUTTER_MIN_WIDTH, atravessada
+    por no máximo GUTTER_MAX_CROSSING das linhas. As linhas que atravessam o vão (títulos,
+    "Lançamentos do cartão Final NNNN", notas de rodapé) são ignoradas na validação e
+    precisam ser minoria diante das linhas com palavras dos dois lados.
+    Cada vão só vale se sobrarem GUTTER_MIN_WORDS palavras de cada lado e se a coluna
+    à direita for alinhada à esquerda (como os lançamentos do BTG): em pelo menos metade
+    das linhas com texto depois do vão, uma palavra começa na borda dele. Valores
+    alinhados à direita numa página de coluna única não contam.
+    Por fim, os dois lados precisam ter lançamentos de verdade: GUTTER_MIN_TX_LINES linhas
+    começando com data (`date_start`) à esquerda e na borda da direita. Assim a coluna de
+    valores ("R$" alinhado à esquerda) de uma página de coluna única não vira vão. Sem vão: [].
+    """
+    import numpy as np
+
+    n_bins = int(np.ceil(page_x1 - page_x0))
+    if n_bins <= 0 or not len(x0):
+        return []
+
+    start = np.clip(np.floor(x0 - page_x0).astype(np.int64), 0, n_bins)
+    end = np.clip(np.ceil(x1 - page_x0).astype(np.int64), 0, n_bins)
+    delta = np.bincount(start, minlength=n_bins + 1) - np.bincount(end, minlength=n_bins + 1)
+    coverage = np.cumsum(delta)[:n_bins]
+
+    lo = int(np.ceil(n_bins * GUTTER_REGION[0]))
+    hi = int(np.floor(n_bins * GUTTER_REGION[1]))
+    free = np.zeros(n_bins + 2, dtype=np.int8)
+    free[lo + 1:hi + 1] = coverage[lo:hi] <= int(n_rows * GUTTER_MAX_CROSSING)
+    edges = np.flatnonzero(np.diff(free))
+    run_starts, run_ends = edges[0::2], edges[1::2]
+
+    gutters: List[float] = []
+    left_edge = -np.inf
+    for a, b in zip(run_starts.tolist(), run_ends.tolist()):
+        if b - a < GUTTER_MIN_WIDTH:
+            continue
+        split = page_x0 + (a + b) / 2.0
+        # linhas que atravessam o vão ficam fora da validação
+        crossing_rows = np.unique(row_id[(x0 < split) & (x1 > split)])
+        kept = ~np.isin(row_id, crossing_rows)
+        right = kept & (x0 >= split)
+        left = kept & (x1 <= split) & (x0 >= left_edge)
+        if np.count_nonzero(left) < GUTTER_MIN_WORDS or np.count_nonzero(right) < GUTTER_MIN_WORDS:
+            continue
+        both_sides = np.intersect1d(row_id[left], row_id[right])
+        if 2 * crossing_rows.size >= both_sides.size:
+            continue
+        edge = page_x0 + b
+        aligned = right & (x0 < edge + GUTTER_ALIGN_TOL)
+        if 2 * np.unique(row_id[aligned]).size < np.unique(row_id[right]).size:
+            continue
+        dated_left = np.unique(row_id[left & date_start]).size
+        dated_right = np.unique(row_id[aligned & date_start]).size
+        if min(dated_left, dated_right) >= GUTTER_MIN_TX_LINES:
+            gutters.append(split)
+            left_edge = split
+    return gutters
+
+
+def _date_starts(
     words: List[Dict[str, Any]],
-    page_mid_x: float,
+    order: "np.ndarray",
+    x0: "np.ndarray",
+    row_id: "np.ndarray",
+) -> "np.ndarray":
+    """Palavras (na ordem de `order`) que abrem um lançamento: dia e, logo à direita na linha, o mês."""
+    import numpy as np
+
+    by_x = np.lexsort((x0, row_id))
+    texts = [words[i]["text"] for i in order[by_x].tolist()]
+    is_day = np.fromiter((DAY_WORD_RE.fullmatch(t) is not None for t in texts), dtype=bool, count=len(texts))
+    is_month = np.fromiter((MONTH_WORD_RE.fullmatch(t) is not None for t in texts), dtype=bool, count=len(texts))
+    starts = np.zeros(len(texts), dtype=bool)
+    starts[:-1] = is_day[:-1] & is_month[1:] & (row_id[by_x][:-1] == row_id[by_x][1:])
+    out = np.empty_like(starts)
+    out[by_x] = starts
+    return out
+
+
+def _cluster_words_into_lines(
+    words: List[Dict[str, Any]],
+    page_x0: float,
+    page_x1: float,
     y_tol: float = 3.0,
-) -> List[Dict[str, Any]]:
+) -> List[PageLine]:
     """
-    Agrupa words por linha (top) e, dentro de cada linha, SEPARA por coluna (esq/dir) usando page_mid_x.
+    Agrupa words por linha (top) e, dentro de cada linha, SEPARA por coluna, com os vãos
+    entre colunas detectados na própria página (`_find_gutters`). Sem vão detectado, divide
+    no meio da página, como sempre foi.
     Isso evita concatenar duas transações na mesma "linha".
-    Retorna linhas com: top, x0, x1, text
+    Coordenadas em arrays; retorna `PageLine` ordenadas por top e x0.
     """
     if not words:
         return []
 
-    words = sorted(words, key=lambda w: (float(w["top"]), float(w["x0"])))
+    import numpy as np
+
+    n = len(words)
+    top, x0, x1 = (np.fromiter(map(itemgetter(key), words), dtype=np.float64, count=n) for key in ("top", "x0", "x1"))
+
+    # ordem estável por (top, x0), como o sorted() de antes
+    order = np.lexsort((x0, top))
+    top, x0, x1 = top[order], x0[order], x1[order]
+    rows = _row_bounds(top.tolist(), y_tol)
+    row_id = np.repeat(np.arange(len(rows)), [end - start for start, end in rows])
+
+    gutters = _find_gutters(x0, x1, row_id, _date_starts(words, order, x0, row_id), len(rows), page_x0, page_x1)
+    METRICS.count("btg.gutters", len(gutters))
+    if not gutters:
+        gutters = [(page_x0 + page_x1) / 2.0]
+
+    # reordena cada linha por coluna e x0 (estável: empates mantêm a ordem por top)
+    column = np.searchsorted(np.asarray(gutters), x0, side="right")
+    within = np.lexsort((x0, column, row_id))
+    order, row_id, column = order[within], row_id[within], column[within]
+    # trechos = (linha, coluna) contíguos; x0 do trecho é o da 1ª palavra (ordenado por x0)
+    x0, x1 = x0[within], x1[within]
+    starts = np.flatnonzero(np.diff(row_id, prepend=-1) | np.diff(column, prepend=-1))
+    part_x0 = x0[starts].tolist()
+    part_x1 = np.maximum.reduceat(x1, starts).tolist()
+    bounds = starts.tolist() + [n]
+
+    texts = [words[i]["text"] for i in order.tolist()]
+    tops = top[within].tolist()
+
+    out: List[PageLine] = []
+    for k, (a, b) in enumerate(zip(bounds, bounds[1:])):
+        text = " ".join(texts[a:b]).strip()
+        if text:
+            out.append(PageLine(sum(tops[a:b]) / (b - a), part_x0[k], part_x1[k], text))
+
+    # Ordena por top e x0 para leitura natural
+    out.sort(key=lambda ln: (ln.top, ln.x0))
+    return out
 
-    line_groups: List[List[Dict[str, Any]]] = []
-    current: List[Dict[str, Any]] = []
-    current_top: Optional[float] = None
 
-    for w in words:
-        t = float(w["top"])
-        if current_top is None:
-            current_top = t
-            current = [w]
-            continue
+def _page_lines(page) -> List[PageLine]:
+    x0, y0, x1, y1 = page.bbox
+    page_number = getattr(page, "page_number", None)
 
-        if abs(t - current_top) <= y_tol:
-            current.append(w)
-        else:
-            line_groups.append(current)
-            current_top = t
-            current = [w]
+    with METRICS.stage("btg.extract", key=page_number):
+        words = page.extract_words(
+            keep_blank_chars=False,
+            use_text_flow=False,   # importante: evita “colar” colunas
+            x_tolerance=2,
+            y_tolerance=2,
+        ) or []
 
-    if current:
-        line_groups.append(current)
+    with METRICS.stage("btg.cluster", key=page_number):
+        lines = _cluster_words_into_lines(words, page_x0=x0, page_x1=x1, y_tol=3.0)
 
-    out: List[Dict[str, Any]] = []
+    METRICS.count("btg.pages")
+    METRICS.count("btg.words", len(words))
+    METRICS.count("btg.lines", len(lines))
+    return lines
 
-    for group in line_groups:
-        # divide por coluna
-        left = [w for w in group if float(w["x0"]) < page_mid_x]
-        right = [w for w in group if float(w["x0"]) >= page_mid_x]
 
-        for part in (left, right):
-            if not part:
-                continue
-            part = sorted(part, key=lambda w: float(w["x0"]))
-            text = " ".join(w["text"] for w in part).strip()
-            if not text:
-                continue
-            x0 = min(float(w["x0"]) for w in part)
-            x1 = max(float(w["x1"]) for w in part)
-            top = sum(float(w["top"]) for w in part) / len(part)
-            out.append({"top": top, "x0": x0, "x1": x1, "text": text})
+def _iter_page_lines(pdf) -> Iterator[List[PageLine]]:
+    """
+    Camada de extração: roda a análise de layout UMA vez por página.
+    O mesmo resultado alimenta detecção do ano, das seções de cartão e das transações.
+    Cada página é liberada logo depois de virar linhas (memória não cresce com o nº de páginas).
+    """
+    for page in iter_pages(pdf):
+        yield _page_lines(page)
+
+
+def _extract_page_range(
+    pdf_path: str,
+    pdf_password: Optional[str],
+    start: int,
+    stop: int,
+    backend: str = DEFAULT_BACKEND,
+) -> List[List[PageLine]]:
+    """Worker do modo paralelo: abre o PDF e extrai/agrupa as páginas [start, stop)."""
+    with open_pdf(pdf_path, password=pdf_password, backend=backend, source=Source.BTG.value) as pdf:
+        return [_page_lines(page) for page in iter_pages(pdf, start, stop)]
+
+
+def _page_ranges(n_pages: int, n_chunks: int) -> List[Tuple[int, int]]:
+    size = max(1, -(-n_pages // max(1, n_chunks)))
+    return [(start, min(start + size, n_pages)) for start in range(0, n_pages, size)]
+
+
+def _iter_page_lines_parallel(
+    pdf_path: str,
+    pdf_password: Optional[str],
+    workers: int,
+    backend: str = DEFAULT_BACKEND,
+    data: Optional[bytes] = None,
+) -> Iterator[List[PageLine]]:
+    """
+    Extrai e agrupa as páginas num pool de processos.
+    As fatias voltam NA ORDEM das páginas, então o passo sequencial (costura) é o mesmo do modo serial.
+    """
+    with open_pdf(pdf_path, password=pdf_password, backend=backend, source=Source.BTG.value, data=data) as pdf:
+        n_pages = len(pdf.pages)
+
+    ranges = _page_ranges(n_pages, workers * PAGE_CHUNKS_PER_WORKER)
+    logging.debug(f"[BTG] modo paralelo: paginas={n_pages} workers={workers} fatias={len(ranges)}")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = pool.map(
+            call_in_worker,
+            repeat(METRICS.enabled, len(ranges)),
+            repeat(_extract_page_range, len(ranges)),
+            [pdf_path] * len(ranges),
+            [pdf_password] * len(ranges),
+            [start for start, _ in ranges],
+            [stop for _, stop in ranges],
+            repeat(backend, len(ranges)),
+        )
+        for chunk, worker_metrics in chunks:
+            METRICS.merge(worker_metrics)
+            yield from chunk
+
+
+def _extract_brl_from_line(line: str) -> Optional[int]:
+    """Primeiro valor em BRL da linha, em centavos."""
+    m = BRL_VALUE_IN_LINE_RE.search(line or "")
+    if not m:
+        return None
+    return parse_brl_cents(m.group(1))
 
-    # Ordena por top e x0 para leitura natural
-    return sorted(out, key=lambda ln: (float(ln["top"]), float(ln["x0"])))
 
+def _records_from_pages(
+    pages: Iterable[List[PageLine]],
+    pdf_year: int,
+) -> Iterator[TxRecord]:
+    """
+    Passo sequencial (costura): aplica o contexto de cartão e as compras internacionais
+    pendentes sobre o fluxo de linhas, atravessando as quebras de página.
+    """
+    texts = (ln.text for lines in pages for ln in lines)
+    # acertos por regex: contados em variáveis locais e enviados ao METRICS uma vez só
+    hits = dict.fromkeys(("card_section", "international", "credit", "debit"), 0)
+    try:
+        yield from _stitch_lines(texts, pdf_year, hits)
+    finally:
+        for name, n in hits.items():
+            METRICS.count(f"btg.regex.{name}", n)
+
+
+@dataclass(slots=True)
+class _PendingInternational:
+    """
+    Compra internacional esperando a “Conversão para Real” nas próximas `budget` linhas
+    (que podem atravessar a quebra de página). Recebe cada linha seguinte uma vez, via `feed`.
+    """
+    card_final: str
+    date_str: str
+    desc_raw: str
+    currency: str
+    foreign_str: str
+    raw_lines: List[str]
+    budget: int = INTERNATIONAL_LOOKAHEAD
+    value_on_next_line: bool = False
+    cents: Optional[int] = None
+
+    @property
+    def waiting(self) -> bool:
+        return self.cents is None and self.budget > 0
+
+    def feed(self, line: str, facts: Tuple[Optional[int], bool, Optional[int]]) -> None:
+        conversion_cents, conversion_without_value, line_cents = facts
+        self.raw_lines.append(line)
+        self.budget -= 1
+
+        # caso 1: já veio “Conversão para Real ... 110,88”
+        if conversion_cents is not None:
+            self.cents = conversion_cents
+        # caso 2: veio só “Conversão para Real -” e o valor está na próxima linha
+        elif conversion_without_value:
+            self.value_on_next_line = True
+        elif self.value_on_next_line and line_cents is not None:
+            self.cents = line_cents
+
+    def record(self, pdf_year: int) -> Optional[TxRecord]:
+        if self.cents is None:
+            return None
+        tx_date = parse_date(self.date_str, pdf_year)
+        if not tx_date:
+            return None
+        return make_record_cents(
+            card_final=self.card_final,
+            source=Source.BTG.value,
+            tx_date=tx_date,
+            description_raw=f"{self.desc_raw.strip()} (Internacional)",
+            description_norm=normalize_text(self.desc_raw),
+            cents=self.cents,
+            foreign_currency=self.currency,
+            foreign_amount=parse_brl_value(self.foreign_str),
+            raw_lines=tuple(self.raw_lines),
+        )
+
+
+def _conversion_facts(line: str, need_value: bool) -> Tuple[Optional[int], bool, Optional[int]]:
+    """
+    O que uma linha diz às compras internacionais pendentes (calculado uma vez por linha):
+    valor da “Conversão para Real”, se a conversão veio sem valor, e o 1º valor em BRL da linha
+    (este só quando alguma pendente espera o valor na linha seguinte, ou a linha fala em conversão).
+    """
+    if "onver" in line.lower():
+        mc = CONVERSION_RE.search(line)
+        conversion_cents = parse_brl_cents(mc.group(1)) if mc else None
+        if conversion_cents is not None:
+            return conversion_cents, False, None
+        line_cents = _extract_brl_from_line(line)
+        return None, line_cents is None and CONVERSION_WORD_RE.search(line) is not None, line_cents
+    return None, False, _extract_brl_from_line(line) if need_value else None
 
-def _page_lines(page) -> List[Dict[str, Any]]:
-    x0, y0, x1, y1 = page.bbox
-    mid = (x0 + x1) / 2.0
 
-    words = page.extract_words(
-        keep_blank_chars=False,
-        use_text_flow=False,   # importante: evita “colar” colunas
-        x_tolerance=2,
-        y_tolerance=2,
-    ) or []
+def _stitch_lines(texts: Iterator[str], pdf_year: int, hits: Dict[str, int]) -> Iterator[TxRecord]:
+    """
+    Máquina de estados de uma passada: cada linha é lida uma vez.
 
-    return _cluster_words_into_lines_split_columns(words, page_mid_x=mid, y_tol=3.0)
+    Linhas de lançamento começam com a data ("12 Fev"): um teste barato no 1º token decide
+    se vale rodar TX_LINE_RE (internacional | crédito | débito, nessa precedência). A seção
+    de cartão pode aparecer no meio de uma linha agrupada, então o filtro dela é "nal" no texto.
+    Enquanto houver compra internacional esperando a conversão, os registros seguintes ficam
+    numa fila, para sair na ordem do PDF.
+    """
+    current_card_final: Optional[str] = None
+    waiting: List[_PendingInternational] = []
+    queue: Deque[Union[TxRecord, _PendingInternational]] = deque()
+
+    for line in texts:
+        if waiting:
+            facts = _conversion_facts(line, any(intl.value_on_next_line for intl in waiting))
+            for intl in waiting:
+                intl.feed(line, facts)
+            waiting = [intl for intl in waiting if intl.waiting]
+            # fila: sai tudo até a próxima compra internacional ainda pendente
+            while queue and not (isinstance(queue[0], _PendingInternational) and queue[0].waiting):
+                item = queue.popleft()
+                rec = item.record(pdf_year) if isinstance(item, _PendingInternational) else item
+                if rec is not None:
+                    yield rec
+
+        # contexto do cartão
+        if "nal" in line.lower():
+            msec = CARD_SECTION_RE.search(line)
+            if msec:
+                hits["card_section"] += 1
+                current_card_final = msec.group(1)
+                continue
 
-def _extract_brl_from_line(line: str) -> Optional[float]:
-    m = BRL_VALUE_IN_LINE_RE.search(line or "")
-    if not m:
-        return None
-    return parse_brl_value(m.group(1))
+        if not current_card_final or not line[:2].isdigit():
+            continue
 
+        m = TX_LINE_RE.match(line)
+        if not m:
+            continue
+        kind = m.lastgroup
+        hits[kind] += 1
+        fields = m.group(*_TX_LINE_FIELDS[kind])
+
+        if kind == "international":
+            # pega o BRL da conversão nas próximas linhas
+            date_str, desc_raw, f_currency, f_amount_str = fields
+            intl = _PendingInternational(current_card_final, date_str, desc_raw, f_currency, f_amount_str, [line])
+            waiting.append(intl)
+            queue.append(intl)
+            continue
 
-def parse_btg_pdf(pdf_path: str, pdf_password: Optional[str] = None) -> Iterator[Transaction]:
+        date_str, desc_raw, amount_str = fields
+        tx_date = parse_date(date_str, pdf_year)
+        amt = parse_brl_cents(amount_str)
+        if tx_date and amt is not None:
+            rec = make_record_cents(
+                card_final=current_card_final,
+                source=Source.BTG.value,
+                tx_date=tx_date,
+                description_raw=desc_raw.strip(),
+                description_norm=normalize_text(desc_raw),
+                # crédito (negativo), débito (positivo)
+                cents=-amt if kind == "credit" else amt,
+                raw_lines=(line,),
+            )
+            if queue:
+                queue.append(rec)
+            else:
+                yield rec
+
+    # fim do PDF: internacionais sem conversão ficam de fora
+    for item in queue:
+        rec = item.record(pdf_year) if isinstance(item, _PendingInternational) else item
+        if rec is not None:
+            yield rec
+
+
+def parse_btg_records(
+    pdf_path: str,
+    pdf_password: Optional[str] = None,
+    workers: int = 1,
+    backend: str = DEFAULT_BACKEND,
+    data: Optional[bytes] = None,
+) -> Iterator[TxRecord]:
+    """
+    Caminho interno (em lote): produz `TxRecord`.
+    workers > 1: extração/agrupamento das páginas num pool de processos.
+    A saída é idêntica ao modo serial (a costura entre páginas é sempre sequencial).
+    backend: extrator de PDF (ver `utils.pdf_backends`).
+    data: bytes do PDF já lidos (ex.: pela chave do cache), para não ler o arquivo de novo.
+    """
     logging.info(f"Iniciando análise do PDF do BTG: {pdf_path}")
 
-    with open_pdf(pdf_path, password=pdf_password) as pdf:
-        full_text = "\n".join(page.extract_text(x_tolerance=2, y_tolerance=2) or "" for page in pdf.pages)
-        pdf_year = _extract_year(full_text)
-
-        current_card_final: Optional[str] = None
-
-        for page in pdf.pages:
-            lines = _page_lines(page)
-
-            i = 0
-            while i < len(lines):
-                line = lines[i]["text"]
-
-                # contexto do cartão
-                msec = CARD_SECTION_RE.search(line)
-                if msec:
-                    current_card_final = msec.group(1)
-                    i += 1
-                    continue
-
-                if not current_card_final:
-                    i += 1
-                    continue
-
-                # internacional (pega BRL da conversão)
-                mi = INTERNATIONAL_BASE_RE.match(line)
-                if mi:
-                    date_str, desc_raw, f_currency, f_amount_str = mi.groups()
-                    raw_lines = [line]
-
-                    brl_amount = None
-                    pending_next_value = False
-
-                    for j in range(1, 16):
-                        if i + j >= len(lines):
-                            break
-                        nxt = lines[i + j]["text"]
-                        raw_lines.append(nxt)
-
-                        # caso 1: já veio “Conversão para Real ... 110,88”
-                        mc = CONVERSION_RE.search(nxt)
-                        if mc:
-                            brl_amount = parse_brl_value(mc.group(1))
-                            if brl_amount is not None:
-                                break
-
-                        # caso 2: veio só “Conversão para Real -” e o valor está na próxima linha
-                        if CONVERSION_WORD_RE.search(nxt) and _extract_brl_from_line(nxt) is None:
-                            pending_next_value = True
-                            continue
-
-                        if pending_next_value:
-                            v = _extract_brl_from_line(nxt)
-                            if v is not None:
-                                brl_amount = v
-                                break
-
-
-                    if brl_amount is not None:
-                        tx_date = parse_date_d_mon(date_str, pdf_year)
-                        if tx_date:
-                            yield Transaction(
-                                card_final=current_card_final,
-                                source=Source.BTG,
-                                tx_date=tx_date,
-                                description_raw=f"{desc_raw.strip()} (Internacional)",
-                                description_norm=normalize_text(desc_raw),
-                                amount=brl_amount,
-                                foreign_currency=f_currency,
-                                foreign_amount=parse_brl_value(f_amount_str),
-                                raw_lines=raw_lines,
-                            )
-                    i += 1
-                    continue
-
-                # crédito (negativo)
-                mc = TX_CREDIT_RE.match(line)
-                if mc:
-                    date_str, desc_raw, amount_str = mc.groups()
-                    tx_date = parse_date_d_mon(date_str, pdf_year)
-                    amt = parse_brl_value(amount_str)
-                    if tx_date and amt is not None:
-                        yield Transaction(
-                            card_final=current_card_final,
-                            source=Source.BTG,
-                            tx_date=tx_date,
-                            description_raw=desc_raw.strip(),
-                            description_norm=normalize_text(desc_raw),
-                            amount=amt * -1,
-                            raw_lines=[line],
-                        )
-                    i += 1
-                    continue
-
-                # débito (positivo)
-                md = TX_DEBIT_RE.match(line)
-                if md:
-                    date_str, desc_raw, amount_str = md.groups()
-                    tx_date = parse_date_d_mon(date_str, pdf_year)
-                    amt = parse_brl_value(amount_str)
-                    if tx_date and amt is not None:
-                        yield Transaction(
-                            card_final=current_card_final,
-                            source=Source.BTG,
-                            tx_date=tx_date,
-                            description_raw=desc_raw.strip(),
-                            description_norm=normalize_text(desc_raw),
-                            amount=amt,
-                            raw_lines=[line],
-                        )
-                    i += 1
-                    continue
-
-                i += 1
+    if workers > 1:
+        pages = _iter_page_lines_parallel(pdf_path, pdf_password, workers, backend, data)
+        pdf_year, head = _detect_year(pages)
+        yield from _records_from_pages(chain(head, pages), pdf_year)
+    else:
+        with open_pdf(pdf_path, password=pdf_password, backend=backend, source=Source.BTG.value, data=data) as pdf:
+            pages = _iter_page_lines(pdf)
+            pdf_year, head = _detect_year(pages)
+            yield from _records_from_pages(chain(head, pages), pdf_year)
 
     logging.info(f"Finalizada a análise do PDF do BTG: {pdf_path}")
+
+
+def iter_card_batches(records: Iterable[TxRecord]) -> Iterator[Tuple[str, List[TxRecord]]]:
+    """
+    Agrupa o fluxo de registros do BTG em lotes por cartão, na ordem do PDF.
+    Um lote fecha quando chega um registro de outro cartão (a seção terminou).
+    Se um cartão reaparecer mais adiante, o lote é emitido de novo JUNTO com o anterior
+    (quem consome deve substituir o resultado desse cartão).
+    Os lotes já emitidos ficam só compactados (`pack_records`), não como objetos: a memória
+    acompanha o maior cartão, não o extrato inteiro.
+    """
+    emitted: Dict[str, bytes] = {}
+    card: Optional[str] = None
+    batch: List[TxRecord] = []
+
+    def close_batch(last: bool = False) -> List[TxRecord]:
+        full = unpack_records(emitted[card]) + batch if card in emitted else batch
+        if not last:
+            emitted[card] = pack_records(full)
+        return full
+
+    for rec in records:
+        if rec.card_final != card:
+            if card is not None:
+                yield card, close_batch()
+            card, batch = rec.card_final, []
+        batch.append(rec)
+
+    if card is not None:
+        yield card, close_batch(last=True)
+
+
+def parse_btg_pdf(
+    pdf_path: str,
+    pdf_password: Optional[str] = None,
+    workers: int = 1,
+    backend: str = DEFAULT_BACKEND,
+) -> Iterator[Transaction]:
+    """Fronteira pública: mesmas transações de `parse_btg_records`, como `Transaction` validado."""
+    for rec in parse_btg_records(pdf_path, pdf_password=pdf_password, workers=workers, backend=backend):
+        yield rec.to_transaction()
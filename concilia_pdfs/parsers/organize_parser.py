@@ -1,14 +1,20 @@
 # concilia_pdfs/parsers/organize_parser.py
+from __future__ import annotations
+
 import re
-from typing import Iterator, Optional
+from typing import TYPE_CHECKING, Iterator, Optional
 import logging
 from pathlib import Path
 
-from concilia_pdfs.core.models import Transaction, Source
-from concilia_pdfs.utils.normalization import normalize_text, parse_brl_value, parse_date
+from concilia_pdfs.core.records import Source, TxRecord, make_record_cents
+from concilia_pdfs.utils.memory import release_page
+from concilia_pdfs.utils.metrics import METRICS
+from concilia_pdfs.utils.normalization import normalize_many, parse_brl_cents, parse_date
+from concilia_pdfs.utils.pdf_backends import DEFAULT_BACKEND
 from concilia_pdfs.utils.pdf_open import open_pdf
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+if TYPE_CHECKING:
+    from concilia_pdfs.core.models import Transaction
 
 CARD_FINAL_FROM_FILENAME_RE = re.compile(r"final_(\d{4})", re.IGNORECASE)
 CARD_FINAL_FROM_TEXT_RE = re.compile(r"Final\s+(\d{4})", re.IGNORECASE)
@@ -19,6 +25,13 @@ ORGANIZE_LINE_RE = re.compile(
     r"^(\d{2}/\d{2}/\d{2,4})\s+(.+?)\s+R\$\s*(-?[\d.,]+)\s*$"
 )
 
+DATE_CELL_RE = re.compile(r"^\d{2}/\d{2}/\d{2,4}$")
+AMOUNT_CELL_RE = re.compile(r"^-?[\d.,]+$")
+
+# Layout do export do Organize, decidido uma vez por documento
+LAYOUT_TABLE = "table"
+LAYOUT_TEXT = "text"
+
 def _detect_card_final(filename: str, full_text: str) -> Optional[str]:
     # 1) nome do arquivo "1748.pdf"
     stem = Path(filename).stem.strip()
@@ -37,113 +50,222 @@ def _detect_card_final(filename: str, full_text: str) -> Optional[str]:
 
     return None
 
-def _create_transaction(
+def _create_record(
     card_final: str,
     date_str: str,
     desc_raw: str,
     amount_str: str,
-    raw_lines: list[str],
-) -> Optional[Transaction]:
+    raw_line: str,
+    description_norm: str,
+) -> Optional[TxRecord]:
     tx_date = parse_date(date_str)
-    amount = parse_brl_value(amount_str)
+    cents = parse_brl_cents(amount_str)
 
-    if tx_date is None or amount is None:
+    if tx_date is None or cents is None:
         return None
 
     # Organize vem invertido vs BTG -> normalizar invertendo
-    amount *= -1
-
-    return Transaction(
+    return make_record_cents(
         card_final=card_final,
-        source=Source.ORGANIZE,
+        source=Source.ORGANIZE.value,
         tx_date=tx_date,
         description_raw=desc_raw.strip(),
-        description_norm=normalize_text(desc_raw),
-        amount=amount,
-        raw_lines=raw_lines,
+        description_norm=description_norm,
+        cents=-cents,
+        raw_lines=(raw_line,),
     )
 
-def parse_organize_pdf(pdf_path: str, pdf_password: Optional[str] = None) -> Iterator[Transaction]:
+def _create_records(card_final: str, rows: list[tuple[str, str, str, str]]) -> list[TxRecord]:
+    """Linhas candidatas de uma página -> registros; as descrições são normalizadas em lote."""
+    norms = normalize_many(desc_raw for _, desc_raw, _, _ in rows)
+    transactions: list[TxRecord] = []
+    for (date_str, desc_raw, amount_str, raw_line), desc_norm in zip(rows, norms):
+        tx = _create_record(card_final, date_str, desc_raw, amount_str, raw_line, desc_norm)
+        if tx:
+            transactions.append(tx)
+    return transactions
+
+def _records_from_tables(card_final: str, tables: list) -> list[TxRecord]:
+    rows: list[tuple[str, str, str, str]] = []
+    for table in tables:
+        # pode ser tabela de cabeçalho (saldo/total). Só processa linhas que pareçam transação.
+        for row in table:
+            if not row or len(row) < 2:
+                continue
+
+            # data tem que ser dd/mm/yyyy
+            date_cell = (row[0] or "").strip()
+            if not DATE_CELL_RE.match(date_cell):
+                continue
+
+            # tenta achar valor em alguma célula
+            amount_cell = None
+            for cell in reversed(row):
+                if cell is None:
+                    continue
+                s = str(cell).strip()
+                if not s:
+                    continue
+                # pode vir "-19,99" ou "R$ -19,99"
+                s2 = s.replace("R$", "").strip()
+                if AMOUNT_CELL_RE.match(s2):
+                    amount_cell = s2
+                    break
+
+            if not amount_cell:
+                continue
+
+            # descrição: junta colunas do meio (ignorando categoria/colunas vazias)
+            mid = []
+            for c in row[1:-1]:
+                if c is None:
+                    continue
+                cs = str(c).strip()
+                if cs:
+                    mid.append(cs)
+            desc_cell = " ".join(mid).strip() if mid else (str(row[1] or "").strip())
+
+            if not desc_cell:
+                continue
+
+            rows.append((date_cell, desc_cell, amount_cell, str(row)))
+    transactions = _create_records(card_final, rows)
+    METRICS.count("organize.table_rows", sum(len(table) for table in tables))
+    METRICS.count("organize.regex.table", len(transactions))
+    return transactions
+
+
+def _records_from_text(card_final: str, page_text: str) -> list[TxRecord]:
+    rows: list[tuple[str, str, str, str]] = []
+    lines = page_text.splitlines()
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        m = ORGANIZE_LINE_RE.match(line)
+        if not m:
+            continue
+
+        date_str, desc_raw, amount_str = m.groups()
+        rows.append((date_str, desc_raw, amount_str, line))
+    transactions = _create_records(card_final, rows)
+    METRICS.count("organize.text_lines", len(lines))
+    METRICS.count("organize.regex.text", len(transactions))
+    return transactions
+
+
+class _PageTextCache:
+    """extract_text() de cada página no máximo UMA vez por documento."""
+
+    def __init__(self, pages):
+        self._pages = pages
+        self._texts: dict[int, str] = {}
+
+    def get(self, idx: int) -> str:
+        if idx not in self._texts:
+            self._texts[idx] = self._pages[idx].extract_text() or ""
+        return self._texts[idx]
+
+    def forget(self, idx: int) -> None:
+        self._texts.pop(idx, None)
+
+
+def _detect_card_from_pages(filename: str, texts: _PageTextCache, n_pages: int) -> tuple[Optional[str], str]:
+    """Nome do arquivo primeiro; só extrai texto (página a página) se o nome não resolver."""
+    card_final = _detect_card_final(filename, "")
+    if card_final:
+        return card_final, "nome do arquivo"
+
+    for idx in range(n_pages):
+        m = CARD_FINAL_FROM_TEXT_RE.search(texts.get(idx))
+        if m:
+            return m.group(1), f"texto da página {idx + 1}"
+    return None, ""
+
+
+def _probe_layout(card_final: str, pages, texts: _PageTextCache) -> tuple[Optional[str], int, list[TxRecord]]:
+    """
+    Decide UMA vez se o export é por tabela ou por texto.
+    Testa as páginas em ordem até uma delas produzir transações; devolve o layout,
+    o índice dessa página e as transações já extraídas dela (não são recalculadas).
+    """
+    for idx, page in enumerate(pages):
+        with METRICS.stage("organize.extract", key=f"{card_final}:{idx + 1}"):
+            METRICS.count("organize.pages")
+            from_tables = _records_from_tables(card_final, page.extract_tables() or [])
+            if from_tables:
+                return LAYOUT_TABLE, idx, from_tables
+            from_text = _records_from_text(card_final, texts.get(idx))
+            if from_text:
+                return LAYOUT_TEXT, idx, from_text
+    return None, len(pages), []
+
+
+def parse_organize_records(
+    pdf_path: str,
+    pdf_password: Optional[str] = None,
+    backend: str = DEFAULT_BACKEND,
+    data: Optional[bytes] = None,
+) -> Iterator[TxRecord]:
+    """
+    Caminho interno (em lote): produz `TxRecord`.
+    backend: extrator de PDF; os que não detectam tabela (`extract_tables` vazio) usam o layout de texto.
+    data: bytes do PDF já lidos (ex.: pela chave do cache), para não ler o arquivo de novo.
+    """
     logging.info(f"Iniciando análise do PDF do Organize: {pdf_path}")
     filename = Path(pdf_path).name
 
-    with open_pdf(pdf_path, password=pdf_password) as pdf:
-        full_text = "\n".join((page.extract_text() or "") for page in pdf.pages)
-        card_final = _detect_card_final(filename, full_text)
+    with open_pdf(
+        pdf_path, password=pdf_password, backend=backend, source=Source.ORGANIZE.value, data=data
+    ) as pdf:
+        pages = pdf.pages
+        texts = _PageTextCache(pages)
+
+        card_final, card_source = _detect_card_from_pages(filename, texts, len(pages))
 
         if not card_final:
             logging.error(f"[Organize] Não foi possível determinar o final do cartão para '{filename}'. Pulando.")
             return
 
-        all_transactions: list[Transaction] = []
-
-        for page in pdf.pages:
-            parsed_from_tables = 0
-
-            # 1) tenta tabelas (mas NÃO pode impedir o fallback de texto)
-            tables = page.extract_tables() or []
-            for table in tables:
-                # pode ser tabela de cabeçalho (saldo/total). Só processa linhas que pareçam transação.
-                for row in table:
-                    if not row or len(row) < 2:
-                        continue
-
-                    # data tem que ser dd/mm/yyyy
-                    date_cell = (row[0] or "").strip()
-                    if not re.match(r"^\d{2}/\d{2}/\d{2,4}$", date_cell):
-                        continue
-
-                    # tenta achar valor em alguma célula
-                    amount_cell = None
-                    for cell in reversed(row):
-                        if cell is None:
-                            continue
-                        s = str(cell).strip()
-                        if not s:
-                            continue
-                        # pode vir "-19,99" ou "R$ -19,99"
-                        s2 = s.replace("R$", "").strip()
-                        if re.match(r"^-?[\d.,]+$", s2):
-                            amount_cell = s2
-                            break
-
-                    if not amount_cell:
-                        continue
-
-                    # descrição: junta colunas do meio (ignorando categoria/colunas vazias)
-                    mid = []
-                    for c in row[1:-1]:
-                        if c is None:
-                            continue
-                        cs = str(c).strip()
-                        if cs:
-                            mid.append(cs)
-                    desc_cell = " ".join(mid).strip() if mid else (str(row[1] or "").strip())
-
-                    if not desc_cell:
-                        continue
-
-                    tx = _create_transaction(card_final, date_cell, desc_cell, amount_cell, [str(row)])
-                    if tx:
-                        all_transactions.append(tx)
-                        parsed_from_tables += 1
-
-            # 2) fallback por texto SEMPRE que não extrair nada útil das tabelas
-            if parsed_from_tables == 0:
-                page_text = page.extract_text() or ""
-                for line in page_text.splitlines():
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    m = ORGANIZE_LINE_RE.match(line)
-                    if not m:
-                        continue
-
-                    date_str, desc_raw, amount_str = m.groups()
-                    tx = _create_transaction(card_final, date_str, desc_raw, amount_str, [line])
-                    if tx:
-                        all_transactions.append(tx)
-
-        logging.info(f"[Organize] Arquivo={filename} card_final={card_final} transacoes_extraidas={len(all_transactions)}")
-        yield from all_transactions
+        layout, probe_idx, probe_txs = _probe_layout(card_final, pages, texts)
+        logging.debug(
+            f"[Organize] Arquivo={filename} card_final={card_final} (via {card_source}) "
+            f"layout={layout or 'nenhum'} decidido_na_pagina={probe_idx + 1} paginas={len(pages)}"
+        )
+
+        # páginas já testadas: solta o layout delas (memória plana em extratos longos)
+        for idx, page in enumerate(pages[:probe_idx + 1]):
+            release_page(pdf, page)
+            texts.forget(idx)
+
+        # produz página a página (quem consome não espera o PDF inteiro)
+        total = len(probe_txs)
+        yield from probe_txs
+
+        for idx in range(probe_idx + 1, len(pages)):
+            with METRICS.stage("organize.extract", key=f"{card_final}:{idx + 1}"):
+                METRICS.count("organize.pages")
+                if layout == LAYOUT_TABLE:
+                    page_txs = _records_from_tables(card_final, pages[idx].extract_tables() or [])
+                    # página sem tabela útil (ex.: resumo no fim) ainda pode ter linhas em texto
+                    if not page_txs:
+                        page_txs = _records_from_text(card_final, texts.get(idx))
+                else:
+                    page_txs = _records_from_text(card_final, texts.get(idx))
+                release_page(pdf, pages[idx])
+                texts.forget(idx)
+            total += len(page_txs)
+            yield from page_txs
+
+        logging.info(f"[Organize] Arquivo={filename} card_final={card_final} transacoes_extraidas={total}")
+
+
+def parse_organize_pdf(
+    pdf_path: str,
+    pdf_password: Optional[str] = None,
+    backend: str = DEFAULT_BACKEND,
+) -> Iterator[Transaction]:
+    """Fronteira pública: mesmas transações de `parse_organize_records`, como `Transaction` validado."""
+    for rec in parse_organize_records(pdf_path, pdf_password=pdf_password, backend=backend):
+        yield rec.to_transaction()
@@ -1,22 +1,39 @@
 # concilia_pdfs/reporting/excel_writer.py
+from __future__ import annotations
+
 import logging
-from pathlib import Path
+from dataclasses import dataclass, field
+from datetime import date
 from decimal import Decimal
-from typing import List, Dict
+from itertools import repeat
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, List, Dict, Optional, Tuple
+
+from concilia_pdfs.core.records import TxRecord, to_cents
 
-import pandas as pd
+if TYPE_CHECKING:
+    from openpyxl import Workbook
 
-from concilia_pdfs.core.models import Transaction
-from concilia_pdfs.core.reconciliation import ReconciliationResult
+    from concilia_pdfs.core.matching import CardMatch
+    from concilia_pdfs.core.models import Transaction
+    from concilia_pdfs.core.reconciliation import ReconciliationResult
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+DIFF_COLUMNS = ["acao", "cartao", "data", "descricao", "valor_brl", "fonte", "moeda", "valor_estrangeiro"]
+RESUMO_COLUMNS = ["campo", "valor"]
+TOLERANCE_COLUMNS = [
+    "cartao", "data_btg", "descricao_btg", "valor_btg",
+    "data_organize", "descricao_organize", "valor_organize", "diferenca",
+]
+
+# mesmo formato de data que o pandas (DataFrame.to_excel) gravava; o cabeçalho sai sem estilo, como antes
+DATE_FORMAT = "YYYY-MM-DD"
 
 
 def _to_float(d: Decimal | None) -> float | None:
     return float(d) if d is not None else None
 
 
-def _tx_to_row(action: str, tx: Transaction) -> dict:
+def _tx_to_row(action: str, tx: Transaction | TxRecord) -> dict:
     return {
         "acao": action,  # INCLUIR / EXCLUIR
         "cartao": tx.card_final,
@@ -29,58 +46,148 @@ def _tx_to_row(action: str, tx: Transaction) -> dict:
     }
 
 
-def generate_excel_report(
-    reconciliation_results: Dict[str, ReconciliationResult],
-    all_btg_txs: List[Transaction],          # mantido por compatibilidade
-    all_organize_txs: List[Transaction],     # mantido por compatibilidade
-    output_dir: str,
-):
+def _tolerance_to_row(btg_tx: Transaction | TxRecord, org_tx: Transaction | TxRecord) -> dict:
+    return {
+        "cartao": btg_tx.card_final,
+        "data_btg": btg_tx.tx_date,
+        "descricao_btg": btg_tx.description_raw,
+        "valor_btg": _to_float(btg_tx.amount),
+        "data_organize": org_tx.tx_date,
+        "descricao_organize": org_tx.description_raw,
+        "valor_organize": _to_float(org_tx.amount),
+        "diferenca": _to_float(btg_tx.amount_abs - org_tx.amount_abs),
+    }
+
+
+def _sort_key(action: str, tx: Transaction | TxRecord) -> Tuple[int, str, int]:
+    """Chave compacta da ordenação: (|centavos|, ação, data ordinal)."""
+    if isinstance(tx, TxRecord):
+        return abs(tx.cents), action, tx.date_ord
+    return abs(to_cents(tx.amount)), action, tx.tx_date.toordinal()
+
+
+@dataclass
+class CardReport:
+    """Linhas prontas de um relatório (só tipos simples: pode ir para outro processo)."""
+    card_final: str
+    rows: List[List[Any]] = field(default_factory=list)
+    resumo: List[List[Any]] = field(default_factory=list)
+    tolerance: List[List[Any]] = field(default_factory=list)
+
+
+def build_card_report(card_final: str, result: ReconciliationResult | CardMatch) -> Optional[CardReport]:
     """
-    Gera Excel SOMENTE com diferenças (nunca inclui itens que bateram).
-    Ordena por valor_brl (menor -> maior).
+    Monta as linhas do relatório de um cartão, já ordenadas por valor (menor -> maior),
+    depois ação e data. A ordenação é estável, como o sort do pandas usado antes.
+    Devolve None se o cartão não tem diferenças.
     """
+    entries = [("INCLUIR", tx) for tx in result.missing_in_organize]
+    entries += [("EXCLUIR", tx) for tx in result.extra_in_organize]
+    tolerance_matches = getattr(result, "tolerance_matches", [])
+
+    if not entries and not tolerance_matches:
+        logging.info(f"Cartão {card_final}: sem diferenças. Nenhum Excel gerado.")
+        return None
+
+    entries.sort(key=lambda e: _sort_key(*e))
+    rows = []
+    for action, tx in entries:
+        row = _tx_to_row(action, tx)
+        rows.append([row[c] for c in DIFF_COLUMNS])
+
+    resumo = [
+        ["cartao", card_final],
+        ["qtd_incluir", len(result.missing_in_organize)],
+        ["qtd_excluir", len(result.extra_in_organize)],
+    ]
+    if tolerance_matches:
+        resumo.append(["qtd_tolerancia", len(tolerance_matches)])
+
+    tolerance = []
+    for b, o in tolerance_matches:
+        row = _tolerance_to_row(b, o)
+        tolerance.append([row[c] for c in TOLERANCE_COLUMNS])
+
+    return CardReport(card_final=card_final, rows=rows, resumo=resumo, tolerance=tolerance)
+
+
+def _append_sheet(wb: Workbook, title: str, columns: List[str], rows: List[List[Any]]) -> None:
+    from openpyxl.cell import WriteOnlyCell
+
+    ws = wb.create_sheet(title)
+    ws.append(columns)
+    for row in rows:
+        values = []
+        for value in row:
+            if isinstance(value, date):
+                value = WriteOnlyCell(ws, value=value)
+                value.number_format = DATE_FORMAT
+            values.append(value)
+        ws.append(values)
+
+
+def write_card_workbook(report: CardReport, output_dir: str | Path) -> Path:
+    """Grava o xlsx em modo streaming (openpyxl write_only): memória constante por linha."""
+    from openpyxl import Workbook
+
     out_dir = Path(output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
+    report_path = out_dir / f"{report.card_final}_diferencas.xlsx"
 
-    total_files = 0
-
-    for card_final, result in reconciliation_results.items():
-        rows: list[dict] = []
-
-        for tx in result.missing_in_organize:
-            rows.append(_tx_to_row("INCLUIR", tx))
+    wb = Workbook(write_only=True)
+    _append_sheet(wb, "diferencas", DIFF_COLUMNS, report.rows)
+    _append_sheet(wb, "resumo", RESUMO_COLUMNS, report.resumo)
+    if report.tolerance:
+        _append_sheet(wb, "tolerancia", TOLERANCE_COLUMNS, report.tolerance)
+    wb.save(report_path)
 
-        for tx in result.extra_in_organize:
-            rows.append(_tx_to_row("EXCLUIR", tx))
+    logging.info(f"Gerado: {report_path}")
+    return report_path
 
-        if not rows:
-            logging.info(f"Cartão {card_final}: sem diferenças. Nenhum Excel gerado.")
-            continue
 
-        df = pd.DataFrame(rows)
+def write_card_report(
+    card_final: str,
+    result: ReconciliationResult | CardMatch,
+    output_dir: str | Path,
+) -> Path | None:
+    """
+    Excel de UM cartão (usado pelo pipeline em streaming, assim que o cartão é conciliado).
+    Devolve o caminho gerado, ou None se o cartão não tem diferenças.
+    """
+    report = build_card_report(card_final, result)
+    if report is None:
+        return None
+    return write_card_workbook(report, output_dir)
 
-        # Ordenação pedida: menor para maior por valor
-        df["valor_ord"] = df["valor_brl"].abs()  # ordena pelo "valor" independente do sinal
-        df = df.sort_values(by=["valor_ord", "acao", "data"], ascending=[True, True, True]).drop(columns=["valor_ord"])
 
-        report_path = out_dir / f"{card_final}_diferencas.xlsx"
+def generate_excel_report(
+    reconciliation_results: Dict[str, ReconciliationResult | CardMatch],
+    all_btg_txs: List[Transaction | TxRecord],          # mantido por compatibilidade
+    all_organize_txs: List[Transaction | TxRecord],     # mantido por compatibilidade
+    output_dir: str,
+    jobs: int = 1,
+):
+    """
+    Gera Excel SOMENTE com diferenças (nunca inclui itens que bateram).
+    Ordena por valor_brl (menor -> maior).
+    Pares casados só pela tolerância de valor vão para a aba "tolerancia" (se houver).
+    jobs > 1: os arquivos dos cartões são gravados em paralelo (um processo por arquivo).
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-        with pd.ExcelWriter(report_path, engine="openpyxl") as writer:
-            df.to_excel(writer, sheet_name="diferencas", index=False)
+    reports = []
+    for card_final, result in reconciliation_results.items():
+        report = build_card_report(card_final, result)
+        if report is not None:
+            reports.append(report)
 
-            resumo = pd.DataFrame(
-                {
-                    "campo": ["cartao", "qtd_incluir", "qtd_excluir"],
-                    "valor": [
-                        card_final,
-                        len(result.missing_in_organize),
-                        len(result.extra_in_organize),
-                    ],
-                }
-            )
-            resumo.to_excel(writer, sheet_name="resumo", index=False)
+    if jobs > 1 and len(reports) > 1:
+        from concurrent.futures import ProcessPoolExecutor
 
-        total_files += 1
-        logging.info(f"Gerado: {report_path}")
+        with ProcessPoolExecutor(max_workers=min(jobs, len(reports))) as pool:
+            list(pool.map(write_card_workbook, reports, repeat(output_dir)))
+    else:
+        for report in reports:
+            write_card_workbook(report, output_dir)
 
-    logging.info(f"Relatórios gerados: {total_files}")
+    logging.info(f"Relatórios gerados: {len(reports)}")
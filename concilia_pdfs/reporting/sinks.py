@@ -0,0 +1,176 @@
+# concilia_pdfs/reporting/sinks.py
+"""
+Saídas do relatório de diferenças de um cartão.
+
+Todas usam o mesmo esquema de linhas do Excel (`_tx_to_row` / DIFF_COLUMNS), já ordenado:
+- xlsx:    <cartão>_diferencas.xlsx (abas diferencas, resumo e tolerancia)
+- csv:     <cartão>_diferencas.csv  (+ <cartão>_tolerancia.csv se houver pares por tolerância)
+- jsonl:   <cartão>_diferencas.jsonl (um objeto por linha; + <cartão>_tolerancia.jsonl)
+- parquet: <cartão>_diferencas.parquet (+ <cartão>_tolerancia.parquet); precisa do pyarrow
+
+CSV, JSONL e Parquet são para consumo por máquina: datas em ISO (AAAA-MM-DD),
+valores como número, vazio/null quando não há moeda estrangeira.
+"""
+import csv
+import json
+import logging
+from datetime import date
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+from concilia_pdfs.reporting.excel_writer import (
+    DIFF_COLUMNS,
+    TOLERANCE_COLUMNS,
+    CardReport,
+    build_card_report,
+    write_card_workbook,
+)
+from concilia_pdfs.utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("xlsx", "csv", "jsonl", "parquet")
+DEFAULT_FORMATS = ("xlsx",)
+
+
+def report_paths(card_final: str, output_dir: str | Path, formats: Sequence[str]) -> List[Path]:
+    """Todos os arquivos que as saídas podem gerar para o cartão (para limpar relatório antigo)."""
+    out_dir = Path(output_dir)
+    paths = []
+    for fmt in formats:
+        paths.append(out_dir / f"{card_final}_diferencas.{fmt}")
+        if fmt != "xlsx":
+            paths.append(out_dir / f"{card_final}_tolerancia.{fmt}")
+    return paths
+
+
+def _iso(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _write_csv(path: Path, columns: List[str], rows: List[List[Any]]) -> None:
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(["" if v is None else _iso(v) for v in row])
+
+
+def _write_jsonl(path: Path, columns: List[str], rows: List[List[Any]]) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(dict(zip(columns, map(_iso, row))), ensure_ascii=False))
+            f.write("\n")
+
+
+def _parquet_schema(columns: List[str]):
+    import pyarrow as pa
+
+    def _type(name: str):
+        if name.startswith("data"):
+            return pa.date32()
+        if name.startswith("valor") or name == "diferenca":
+            return pa.float64()
+        return pa.string()
+
+    return pa.schema([(name, _type(name)) for name in columns])
+
+
+def _write_parquet(path: Path, columns: List[str], rows: List[List[Any]]) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(columns)
+    table = pa.Table.from_pylist([dict(zip(columns, row)) for row in rows], schema=schema)
+    pq.write_table(table, path)
+
+
+def _write_table_report(
+    report: CardReport,
+    output_dir: str | Path,
+    fmt: str,
+    write: Callable[[Path, List[str], List[List[Any]]], None],
+) -> Path:
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    report_path = out_dir / f"{report.card_final}_diferencas.{fmt}"
+    write(report_path, DIFF_COLUMNS, report.rows)
+
+    tolerance_path = out_dir / f"{report.card_final}_tolerancia.{fmt}"
+    if report.tolerance:
+        write(tolerance_path, TOLERANCE_COLUMNS, report.tolerance)
+    else:
+        tolerance_path.unlink(missing_ok=True)
+
+    logger.info(f"Gerado: {report_path}")
+    return report_path
+
+
+def write_card_csv(report: CardReport, output_dir: str | Path) -> Path:
+    return _write_table_report(report, output_dir, "csv", _write_csv)
+
+
+def write_card_jsonl(report: CardReport, output_dir: str | Path) -> Path:
+    return _write_table_report(report, output_dir, "jsonl", _write_jsonl)
+
+
+def write_card_parquet(report: CardReport, output_dir: str | Path) -> Path:
+    return _write_table_report(report, output_dir, "parquet", _write_parquet)
+
+
+SINKS: Dict[str, Callable[[CardReport, str | Path], Path]] = {
+    "xlsx": write_card_workbook,
+    "csv": write_card_csv,
+    "jsonl": write_card_jsonl,
+    "parquet": write_card_parquet,
+}
+
+
+def check_formats(formats: Sequence[str]) -> None:
+    """Valida os formatos antes de processar (Parquet sem pyarrow falharia só no primeiro cartão)."""
+    unknown = [fmt for fmt in formats if fmt not in SINKS]
+    if unknown:
+        raise ValueError(f"formato desconhecido: {', '.join(unknown)} (opções: {', '.join(FORMATS)})")
+    if "parquet" in formats:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ValueError("formato parquet precisa do pacote pyarrow (pip install pyarrow)") from e
+
+
+def write_card_outputs(report: CardReport, output_dir: str | Path, formats: Sequence[str] = DEFAULT_FORMATS) -> List[Path]:
+    """Grava o relatório do cartão em cada formato pedido (as linhas são montadas uma vez só)."""
+    with METRICS.stage("write", key=report.card_final):
+        return [SINKS[fmt](report, output_dir) for fmt in formats]
+
+
+def generate_reports(
+    reconciliation_results: Dict[str, Any],
+    output_dir: str,
+    formats: Sequence[str] = DEFAULT_FORMATS,
+    jobs: int = 1,
+) -> None:
+    """
+    Como generate_excel_report, mas em vários formatos de uma vez, sem reconciliar de novo.
+    jobs > 1: os cartões são gravados em paralelo (um processo por cartão).
+    """
+    check_formats(formats)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    reports = []
+    for card_final, result in reconciliation_results.items():
+        report = build_card_report(card_final, result)
+        if report is not None:
+            reports.append(report)
+
+    if jobs > 1 and len(reports) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(jobs, len(reports))) as pool:
+            list(pool.map(write_card_outputs, reports, repeat(output_dir), repeat(tuple(formats))))
+    else:
+        for report in reports:
+            write_card_outputs(report, output_dir, formats)
+
+    logger.info(f"Relatórios gerados: {len(reports)}")
@@ -0,0 +1,87 @@
+# concilia_pdfs/utils/memory.py
+"""
+Memória limitada na leitura página a página.
+
+O pdfplumber (e o pdfminer por baixo) guarda os objetos de layout de cada página que toca e os
+objetos já lidos do documento. `iter_pages`/`release_page` fecham cada página assim que ela foi
+consumida; com um teto configurado (`MEMORY.configure`), quando o RSS passa do teto o processo
+avisa uma vez e entra em modo de pouca memória: depois de cada página também esvazia o cache de
+objetos do documento (mais lento, porque objetos compartilhados são lidos de novo).
+"""
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, Iterator, Optional
+
+from concilia_pdfs.utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+_STATM = "/proc/self/statm"
+
+
+def rss_bytes() -> Optional[int]:
+    """RSS atual do processo (Linux, via /proc/self/statm); None onde não existir."""
+    try:
+        with open(_STATM, "rb") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _release_document_cache(pdf: Any) -> None:
+    """Esvazia os objetos já lidos do PDFDocument do pdfminer (pdfplumber e backend pdfminer)."""
+    doc = getattr(pdf, "doc", None)
+    for attr in ("_cached_objs", "_parsed_objs"):
+        cache = getattr(doc, attr, None)
+        if isinstance(cache, dict):
+            cache.clear()
+
+
+class MemoryGuard:
+    """Teto de memória da extração; desligado (sem custo além do close das páginas) sem `limit_mb`."""
+
+    def __init__(self) -> None:
+        self.limit_bytes: Optional[int] = None
+        self.low_memory = False
+
+    def configure(self, limit_mb: Optional[int] = None) -> None:
+        self.limit_bytes = limit_mb * 1024 * 1024 if limit_mb else None
+        self.low_memory = False
+
+    def after_page(self, pdf: Any) -> None:
+        if self.limit_bytes is None:
+            return
+        if not self.low_memory:
+            rss = rss_bytes()
+            if rss is None or rss <= self.limit_bytes:
+                return
+            self.low_memory = True
+            METRICS.count("memory.low_mode")
+            logger.warning(
+                f"Memória acima do teto ({rss // (1024 * 1024)} MB > {self.limit_bytes // (1024 * 1024)} MB): "
+                "passando para o modo de pouca memória (cache de objetos do PDF esvaziado a cada página)."
+            )
+        _release_document_cache(pdf)
+
+
+# Instância única do processo (como o METRICS); processos do pool herdam a configuração no fork
+MEMORY = MemoryGuard()
+
+
+def release_page(pdf: Any, page: Any) -> None:
+    """Página já consumida: solta os objetos de layout dela e aplica o teto de memória."""
+    page.close()
+    MEMORY.after_page(pdf)
+
+
+def iter_pages(pdf: Any, start: int = 0, stop: Optional[int] = None) -> Iterator[Any]:
+    """
+    Páginas [start, stop) do documento; cada uma é liberada quando o consumidor pede a seguinte.
+    Quem consome deve terminar de usar a página antes de avançar o iterador.
+    """
+    for page in pdf.pages[start:stop]:
+        yield page
+        release_page(pdf, page)
@@ -0,0 +1,132 @@
+# concilia_pdfs/utils/metrics.py
+"""
+Instrumentação opcional: tempo por etapa e contadores.
+
+Desligada por padrão. Desligada, `stage()` devolve um contexto nulo compartilhado e
+`count()` retorna na primeira linha; como as chamadas ficam por página/cartão (nunca
+por linha ou palavra), o custo é desprezível e o código pode ficar em produção.
+
+    with METRICS.stage("btg.extract", key=page_number):
+        ...
+    METRICS.count("btg.words", len(words))
+
+Etapas com `key` (página, cartão, arquivo) também acumulam o tempo por chave.
+Processos do pool têm o seu próprio METRICS: use `call_in_worker` no submit e
+`METRICS.merge` no resultado para somar as medidas no processo principal.
+"""
+from __future__ import annotations
+
+import json
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+METRICS_FORMAT_VERSION = 1
+
+_NULL = nullcontext()
+
+
+class _Stage:
+    __slots__ = ("metrics", "name", "key", "start")
+
+    def __init__(self, metrics: "Metrics", name: str, key: Optional[Hashable]):
+        self.metrics = metrics
+        self.name = name
+        self.key = key
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.metrics.record(self.name, time.perf_counter() - self.start, self.key)
+
+
+class Metrics:
+    """Tempos (total, chamadas, máximo e por chave) e contadores de uma execução."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.reset()
+
+    def reset(self, enabled: Optional[bool] = None) -> None:
+        if enabled is not None:
+            self.enabled = enabled
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[str, int] = {}
+
+    def stage(self, name: str, key: Optional[Hashable] = None):
+        if not self.enabled:
+            return _NULL
+        return _Stage(self, name, key)
+
+    def record(self, name: str, seconds: float, key: Optional[Hashable] = None) -> None:
+        if not self.enabled:
+            return
+        st = self.stages.get(name)
+        if st is None:
+            st = self.stages[name] = {"calls": 0, "total_s": 0.0, "max_s": 0.0, "by_key": {}}
+        st["calls"] += 1
+        st["total_s"] += seconds
+        if seconds > st["max_s"]:
+            st["max_s"] = seconds
+        if key is not None:
+            key = str(key)
+            st["by_key"][key] = st["by_key"].get(key, 0.0) + seconds
+
+    def count(self, name: str, n: int = 1) -> None:
+        if not self.enabled:
+            return
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self) -> Dict[str, Any]:
+        stages = {}
+        for name, st in sorted(self.stages.items()):
+            entry = {
+                "calls": st["calls"],
+                "total_s": round(st["total_s"], 6),
+                "max_s": round(st["max_s"], 6),
+            }
+            if st["by_key"]:
+                entry["by_key"] = {k: round(v, 6) for k, v in st["by_key"].items()}
+            stages[name] = entry
+        return {"stages": stages, "counters": dict(sorted(self.counters.items()))}
+
+    def merge(self, snapshot: Optional[Dict[str, Any]]) -> None:
+        """Soma o snapshot de outro processo (vindo de `call_in_worker`)."""
+        if not self.enabled or not snapshot:
+            return
+        for name, other in snapshot["stages"].items():
+            st = self.stages.get(name)
+            if st is None:
+                st = self.stages[name] = {"calls": 0, "total_s": 0.0, "max_s": 0.0, "by_key": {}}
+            st["calls"] += other["calls"]
+            st["total_s"] += other["total_s"]
+            st["max_s"] = max(st["max_s"], other["max_s"])
+            for key, seconds in other.get("by_key", {}).items():
+                st["by_key"][key] = st["by_key"].get(key, 0.0) + seconds
+        for name, n in snapshot["counters"].items():
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def write(self, path: str | Path, **extra: Any) -> Path:
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": METRICS_FORMAT_VERSION, **extra, **self.snapshot()}
+        out.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        return out
+
+
+METRICS = Metrics()
+
+
+def call_in_worker(enabled: bool, fn: Callable[..., Any], *args: Any) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """
+    Roda `fn(*args)` num processo do pool e devolve (resultado, métricas do worker ou None).
+    Só para uso no submit/map de um pool: zera o METRICS do processo onde roda.
+    """
+    if not enabled:
+        return fn(*args), None
+    METRICS.reset(enabled=True)
+    result = fn(*args)
+    return result, METRICS.snapshot()
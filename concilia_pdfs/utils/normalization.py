@@ -1,7 +1,8 @@
 import re
 from datetime import datetime, date
 from decimal import Decimal, InvalidOperation
-from typing import Optional
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
 
 import unidecode
 
@@ -10,6 +11,42 @@ MONTH_MAP = {
     "jul": 7, "ago": 8, "set": 9, "out": 10, "nov": 11, "dez": 12
 }
 
+_CENT = Decimal("0.01")
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9\s]')
+
+# Tabela pré-calculada até o fim do Latim Estendido-B (cobre Latin-1 e o português)
+NORMALIZE_TABLE_LIMIT = 0x250
+# Descrições distintas guardadas no cache (nomes de estabelecimento se repetem muito)
+NORMALIZE_CACHE_SIZE = 1 << 16
+
+
+def _normalize_char(ch: str) -> str:
+    return _NON_ALNUM_RE.sub('', unidecode.unidecode(ch).lower())
+
+
+class _NormalizeTable(dict):
+    """
+    Tabela do str.translate: código -> texto já sem acento, minúsculo e filtrado.
+    O unidecode trabalha caractere a caractere, então aplicar por caractere dá o mesmo
+    resultado que aplicar na string inteira. Fora da faixa pré-calculada, o unidecode
+    é chamado uma vez por caractere novo e o resultado fica na tabela.
+    """
+
+    def __missing__(self, codepoint: int) -> str:
+        mapped = self[codepoint] = _normalize_char(chr(codepoint))
+        return mapped
+
+
+_NORMALIZE_TABLE = _NormalizeTable((cp, _normalize_char(chr(cp))) for cp in range(NORMALIZE_TABLE_LIMIT))
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_str(text: str) -> str:
+    # split() sem argumento separa nos mesmos espaços que \s e descarta as pontas
+    return ' '.join(text.translate(_NORMALIZE_TABLE).split())
+
+
 def normalize_text(text: str) -> str:
     """
     Normaliza uma string através de:
@@ -18,25 +55,44 @@ def normalize_text(text: str) -> str:
     3. Remoção de caracteres não alfanuméricos (exceto espaços).
     4. Redução de múltiplos espaços para um só.
     5. Remoção de espaços em branco das extremidades.
+    Resultado idêntico a unidecode + lower + re.sub, com tabela de tradução e cache.
     """
     if not isinstance(text, str):
         return ""
-    text = unidecode.unidecode(text)
-    text = text.lower()
-    text = re.sub(r'[^a-z0-9\s]', '', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    return _normalize_str(text)
 
 
-def parse_brl_value(value_str: str) -> Optional[Decimal]:
-    """
-    Analisa uma string representando um valor em Real (BRL) para um Decimal.
-    Lida com formatos como '1.234,56' ou '1234.56'.
-    """
-    if not isinstance(value_str, str):
-        return None
+def normalize_many(texts: Iterable[str]) -> List[str]:
+    """`normalize_text` de uma sequência (caminhos em lote, ex.: uma página inteira)."""
+    normalize = normalize_text
+    return [normalize(t) for t in texts]
+
+
+# Datas e valores distintos guardados em cache (dentro de um extrato eles se repetem muito)
+PARSE_CACHE_SIZE = 1 << 14
+
+_BRL_TWO_DECIMALS_RE = re.compile(r',\d{2}$')
+# Formatos canônicos, só ASCII: '1.234,56' / '-45,67' e datas 'dd/mm/aa(aa)' e 'dd Mon'
+_BRL_CANONICAL_RE = re.compile(r'([+-]?)([0-9]{1,3}(?:\.[0-9]{3})+|[0-9]+),([0-9]{2})')
+_DATE_SLASH_RE = re.compile(r'([0-9]{1,2})/([0-9]{1,2})/([0-9]{4}|[0-9]{2})')
+_INT_TEXT_RE = re.compile(r'[+-]?[0-9]+(?:_[0-9]+)*')
+
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _valid_ymd(year: int, month: int, day: int) -> bool:
+    """Mesma validação do construtor de `date`, sem exceção."""
+    if not (1 <= year <= 9999 and 1 <= month <= 12 and day >= 1):
+        return False
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return day <= 29
+    return day <= _DAYS_IN_MONTH[month]
+
+
+def _parse_brl_decimal_legacy(value_str: str) -> Optional[Decimal]:
+    """Regra original (Decimal da string limpa); cobre os formatos fora do caminho rápido."""
     cleaned_str = value_str.replace("R$", "").strip()
-    if re.search(r',\d{2}$', cleaned_str):
+    if _BRL_TWO_DECIMALS_RE.search(cleaned_str):
         cleaned_str = cleaned_str.replace('.', '').replace(',', '.')
     else:
         cleaned_str = cleaned_str.replace(',', '')
@@ -48,45 +104,128 @@ def parse_brl_value(value_str: str) -> Optional[Decimal]:
         return None
 
 
-def parse_date(date_str: str, year: Optional[int] = None) -> Optional[date]:
+def _brl_canonical(value_str: str) -> Optional[Tuple[bool, int]]:
+    """(negativo, centavos) para '1.234,56'-like; None se o texto tiver outro formato."""
+    m = _BRL_CANONICAL_RE.fullmatch(value_str.replace("R$", "").strip())
+    if not m:
+        return None
+    sign, units, frac = m.groups()
+    cents = int(units.replace('.', '') + frac)
+    negative = sign == '-'
+    return negative, -cents if negative else cents
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_brl_cents(value_str: str) -> Optional[int]:
+    canonical = _brl_canonical(value_str)
+    if canonical is not None:
+        return canonical[1]
+    value = _parse_brl_decimal_legacy(value_str)
+    if value is None or not value.is_finite():
+        return None
+    try:
+        # mesmo arredondamento do `to_cents` (meio para o par)
+        return int(value.quantize(_CENT).scaleb(2))
+    except InvalidOperation:
+        return None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_brl_value(value_str: str) -> Optional[Decimal]:
+    canonical = _brl_canonical(value_str)
+    if canonical is None:
+        return _parse_brl_decimal_legacy(value_str)
+    negative, cents = canonical
+    if negative and not cents:
+        # Decimal('-0.00') preserva o sinal; o inteiro não
+        return Decimal('-0.00')
+    return Decimal(cents).scaleb(-2)
+
+
+def parse_brl_cents(value_str: str) -> Optional[int]:
     """
-    Analisa uma string de data em múltiplos formatos possíveis.
-    - DD/MM/YYYY
-    - DD/MM/YY
-    - DD Mon (ex: '20 Fev')
+    Valor em Real (BRL) -> centavos inteiros, sem passar por Decimal no formato comum
+    ('1.234,56', '-45,67', 'R$ 789,10'). Nos demais formatos segue `parse_brl_value`,
+    arredondando como `to_cents`. Nunca levanta exceção; resultados ficam em cache.
     """
-    if not isinstance(date_str, str):
+    if not isinstance(value_str, str):
         return None
-    
-    cleaned_str = date_str.strip()
+    return _parse_brl_cents(value_str)
 
-    # Tenta o formato DD/MM/YYYY
-    try:
-        return datetime.strptime(cleaned_str, '%d/%m/%Y').date()
-    except ValueError:
-        pass
 
-    # Tenta o formato DD/MM/YY
-    try:
-        return datetime.strptime(cleaned_str, '%d/%m/%y').date()
-    except ValueError:
-        pass
-    
-    # Tenta o formato 'DD Mon'
+def parse_brl_value(value_str: str) -> Optional[Decimal]:
+    """
+    Analisa uma string representando um valor em Real (BRL) para um Decimal.
+    Lida com formatos como '1.234,56' ou '1234.56'.
+    """
+    if not isinstance(value_str, str):
+        return None
+    return _parse_brl_value(value_str)
+
+
+def _parse_date_legacy(cleaned_str: str, year: Optional[int]) -> Optional[date]:
+    """Regra original (strptime); só para textos não ASCII, fora do caminho rápido."""
+    for fmt in ('%d/%m/%Y', '%d/%m/%y'):
+        try:
+            return datetime.strptime(cleaned_str, fmt).date()
+        except ValueError:
+            pass
     try:
         current_year = year if year else date.today().year
         day_str, month_abbr = cleaned_str.split()
         day = int(day_str)
-        month_abbr_clean = month_abbr.lower().strip('.')
-        month = MONTH_MAP.get(month_abbr_clean)
+        month = MONTH_MAP.get(month_abbr.lower().strip('.'))
         if month:
             return date(current_year, month, day)
     except (ValueError, AttributeError, KeyError):
         pass
-
     return None
 
 
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_date(date_str: str, year: Optional[int]) -> Optional[date]:
+    cleaned_str = date_str.strip()
+    if not cleaned_str.isascii():
+        return _parse_date_legacy(cleaned_str, year)
+
+    # DD/MM/YYYY e DD/MM/YY (ano de 2 dígitos como no strptime: 69-99 -> 19xx)
+    m = _DATE_SLASH_RE.fullmatch(cleaned_str)
+    if m:
+        d, mo, y = m.groups()
+        day, month, yr = int(d), int(mo), int(y)
+        if len(y) == 2:
+            yr += 2000 if yr < 69 else 1900
+        return date(yr, month, day) if _valid_ymd(yr, month, day) else None
+
+    # 'DD Mon' (ex: '20 Fev', '5 fev.')
+    parts = cleaned_str.split()
+    if len(parts) != 2:
+        return None
+    day_str, month_abbr = parts
+    month = MONTH_MAP.get(month_abbr.lower().strip('.'))
+    if not month or not _INT_TEXT_RE.fullmatch(day_str):
+        return None
+    day = int(day_str)
+    yr = year if year else date.today().year
+    return date(yr, month, day) if _valid_ymd(yr, month, day) else None
+
+
+def parse_date(date_str: str, year: Optional[int] = None) -> Optional[date]:
+    """
+    Analisa uma string de data em múltiplos formatos possíveis.
+    - DD/MM/YYYY
+    - DD/MM/YY
+    - DD Mon (ex: '20 Fev')
+    Despacha pelo formato do texto, sem tentar e falhar; resultados ficam em cache.
+    """
+    if not isinstance(date_str, str):
+        return None
+    if not year and '/' not in date_str:
+        # 'DD Mon' sem ano usa o ano corrente: resolve antes do cache
+        year = date.today().year
+    return _parse_date(date_str, year or None)
+
+
 def parse_date_d_mon(date_str: str, year: Optional[int] = None) -> Optional[date]:
     """
     Analisador legado para o formato 'DD Mês'. Prefira o novo `parse_date`.
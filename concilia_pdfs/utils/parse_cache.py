@@ -0,0 +1,213 @@
+# concilia_pdfs/utils/parse_cache.py
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import zlib
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from concilia_pdfs.core.records import TxRecord, pack_records, row_json, unpack_records
+from concilia_pdfs.utils.pdf_backends import DEFAULT_BACKEND
+
+logger = logging.getLogger(__name__)
+
+# Sobe quando o formato serializado mudar (invalida o cache antigo)
+CACHE_FORMAT_VERSION = 2
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+CACHE_SUFFIX = ".txs"
+
+_PACKAGE_DIR = Path(__file__).resolve().parent.parent
+
+# Arquivos cujo conteúdo determina o resultado do parse. Mudou qualquer um -> outra chave.
+_FINGERPRINT_FILES = (
+    "core/models.py",
+    "core/records.py",
+    "parsers/btg_parser.py",
+    "parsers/organize_parser.py",
+    "utils/normalization.py",
+    "utils/pdf_backends.py",
+)
+
+_parser_fingerprint: Optional[str] = None
+
+
+def default_cache_dir() -> Path:
+    env_dir = os.getenv("CONCILIA_CACHE_DIR")
+    if env_dir:
+        return Path(env_dir)
+    base = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "concilia_pdfs"
+
+
+def parser_fingerprint() -> str:
+    """Hash do código dos parsers + versão do formato (calculado uma vez por processo)."""
+    global _parser_fingerprint
+    if _parser_fingerprint is None:
+        h = hashlib.sha256(f"format={CACHE_FORMAT_VERSION}".encode())
+        for rel in _FINGERPRINT_FILES:
+            h.update(rel.encode())
+            h.update((_PACKAGE_DIR / rel).read_bytes())
+        _parser_fingerprint = h.hexdigest()[:16]
+    return _parser_fingerprint
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class CacheEntryWriter:
+    """
+    Entrada do cache gravada aos poucos (mesmo formato do `put`): os registros são
+    serializados e compactados à medida que chegam, sem guardar a lista inteira em memória.
+    Só vira entrada válida no `commit`; `discard` (ou erro de disco) apaga o temporário.
+    """
+
+    FLUSH_EVERY = 512
+
+    def __init__(self, cache: "ParseCache", key: str):
+        self.cache = cache
+        self.key = key
+        self.count = 0
+        self._pending: List[str] = []
+        self._zip = zlib.compressobj()
+        self._path = cache._path(key)
+        self._tmp = self._path.with_suffix(f".{os.getpid()}.tmp")
+        self._file = None
+        try:
+            cache.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._file = open(self._tmp, "wb")
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar no cache {cache.cache_dir}: {e!r}")
+
+    def _write(self, text: str) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.write(self._zip.compress(text.encode("utf-8")))
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar no cache {self.cache.cache_dir}: {e!r}")
+            self.discard()
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._write(("," if self.count > len(self._pending) else "[") + ",".join(self._pending))
+            self._pending = []
+
+    def add(self, rec: TxRecord) -> None:
+        self.count += 1
+        self._pending.append(row_json(rec))
+        if len(self._pending) >= self.FLUSH_EVERY:
+            self._flush()
+
+    def commit(self) -> None:
+        self._flush()
+        self._write("]" if self.count else "[]")
+        if self._file is None:
+            return
+        try:
+            self._file.write(self._zip.flush())
+            self._file.close()
+            self._file = None
+            os.replace(self._tmp, self._path)
+            self.cache._evict()
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar no cache {self.cache.cache_dir}: {e!r}")
+            self.discard()
+
+    def discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._tmp.unlink(missing_ok=True)
+
+
+class ParseCache:
+    """
+    Cache em disco das transações (`TxRecord`) extraídas de um PDF.
+
+    Chave = SHA-256 dos bytes do PDF + tipo do parser + backend de extração + fingerprint do código dos parsers.
+    Para o Organize o nome do arquivo entra na chave (o cartão pode vir do nome).
+    Quando o diretório passa de `max_bytes`, os arquivos usados há mais tempo são removidos.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def key(self, kind: str, pdf_path: str, backend: str = DEFAULT_BACKEND, data: Optional[bytes] = None) -> str:
+        """`data`: bytes do PDF já lidos (quem vai abrir o PDF depois reusa o mesmo buffer); senão lê o arquivo."""
+        digest = hashlib.sha256(data).hexdigest() if data is not None else file_sha256(pdf_path)
+        h = hashlib.sha256()
+        h.update(f"{kind}\0{backend}\0{parser_fingerprint()}\0{digest}".encode())
+        if kind == "organize":
+            h.update(Path(pdf_path).name.encode())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{CACHE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[List[TxRecord]]:
+        path = self._path(key)
+        try:
+            blob = path.read_bytes()
+            txs = unpack_records(blob)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Entrada de cache inválida, ignorando: {path.name} ({type(e).__name__})")
+            return None
+        try:
+            os.utime(path)  # marca como usado recentemente (LRU)
+        except OSError:
+            pass
+        return txs
+
+    def lookup(
+        self, kind: str, pdf_path: str, backend: str = DEFAULT_BACKEND, data: Optional[bytes] = None
+    ) -> Tuple[str, Optional[List[TxRecord]]]:
+        key = self.key(kind, pdf_path, backend, data)
+        txs = self.get(key)
+        if txs is not None:
+            logger.info(f"[cache] hit {kind}: {Path(pdf_path).name} ({len(txs)} transações)")
+        return key, txs
+
+    def put(self, key: str, txs: List[TxRecord]) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(pack_records(txs))
+            os.replace(tmp, path)
+            self._evict()
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar no cache {self.cache_dir}: {e!r}")
+
+    def writer(self, key: str) -> CacheEntryWriter:
+        """Grava a entrada `key` registro a registro (ver `CacheEntryWriter`)."""
+        return CacheEntryWriter(self, key)
+
+    def _evict(self) -> None:
+        entries = []
+        for p in self.cache_dir.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+                total -= size
+                logger.debug(f"[cache] removido {p.name} ({size} bytes)")
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,260 @@
+# concilia_pdfs/utils/pdf_backends.py
+"""
+Backends de extração de PDF.
+
+Os parsers só usam uma fatia da API do pdfplumber: `pdf.pages` (lista com `len`, índice e fatia),
+`page.page_number`, `page.bbox`, `page.extract_words(...)` (caixas de palavra com x0/x1/top/bottom/text),
+`page.extract_text()` (linhas de texto), `page.extract_tables()` e `page.close()`.
+Cada backend entrega objetos com essa mesma fatia:
+
+- pdfplumber (padrão): o próprio `pdfplumber.PDF`, sem camada extra.
+- pdfminer: interpreta as páginas direto no pdfminer, sem análise de layout e sem montar
+  um dict por caractere; as palavras saem dos `LTChar` com as mesmas regras do `extract_words`.
+- pymupdf: usa o PyMuPDF (`fitz`) quando instalado; bem mais rápido que os dois acima.
+
+Os backends sem detector de tabela devolvem `[]` em `extract_tables()`: o Organize cai no layout de texto.
+"""
+from __future__ import annotations
+
+import io
+import logging
+from importlib.util import find_spec
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("pdfplumber", "pdfminer", "pymupdf")
+# "auto": o mais rápido instalado (pymupdf, senão pdfminer, que vem com o pdfplumber)
+BACKEND_CHOICES = BACKENDS + ("auto",)
+DEFAULT_BACKEND = "pdfplumber"
+
+# Mesmas tolerâncias padrão do pdfplumber no extract_text()
+TEXT_X_TOLERANCE = 3
+TEXT_Y_TOLERANCE = 3
+
+
+def _pymupdf_available() -> bool:
+    return find_spec("pymupdf") is not None or find_spec("fitz") is not None
+
+
+def resolve_backend(name: str) -> str:
+    """Nome do backend a usar ("auto" -> o mais rápido instalado). ValueError se desconhecido ou não instalado."""
+    if name == "auto":
+        return "pymupdf" if _pymupdf_available() else "pdfminer"
+    if name not in BACKENDS:
+        raise ValueError(f"backend de PDF desconhecido: {name} (opções: {', '.join(BACKEND_CHOICES)})")
+    if name == "pymupdf" and not _pymupdf_available():
+        raise ValueError("backend pymupdf precisa do pacote PyMuPDF (pip install pymupdf)")
+    return name
+
+
+def _cluster_by_top(items: List[Tuple[float, float, Any]], y_tol: float) -> List[List[Tuple[float, float, Any]]]:
+    """(top, x0, obj) ordenados por top -> linhas; top consecutivo a até `y_tol` fica na mesma linha."""
+    lines: List[List[Tuple[float, float, Any]]] = []
+    last_top: Optional[float] = None
+    for item in items:
+        if last_top is None or item[0] - last_top > y_tol:
+            lines.append([])
+        lines[-1].append(item)
+        last_top = item[0]
+    return lines
+
+
+def _text_from_words(words: List[Dict[str, Any]], y_tol: float = TEXT_Y_TOLERANCE) -> str:
+    """Palavras -> texto: linhas por top, palavras da linha por x0, como o extract_text() sem layout."""
+    items = sorted(((w["top"], w["x0"], w) for w in words), key=itemgetter(0, 1))
+    return "\n".join(
+        " ".join(w["text"] for _, _, w in sorted(line, key=itemgetter(1)))
+        for line in _cluster_by_top(items, y_tol)
+    )
+
+
+class _Document:
+    """Base dos documentos dos backends: `pages`, `is_encrypted` e gerenciador de contexto."""
+
+    pages: List[Any]
+    is_encrypted = False
+
+    def close(self) -> None:
+        for page in self.pages:
+            page.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _MinerPage:
+    """Página do backend pdfminer; os caracteres são interpretados uma vez e guardados até `close()`."""
+
+    def __init__(self, doc: "_MinerDocument", page, page_number: int):
+        self._doc = doc
+        self._page = page
+        self.page_number = page_number
+        x0, y0, x1, y1 = page.mediabox
+        width, height = x1 - x0, y1 - y0
+        if page.rotate % 180 == 90:
+            width, height = height, width
+        self.bbox = (0, 0, width, height)
+        self._chars: Optional[List[Tuple[float, float, Any]]] = None
+
+    def _layout_chars(self) -> List[Tuple[float, float, Any]]:
+        """
+        (top, x0, LTChar) ordenados por top/x0, de toda a árvore do layout: texto desenhado dentro de
+        Form XObject (`LTFigure`) também entra, como no pdfplumber. Texto rotacionado (ex.: marca
+        d'água) fica de fora.
+        """
+        if self._chars is None:
+            from pdfminer.layout import LTChar, LTContainer
+
+            height = self.bbox[3]
+            chars: List[Tuple[float, float, Any]] = []
+            stack = [self._doc.render(self._page)]
+            while stack:
+                for obj in stack.pop():
+                    if isinstance(obj, LTChar):
+                        if obj.upright:
+                            chars.append((height - obj.y1, obj.x0, obj))
+                    elif isinstance(obj, LTContainer):
+                        stack.append(obj)
+            chars.sort(key=itemgetter(0, 1))
+            self._chars = chars
+        return self._chars
+
+    def extract_words(self, x_tolerance: float = 3, y_tolerance: float = 3, **_ignored) -> List[Dict[str, Any]]:
+        """Mesmas regras do extract_words do pdfplumber: linha por top, quebra em espaço ou vão > x_tolerance."""
+        height = self.bbox[3]
+        words: List[Dict[str, Any]] = []
+
+        def emit(chars: list) -> None:
+            words.append({
+                "text": "".join(c.get_text() for c in chars),
+                "x0": chars[0].x0,
+                "x1": max(c.x1 for c in chars),
+                "top": height - max(c.y1 for c in chars),
+                "bottom": height - min(c.y0 for c in chars),
+            })
+
+        for line in _cluster_by_top(self._layout_chars(), y_tolerance):
+            line.sort(key=itemgetter(1))
+            current: list = []
+            for top, x0, char in line:
+                if char.get_text().isspace():
+                    if current:
+                        emit(current)
+                    current = []
+                    continue
+                if current:
+                    prev = current[-1]
+                    if x0 < prev.x0 or x0 > prev.x1 + x_tolerance or abs(top - (height - prev.y1)) > y_tolerance:
+                        emit(current)
+                        current = []
+                current.append(char)
+            if current:
+                emit(current)
+        return words
+
+    def extract_text(self, **_ignored) -> str:
+        return _text_from_words(self.extract_words(x_tolerance=TEXT_X_TOLERANCE, y_tolerance=TEXT_Y_TOLERANCE))
+
+    def extract_tables(self, **_ignored) -> list:
+        return []
+
+    def close(self) -> None:
+        self._chars = None
+
+
+class _MinerDocument(_Document):
+    """PDF aberto direto no pdfminer; um interpretador/agregador compartilhado pelas páginas."""
+
+    def __init__(self, data: bytes, password: Optional[str]):
+        from pdfminer.converter import PDFPageAggregator
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+
+        self._fp = io.BytesIO(data)
+        try:
+            self.doc = PDFDocument(PDFParser(self._fp), password=password or "")
+            rsrcmgr = PDFResourceManager(caching=True)
+            # laparams=None: sem análise de layout; os LTChar já vêm com a posição final.
+            # LAParams ajustados (boxes_flow=None) custavam ~0,23s por extrato contra ~0,13s agrupando
+            # os caracteres aqui, e as palavras já saem iguais às do pdfplumber sem eles
+            self._device = PDFPageAggregator(rsrcmgr, laparams=None)
+            self._interpreter = PDFPageInterpreter(rsrcmgr, self._device)
+            self.pages = [_MinerPage(self, page, i) for i, page in enumerate(PDFPage.create_pages(self.doc), start=1)]
+        except Exception:
+            self._fp.close()
+            raise
+        self.is_encrypted = self.doc.encryption is not None
+
+    def render(self, page):
+        self._interpreter.process_page(page)
+        return self._device.get_result()
+
+    def close(self) -> None:
+        super().close()
+        self._fp.close()
+
+
+class _PyMuPage:
+    """Página do backend pymupdf (`get_text("words")` já devolve as caixas de palavra)."""
+
+    def __init__(self, page):
+        self._page = page
+        self.page_number = page.number + 1
+        rect = page.rect
+        self.bbox = (rect.x0, rect.y0, rect.x1, rect.y1)
+
+    def extract_words(self, **_ignored) -> List[Dict[str, Any]]:
+        return [
+            {"text": text, "x0": x0, "x1": x1, "top": y0, "bottom": y1}
+            for x0, y0, x1, y1, text, *_ in self._page.get_text("words")
+        ]
+
+    def extract_text(self, **_ignored) -> str:
+        return _text_from_words(self.extract_words())
+
+    def extract_tables(self, **_ignored) -> list:
+        return []
+
+    def close(self) -> None:
+        pass
+
+
+class _PyMuDocument(_Document):
+
+    def __init__(self, data: bytes, password: Optional[str]):
+        try:
+            import pymupdf
+        except ImportError:
+            import fitz as pymupdf
+
+        self._doc = pymupdf.open(stream=data, filetype="pdf")
+        self.is_encrypted = bool(self._doc.needs_pass)
+        if self._doc.needs_pass and not self._doc.authenticate(password or ""):
+            self._doc.close()
+            raise ValueError("senha incorreta")
+        self.pages = [_PyMuPage(page) for page in self._doc]
+
+    def close(self) -> None:
+        super().close()
+        self._doc.close()
+
+
+def _open_pdfplumber(data: bytes, password: Optional[str]):
+    import pdfplumber  # pesado: só quando um PDF é aberto de fato (cache e --help não pagam)
+
+    return pdfplumber.open(io.BytesIO(data), password=password)
+
+
+# backend -> abre o PDF a partir dos bytes já lidos (cada tentativa de senha reusa o mesmo buffer)
+OPENERS: Dict[str, Callable[[bytes, Optional[str]], Any]] = {
+    "pdfplumber": _open_pdfplumber,
+    "pdfminer": _MinerDocument,
+    "pymupdf": _PyMuDocument,
+}
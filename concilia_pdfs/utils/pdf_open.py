@@ -1,49 +1,84 @@
 # concilia_pdfs/utils/pdf_open.py
 import logging
-from typing import Optional
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
 
-import pdfplumber
+from concilia_pdfs.utils.metrics import METRICS
+from concilia_pdfs.utils.pdf_backends import DEFAULT_BACKEND, OPENERS, resolve_backend
 
 logger = logging.getLogger(__name__)
 
-def open_pdf(path: str, password: Optional[str] = None):
+# Só PDF criptografado tem a chave /Encrypt (no trailer ou no dicionário do xref, nunca comprimido)
+ENCRYPT_MARKER = b"/Encrypt"
+
+# Senha que abriu o último PDF de cada origem ("BTG"/"ORGANIZE"), válida dentro de um job
+# (`password_scope`). Processos do pool herdam o que o principal já sabia no fork.
+_KNOWN_PASSWORDS: Dict[str, Optional[str]] = {}
+
+
+@contextmanager
+def password_scope() -> Iterator[None]:
     """
-    Abre PDF com suporte a senha e logs melhores.
+    Um job (uma execução do pipeline): começa sem senha lembrada e esquece tudo no fim.
+    No modo em lote o mesmo processo do pool roda jobs de famílias diferentes; a senha de uma
+    não pode ser tentada nos PDFs da outra.
+    """
+    _KNOWN_PASSWORDS.clear()
+    try:
+        yield
+    finally:
+        _KNOWN_PASSWORDS.clear()
 
-    Estratégia:
-    - tenta abrir com password informado, depois "", depois None
-    - se abrir, retorna o pdfplumber.PDF
-    - se falhar, levanta a última exceção com log detalhado
 
-    Observação:
-    - Alguns PDFs criptografados não são suportados pelo backend do pdfplumber/pdfminer.
+def _password_label(pwd: Optional[str]) -> str:
+    return '<None>' if pwd is None else ('<vazia>' if pwd == '' else '<informada>')
+
+
+def _password_candidates(data: bytes, password: Optional[str], source: Optional[str]) -> List[Optional[str]]:
+    """
+    Ordem das tentativas: a senha que já funcionou para a origem, a informada e "" (sem repetir).
+    None não entra: todos os backends tratam None como "".
     """
-    tried = []
+    if ENCRYPT_MARKER not in data:
+        # sem criptografia: a senha é ignorada, uma tentativa basta
+        return [None]
+    candidates: List[Optional[str]] = []
+    if source in _KNOWN_PASSWORDS:
+        candidates.append(_KNOWN_PASSWORDS[source])
+    for pwd in (password or "", ""):
+        if pwd not in candidates:
+            candidates.append(pwd)
+    return candidates
+
+
+def _unlock(opener, path: str, data: bytes, password: Optional[str], source: Optional[str]):
     last_exc: Optional[BaseException] = None
 
-    for pwd in (password, "", None):
-        if pwd in tried:
-            continue
-        tried.append(pwd)
+    for pwd in _password_candidates(data, password, source):
+        METRICS.count("open.attempts")
         try:
-            pdf = pdfplumber.open(path, password=pwd)
+            pdf = opener(data, pwd)
 
             # Diagnóstico (quando disponível)
             try:
-                encrypted = getattr(pdf, "pdf", None)
+                encrypted = getattr(pdf, "pdf", pdf)
                 if encrypted is not None and hasattr(encrypted, "is_encrypted"):
                     if encrypted.is_encrypted:
                         logger.info(f"PDF aberto e está criptografado (unlock OK). Arquivo: {path}")
             except Exception:
                 pass
 
+            if source is not None and ENCRYPT_MARKER in data:
+                _KNOWN_PASSWORDS[source] = pwd
             return pdf
 
         except Exception as e:
             last_exc = e
+            METRICS.count("open.failed_attempts")
             # log com tipo + repr para não ficar vazio
             logger.warning(
-                f"Tentativa de abrir PDF falhou. arquivo={path} password={'<None>' if pwd is None else ('<vazia>' if pwd=='' else '<informada>')} "
+                f"Tentativa de abrir PDF falhou. arquivo={path} password={_password_label(pwd)} "
                 f"erro_tipo={type(e).__name__} erro={repr(e)}"
             )
 
@@ -54,3 +89,32 @@ def open_pdf(path: str, password: Optional[str] = None):
     )
     logger.error(msg)
     raise last_exc if last_exc else RuntimeError(msg)
+
+
+def open_pdf(
+    path: str,
+    password: Optional[str] = None,
+    backend: str = DEFAULT_BACKEND,
+    source: Optional[str] = None,
+    data: Optional[bytes] = None,
+):
+    """
+    Abre PDF com suporte a senha e logs melhores.
+
+    Estratégia:
+    - lê o arquivo UMA vez; todas as tentativas reusam os mesmos bytes em memória
+      (`data`: bytes já lidos por quem chamou, ex.: para a chave do cache; o arquivo não é relido)
+    - PDF sem /Encrypt: uma tentativa, sem senha
+    - criptografado: tenta a senha que já abriu um PDF da mesma `source` neste job,
+      depois o password informado, depois ""
+    - se abrir, retorna o documento do backend (`pdfplumber.PDF` no padrão; ver `pdf_backends`)
+    - se falhar, levanta a última exceção com log detalhado
+
+    Observação:
+    - Alguns PDFs criptografados não são suportados pelo backend do pdfplumber/pdfminer.
+    """
+    opener = OPENERS[resolve_backend(backend)]
+    with METRICS.stage("open", key=Path(path).name):
+        if data is None:
+            data = Path(path).read_bytes()
+        return _unlock(opener, path, data, password, source)
@@ -0,0 +1,100 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from concilia_pdfs.batch import (
+    STATUS_ERROR, STATUS_OK, BatchJob, JobTimeout, _alarm, _run_job, discover_jobs, load_manifest, main, run_batch,
+)
+from concilia_pdfs.bench.synthetic import generate_dataset, write_dataset
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_discover_jobs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "familias"
+            for rel in ("silva/2026_02", "souza"):
+                job_dir = root / rel
+                (job_dir / "organize_pdfs").mkdir(parents=True)
+                (job_dir / "btg.pdf").write_bytes(b"%PDF-1.4")
+            # sem PDF do BTG: ignorado
+            (root / "vazio" / "organize_pdfs").mkdir(parents=True)
+
+            jobs = discover_jobs(root, Path(tmp) / "saidas")
+            self.assertEqual([j.name for j in jobs], ["silva/2026_02", "souza"])
+            self.assertEqual(Path(jobs[0].out), Path(tmp) / "saidas" / "silva" / "2026_02")
+            self.assertEqual(Path(jobs[1].organize_dir), root / "souza" / "organize_pdfs")
+
+    def test_load_manifest_resolves_relative_paths(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = Path(tmp) / "lote.json"
+            manifest.write_text(json.dumps([
+                {"name": "silva", "btg": "silva/btg.pdf", "organize_dir": "silva/org"},
+                {"btg": "souza/btg.pdf", "organize_dir": "souza/org", "out": "saida_souza"},
+            ]))
+            jobs = load_manifest(manifest, Path("/saidas"))
+            self.assertEqual(Path(jobs[0].btg), Path(tmp) / "silva" / "btg.pdf")
+            self.assertEqual(Path(jobs[0].out), Path("/saidas/silva"))
+            self.assertEqual(jobs[1].name, "001_btg")
+            self.assertEqual(Path(jobs[1].out), Path(tmp) / "saida_souza")
+
+    def test_load_manifest_rejects_repeated_names(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = Path(tmp) / "lote.json"
+            manifest.write_text(json.dumps([
+                {"name": "silva", "btg": "silva/jan.pdf", "organize_dir": "silva/org_jan"},
+                {"name": "souza", "btg": "souza/btg.pdf", "organize_dir": "souza/org"},
+                {"name": "silva", "btg": "silva/fev.pdf", "organize_dir": "silva/org_fev"},
+            ]))
+            with self.assertRaisesRegex(ValueError, r"nome de job repetido \('silva' nas entradas 0, 2\)"):
+                load_manifest(manifest, Path("/saidas"))
+
+    def test_run_batch_failed_job_does_not_stop_the_others(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            btg, org_dir = write_dataset(generate_dataset(n_cards=1, tx_per_card=5, seed=3), tmp / "silva")
+            jobs = [
+                BatchJob(name="silva", btg=str(btg), organize_dir=str(org_dir), out=str(tmp / "saidas" / "silva")),
+                BatchJob(name="souza", btg=str(tmp / "nao_existe.pdf"), organize_dir=str(org_dir),
+                         out=str(tmp / "saidas" / "souza")),
+            ]
+            summary = run_batch(jobs, {"cache_dir": None}, max_workers=2, retries=1)
+
+            self.assertEqual((summary["total"], summary["ok"], summary["failed"]), (2, 1, 1))
+            by_name = {j["name"]: j for j in summary["jobs"]}
+            self.assertEqual((by_name["silva"]["status"], by_name["silva"]["attempts"]), (STATUS_OK, 1))
+            self.assertEqual(by_name["silva"]["cards"], 1)
+            # o job com erro é tentado de novo (retries=1) e continua falhando
+            self.assertEqual((by_name["souza"]["status"], by_name["souza"]["attempts"]), (STATUS_ERROR, 2))
+            self.assertIn("FileNotFoundError", by_name["souza"]["error"])
+
+    def test_main_writes_summary_and_exit_code(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            manifest = tmp / "lote.json"
+            manifest.write_text(json.dumps([{"name": "souza", "btg": "nao_existe.pdf", "organize_dir": "org"}]))
+            code = main(["--manifest", str(manifest), "--out", str(tmp / "saidas"), "--jobs", "1", "--no-cache"])
+            summary = json.loads((tmp / "saidas" / "resumo_lote.json").read_text(encoding="utf-8"))
+        self.assertEqual(code, 1)
+        self.assertEqual((summary["ok"], summary["failed"]), (0, 1))
+
+    def test_run_job_uses_configured_cache_size(self):
+        job = BatchJob(name="x", btg="nao_existe.pdf", organize_dir="org", out="saida")
+        with mock.patch("concilia_pdfs.utils.parse_cache.ParseCache") as cache_cls:
+            _run_job(job, {"cache_dir": "cache", "cache_max_bytes": 5 * 1024 * 1024}, None)
+        cache_cls.assert_called_once_with(Path("cache"), max_bytes=5 * 1024 * 1024)
+
+    def test_alarm_interrupts_long_job(self):
+        with self.assertRaises(JobTimeout):
+            with _alarm(1):
+                time.sleep(5)
+        # sem timeout configurado não interfere
+        with _alarm(None):
+            pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+
+from decimal import Decimal
+
+from concilia_pdfs.parsers.btg_parser import (
+    PageLine,
+    _cluster_words_into_lines,
+    _detect_year,
+    _page_ranges,
+    _records_from_pages,
+    iter_card_batches,
+)
+
+
+def _page(*texts):
+    return [PageLine(top=float(i), x0=0.0, x1=10.0, text=t) for i, t in enumerate(texts)]
+
+
+def _words(top, x, text, char_w=4.0):
+    """Palavras de uma linha a partir de x, como o extract_words devolve."""
+    out = []
+    for token in text.split():
+        out.append({"top": top, "x0": x, "x1": x + char_w * len(token), "text": token})
+        x += char_w * (len(token) + 1)
+    return out
+
+
+class TestBtgParser(unittest.TestCase):
+
+    def test_detect_year_stops_at_first_match(self):
+        pages = iter([_page("Resumo"), _page("Fatura de Fevereiro de 2025"), _page("01 Fev X R$ 1,00")])
+        year, head = _detect_year(pages)
+        self.assertEqual(year, 2025)
+        self.assertEqual(len(head), 2)
+        # a página seguinte continua disponível no iterador, sem reextração
+        self.assertEqual(next(pages)[0].text, "01 Fev X R$ 1,00")
+
+    def test_detect_year_fallback_consumes_everything(self):
+        year, head = _detect_year(iter([_page("sem ano"), _page("nada aqui")]))
+        self.assertIsInstance(year, int)
+        self.assertEqual(len(head), 2)
+
+    def test_international_conversion_on_next_page(self):
+        pages = [
+            _page("Lançamentos do cartão Final 1748", "12 Fev UBER TRIP PEN 99,50"),
+            _page("Cotação da moeda - R$ 1,70", "Conversão para Real - R$ 169,15", "13 Fev PADARIA R$ 10,00"),
+        ]
+        txs = list(_records_from_pages(pages, 2026))
+        self.assertEqual(len(txs), 2)
+        self.assertEqual(txs[0].card_final, "1748")
+        self.assertEqual(txs[0].amount, Decimal("169.15"))
+        self.assertEqual(txs[0].foreign_currency, "PEN")
+        self.assertEqual(txs[1].amount, Decimal("10.00"))
+
+    def test_records_keep_pdf_order_while_international_is_pending(self):
+        pages = [
+            _page("Lançamentos do cartão Final 1748", "12 Fev UBER TRIP PEN 99,50", "12 Fev PADARIA R$ 10,00"),
+            _page("Conversão para Real -", "R$ 169,15", "13 Fev NETFLIX USD 5,00", "14 Fev ESTORNO - R$ 3,00"),
+            _page("Lançamentos do cartão Final 5970", *(["Resumo"] * 14), "Conversão para Real - R$ 27,00"),
+        ]
+        txs = list(_records_from_pages(pages, 2026))
+        # a 2ª internacional passa de 15 linhas sem conversão e fica de fora
+        self.assertEqual([(t.card_final, t.description_raw, t.amount) for t in txs], [
+            ("1748", "UBER TRIP (Internacional)", Decimal("169.15")),
+            ("1748", "PADARIA", Decimal("10.00")),
+            ("1748", "ESTORNO", Decimal("-3.00")),
+        ])
+        self.assertEqual(txs[0].raw_lines, (
+            "12 Fev UBER TRIP PEN 99,50", "12 Fev PADARIA R$ 10,00", "Conversão para Real -", "R$ 169,15",
+        ))
+
+    def test_cluster_splits_at_detected_gutter(self):
+        # coluna direita começa antes do meio da página (240 de 595): o meio dividiria errado
+        words = []
+        for i in range(10):
+            top = 100.0 + 12 * i + (0.5 if i % 2 else 0.0)
+            words += _words(top, 30.0, f"{i + 1:02d} Fev LOJA {i} R$ 1{i},00", char_w=3.0)
+            words += _words(top + 1.0, 240.0, f"{i + 1:02d} Mar PADARIA CENTRAL DO BAIRRO R$ 2{i},00")
+        lines = _cluster_words_into_lines(words, 0.0, 595.0)
+        self.assertEqual(len(lines), 20)
+        self.assertEqual(lines[0].text, "01 Fev LOJA 0 R$ 10,00")
+        self.assertEqual(lines[1].text, "01 Mar PADARIA CENTRAL DO BAIRRO R$ 20,00")
+        self.assertEqual((lines[1].x0, lines[1].top), (240.0, 101.0))
+
+    def test_cluster_gutter_survives_full_width_lines(self):
+        # título, cabeçalho do cartão e notas atravessam o vão; as duas colunas continuam separadas
+        words = _words(20.0, 30.0, "Fatura de Fevereiro de 2026 - cartões adicionais e titular do mês")
+        words += _words(40.0, 30.0, "Lançamentos do cartão Final 1748 - compras nacionais e internacionais")
+        for i in range(40):
+            top = 60.0 + 12 * i
+            words += _words(top, 30.0, f"{i % 28 + 1:02d} Fev LOJA {i} R$ 1,00", char_w=3.0)
+            words += _words(top, 240.0, f"{i % 28 + 1:02d} Fev MERCADO {i} R$ 2,00", char_w=3.0)
+        for k in range(3):
+            words += _words(560.0 + 12 * k, 30.0, f"Nota {k}: valores em reais sujeitos a alteração até o fechamento")
+        lines = _cluster_words_into_lines(words, 0.0, 595.0)
+        texts = [ln.text for ln in lines]
+        self.assertIn("01 Fev LOJA 0 R$ 1,00", texts)
+        self.assertIn("01 Fev MERCADO 0 R$ 2,00", texts)
+        self.assertFalse([t for t in texts if "LOJA" in t and "MERCADO" in t])
+
+        pages = [[PageLine(ln.top, ln.x0, ln.x1, ln.text) for ln in lines]]
+        self.assertEqual(len(list(_records_from_pages(pages, 2026))), 80)
+
+    def test_cluster_amount_column_in_central_band_is_not_a_gutter(self):
+        # coluna única com o "R$" alinhado à esquerda em x=230 (antes do meio, 297,5): o vão entre
+        # descrição e valor não é de colunas, porque à direita dele nenhuma linha começa com data
+        words = _words(30.0, 40.0, "Fatura de Fevereiro de 2026")
+        words += _words(60.0, 40.0, "Lançamentos do cartão Final 1234")
+        for i in range(30):
+            top = 80.0 + 14 * i
+            words += _words(top, 40.0, f"{i % 28 + 1:02d} Fev")
+            words += _words(top, 80.0, ["UBER TRIP", "PADARIA", "POSTO IPIRANGA"][i % 3])
+            words += _words(top, 230.0, "R$")
+            words += _words(top, 245.0, f"{i + 1},50")
+        lines = _cluster_words_into_lines(words, 0.0, 595.0)
+        self.assertIn("01 Fev UBER TRIP R$ 1,50", [ln.text for ln in lines])
+        self.assertEqual(len(list(_records_from_pages([lines], 2026))), 30)
+
+    def test_cluster_without_gutter_splits_at_page_middle(self):
+        # valores alinhados à direita depois do meio da página, sem segunda coluna alinhada:
+        # nenhum vão vale e a página é dividida no meio, como antes da detecção
+        amounts = ["R$ 9,90", "R$ 1.234,56", "R$ 45,00", "R$ 310,20"] * 2
+        words = []
+        for i, amount in enumerate(amounts):
+            words += _words(50.0 + 12 * i, 30.0, f"{i + 1:02d} Fev LOJA {i}")
+            words += _words(50.0 + 12 * i, 400.0 - 4.0 * len(amount), amount)
+        lines = _cluster_words_into_lines(words, 0.0, 595.0)
+        self.assertEqual([ln.text for ln in lines[:2]], ["01 Fev LOJA 0", "R$ 9,90"])
+        self.assertEqual(len(lines), 16)
+
+    def test_page_ranges_cover_all_pages_in_order(self):
+        ranges = _page_ranges(10, 4)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], 10)
+        self.assertTrue(all(a[1] == b[0] for a, b in zip(ranges, ranges[1:])))
+        self.assertEqual(_page_ranges(0, 4), [])
+
+    def test_card_batches_close_on_section_change(self):
+        pages = [
+            _page("Lançamentos do cartão Final 1748", "01 Fev PADARIA R$ 10,00", "02 Fev UBER R$ 20,00"),
+            _page("Lançamentos do cartão Final 5970", "03 Fev IFOOD R$ 30,00"),
+            _page("Lançamentos do cartão Final 1748", "04 Fev POSTO R$ 40,00"),
+        ]
+        batches = [(card, [r.description_raw for r in recs])
+                   for card, recs in iter_card_batches(_records_from_pages(iter(pages), 2026))]
+        # 1748 reaparece: o lote é reemitido junto com o anterior
+        self.assertEqual(batches, [
+            ("1748", ["PADARIA", "UBER"]),
+            ("5970", ["IFOOD"]),
+            ("1748", ["PADARIA", "UBER", "POSTO"]),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import argparse
+import unittest
+from contextlib import redirect_stderr
+from decimal import Decimal
+from io import StringIO
+
+from concilia_pdfs import batch
+from concilia_pdfs.cli_types import tolerance_brl, tolerance_rel
+
+
+class TestCliTypes(unittest.TestCase):
+
+    def test_tolerance_accepts_cents_and_zero(self):
+        self.assertEqual(tolerance_brl("0.05"), Decimal("0.05"))
+        self.assertEqual(tolerance_brl("0"), Decimal("0"))
+
+    def test_tolerance_rejects_invalid_values(self):
+        for value in ("abc", "-0.05", "nan", "inf", "0.004"):
+            with self.subTest(value=value), self.assertRaises(argparse.ArgumentTypeError):
+                tolerance_brl(value)
+
+    def test_tolerance_rel_range(self):
+        self.assertEqual(tolerance_rel("0.005"), 0.005)
+        self.assertEqual(tolerance_rel("0"), 0.0)
+        for value in ("x", "-0.1", "1", "1.5", "nan"):
+            with self.subTest(value=value), self.assertRaises(argparse.ArgumentTypeError):
+                tolerance_rel(value)
+
+    def test_batch_cli_rejects_negative_tolerance(self):
+        with redirect_stderr(StringIO()) as err, self.assertRaises(SystemExit) as exit_:
+            batch.main(["--root", ".", "--out", "saida", "--tolerance", "-1"])
+        self.assertEqual(exit_.exception.code, 2)
+        self.assertIn("--tolerance", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
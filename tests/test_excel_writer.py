@@ -0,0 +1,73 @@
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import openpyxl
+
+from concilia_pdfs.core.matching import CardMatch
+from concilia_pdfs.core.records import make_record
+from concilia_pdfs.reporting.excel_writer import DIFF_COLUMNS, generate_excel_report, write_card_report
+
+
+def _rec(source, day, desc, amount):
+    return make_record("1748", source, date(2026, 2, day), desc, desc.lower(), Decimal(amount))
+
+
+class TestExcelWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = Path(self.tmp.name)
+        self.result = CardMatch(
+            card_final="1748",
+            missing_in_organize=[_rec("BTG", 12, "POSTO", "90.00"), _rec("BTG", 10, "UBER", "25.00")],
+            extra_in_organize=[_rec("ORGANIZE", 9, "Uber", "-25.00"), _rec("ORGANIZE", 11, "Cinema", "-30.00")],
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rows_sorted_by_amount_action_date(self):
+        path = write_card_report("1748", self.result, self.out)
+        wb = openpyxl.load_workbook(path)
+        self.assertEqual(wb.sheetnames, ["diferencas", "resumo"])
+
+        rows = list(wb["diferencas"].iter_rows(values_only=True))
+        self.assertEqual(list(rows[0]), DIFF_COLUMNS)
+        self.assertEqual(
+            [(r[0], r[3], r[4]) for r in rows[1:]],
+            [("EXCLUIR", "Uber", -25.0), ("INCLUIR", "UBER", 25.0),
+             ("EXCLUIR", "Cinema", -30.0), ("INCLUIR", "POSTO", 90.0)],
+        )
+        self.assertEqual(rows[1][2].date(), date(2026, 2, 9))
+
+        # cabeçalho sem negrito/borda/alinhamento, como o xlsx que o pandas gravava
+        header = wb["diferencas"]["A1"]
+        self.assertFalse(header.font.b)
+        self.assertIsNone(header.border.left.style)
+        self.assertIsNone(header.alignment.horizontal)
+
+        resumo = list(wb["resumo"].iter_rows(values_only=True))
+        self.assertEqual(resumo, [("campo", "valor"), ("cartao", "1748"), ("qtd_incluir", 2), ("qtd_excluir", 2)])
+
+    def test_no_differences_no_file(self):
+        self.assertIsNone(write_card_report("1748", CardMatch(card_final="1748"), self.out))
+        self.assertEqual(list(self.out.iterdir()), [])
+
+    def test_parallel_write_same_content(self):
+        other = CardMatch(card_final="5970", missing_in_organize=[_rec("BTG", 10, "IFOOD", "40.00")])
+        results = {"1748": self.result, "5970": other}
+        serial, parallel = self.out / "serial", self.out / "parallel"
+        generate_excel_report(results, [], [], str(serial))
+        generate_excel_report(results, [], [], str(parallel), jobs=2)
+
+        for name in ("1748_diferencas.xlsx", "5970_diferencas.xlsx"):
+            a = openpyxl.load_workbook(serial / name)["diferencas"]
+            b = openpyxl.load_workbook(parallel / name)["diferencas"]
+            self.assertEqual(list(a.iter_rows(values_only=True)), list(b.iter_rows(values_only=True)))
+
+
+if __name__ == "__main__":
+    unittest.main()
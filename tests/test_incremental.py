@@ -0,0 +1,111 @@
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from concilia_pdfs.core.incremental import IncrementalState
+from concilia_pdfs.core.matching import MatchOptions, reconcile_records
+from concilia_pdfs.core.records import make_record
+
+D = date(2026, 2, 10)
+
+
+def _btg(desc, amount):
+    return make_record("1748", "BTG", D, desc, desc.lower(), Decimal(amount))
+
+
+def _org(desc, amount):
+    return make_record("1748", "ORGANIZE", D, desc, desc.lower(), Decimal(amount))
+
+
+def _descs(result):
+    return (
+        [r.description_raw for r in result.missing_in_organize],
+        [r.description_raw for r in result.extra_in_organize],
+    )
+
+
+class TestIncremental(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state = IncrementalState(self.tmp.name, cycle="btg_2026_02")
+        self.options = MatchOptions()
+        self.btg = [_btg("UBER", "25.00"), _btg("IFOOD", "40.00"), _btg("POSTO", "90.00")]
+        self.org = [_org("Uber", "-25.00"), _org("Posto", "-90.00"), _org("Cinema", "-30.00")]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_first_run_matches_full_reconciliation(self):
+        result = self.state.reconcile_card("1748", self.btg, self.org, self.options)
+        full = reconcile_records(self.btg, self.org)["1748"]
+        self.assertEqual(_descs(result), _descs(full))
+
+    def test_unchanged_organize_skips_matching(self):
+        first = self.state.reconcile_card("1748", self.btg, self.org, self.options)
+        with mock.patch("concilia_pdfs.core.incremental.reconcile_records") as rec:
+            again = self.state.reconcile_card("1748", self.btg, list(self.org), self.options)
+        rec.assert_not_called()
+        self.assertEqual(_descs(again), _descs(first))
+
+    def test_only_delta_is_reconciled(self):
+        self.state.reconcile_card("1748", self.btg, self.org, self.options)
+
+        # sai o "Uber" (o UBER do BTG perde o par), entra "Ifood" (casa com o IFOOD pendente)
+        new_org = [_org("Posto", "-90.00"), _org("Cinema", "-30.00"), _org("Ifood", "-40.00")]
+        with mock.patch(
+            "concilia_pdfs.core.incremental.reconcile_records", wraps=reconcile_records
+        ) as rec:
+            result = self.state.reconcile_card("1748", self.btg, new_org, self.options)
+
+        pending_btg, pending_org = rec.call_args.args
+        self.assertEqual([r.description_raw for r in pending_btg], ["UBER", "IFOOD"])
+        self.assertEqual([r.description_raw for r in pending_org], ["Cinema", "Ifood"])
+        self.assertEqual(_descs(result), (["UBER"], ["Cinema"]))
+        self.assertEqual(_descs(result), _descs(reconcile_records(self.btg, new_org)["1748"]))
+
+    def test_tolerance_pair_is_redone_when_organize_gains_an_item(self):
+        options = MatchOptions(tolerance_cents=600)
+        btg = [_btg("MERCADO", "10.00")]
+        org = [_org("Mercado a", "-15.00")]
+        first = self.state.reconcile_card("1748", btg, org, options)
+        self.assertEqual([(b.cents, o.cents) for b, o in first.tolerance_matches], [(1000, -1500)])
+
+        # entra o lançamento de valor exato: o par pela tolerância é desfeito, como no recálculo completo
+        new_org = org + [_org("Mercado b", "-10.00")]
+        result = self.state.reconcile_card("1748", btg, new_org, options)
+        full = reconcile_records(btg, new_org, **options.as_kwargs())["1748"]
+
+        self.assertEqual(_descs(result), ([], ["Mercado a"]))
+        self.assertEqual(result.tolerance_matches, [])
+        self.assertEqual(_descs(result), _descs(full))
+        self.assertEqual(
+            [(b.description_raw, o.description_raw) for b, o in result.matched_pairs],
+            [("MERCADO", "Mercado b")],
+        )
+
+    def test_delta_result_lists_kept_and_new_exact_pairs(self):
+        self.state.reconcile_card("1748", self.btg, self.org, self.options)
+        new_org = self.org + [_org("Ifood", "-40.00")]
+        result = self.state.reconcile_card("1748", self.btg, new_org, self.options)
+        full = reconcile_records(self.btg, new_org)["1748"]
+        self.assertEqual(
+            [(id(b), id(o)) for b, o in result.matched_pairs],
+            [(id(b), id(o)) for b, o in full.matched_pairs],
+        )
+
+    def test_btg_change_forces_full_recompute(self):
+        self.state.reconcile_card("1748", self.btg, self.org, self.options)
+        with self.assertLogs("concilia_pdfs.core.incremental", level="INFO") as logs:
+            self.state.reconcile_card("1748", self.btg[:2], self.org, self.options)
+        self.assertIn("recálculo completo (BTG mudou)", "\n".join(logs.output))
+
+        with self.assertLogs("concilia_pdfs.core.incremental", level="INFO") as logs:
+            self.state.reconcile_card("1748", self.btg[:2], self.org, MatchOptions(tolerance_cents=5))
+        self.assertIn("recálculo completo (configuração mudou)", "\n".join(logs.output))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import random
+import unittest
+from unittest import mock
+from datetime import date
+from decimal import Decimal
+
+from concilia_pdfs.core.matching import amount_equal, best_candidate, match_greedy, reconcile_records
+from concilia_pdfs.core.records import make_record
+
+DESCS = ["uber trip", "uber", "ifood", "padaria sao joao", "padaria", "", "netflix", "pedagio"]
+
+
+def _random_side(rng, source, n, amounts, cards):
+    return [
+        make_record(
+            rng.choice(cards),
+            source,
+            date(2026, 2, rng.randint(1, 28)),
+            "desc",
+            rng.choice(DESCS),
+            Decimal(rng.choice(amounts) * rng.choice([1, 1, -1])) / 100,
+        )
+        for _ in range(n)
+    ]
+
+
+def _ids(results):
+    return {
+        card: ([id(r) for r in m.missing_in_organize], [id(r) for r in m.extra_in_organize])
+        for card, m in results.items()
+    }
+
+
+class TestMatching(unittest.TestCase):
+
+    def test_tie_break_closest_date_then_similarity(self):
+        d = date(2026, 2, 10)
+        b = make_record("1748", "BTG", d, "UBER", "uber trip", Decimal("25.00"))
+        far = make_record("1748", "ORGANIZE", date(2026, 2, 14), "Uber", "uber trip", Decimal("-25.00"))
+        near_other = make_record("1748", "ORGANIZE", date(2026, 2, 11), "Padaria", "padaria", Decimal("-25.00"))
+        near_same = make_record("1748", "ORGANIZE", date(2026, 2, 9), "Uber", "uber", Decimal("-25.00"))
+        for engine in ("python", "numpy"):
+            result = reconcile_records([b], [far, near_other, near_same], engine=engine)["1748"]
+            self.assertEqual(result.missing_in_organize, [])
+            self.assertEqual([r.description_raw for r in result.extra_in_organize], ["Uber", "Padaria"])
+            self.assertIs(result.extra_in_organize[0], far)
+
+    def test_engines_agree_on_random_inputs(self):
+        for seed in range(150):
+            rng = random.Random(seed)
+            amounts = [rng.randint(0, 5000) for _ in range(rng.randint(1, 20))]
+            cards = ("1748", "5970")
+            btg = _random_side(rng, "BTG", rng.randint(0, 40), amounts, cards)
+            org = _random_side(rng, "ORGANIZE", rng.randint(0, 40), amounts, cards)
+            self.assertEqual(
+                _ids(reconcile_records(btg, org, engine="python")),
+                _ids(reconcile_records(btg, org, engine="numpy")),
+                msg=f"seed={seed}",
+            )
+
+    def test_pools_match_full_scan(self):
+        # referência: varredura completa dos candidatos a cada transação (algoritmo original)
+        def full_scan(btg, org):
+            used, matches = set(), []
+            for b in btg:
+                for wanted in (b.cents, -b.cents):
+                    cands = [(i, o) for i, o in enumerate(org) if i not in used and o.cents == wanted]
+                    if cands:
+                        break
+                if not cands:
+                    matches.append(-1)
+                    continue
+                best = best_candidate(b, [o for _, o in cands])
+                chosen = next(i for i, o in cands if o is best)
+                used.add(chosen)
+                matches.append(chosen)
+            return matches
+
+        for seed in range(150):
+            rng = random.Random(seed)
+            amounts = [rng.randint(1, 30) for _ in range(rng.randint(1, 4))]
+            btg = _random_side(rng, "BTG", rng.randint(0, 60), amounts, ("1748",))
+            org = _random_side(rng, "ORGANIZE", rng.randint(0, 60), amounts, ("1748",))
+            self.assertEqual(match_greedy(btg, org), full_scan(btg, org), msg=f"seed={seed}")
+
+    def test_batched_scores_match_scalar(self):
+        # mesmo valor, poucas datas: quase todo desempate passa pela matriz do cdist
+        for seed in range(40):
+            rng = random.Random(seed)
+            btg = _random_side(rng, "BTG", 50, [890], ("1748",))
+            org = _random_side(rng, "ORGANIZE", 50, [890], ("1748",))
+            with mock.patch("concilia_pdfs.core.matching.BATCH_MIN_CANDIDATES", 10**9):
+                scalar = match_greedy(btg, org)
+            with mock.patch("concilia_pdfs.core.matching.BATCH_MIN_CANDIDATES", 2):
+                self.assertEqual(match_greedy(btg, org, workers=2), scalar, msg=f"seed={seed}")
+
+    def test_amount_equal(self):
+        self.assertTrue(amount_equal(1000, -1000))
+        self.assertFalse(amount_equal(1000, 1003))
+        self.assertTrue(amount_equal(1000, 1003, tolerance_cents=3))
+        self.assertTrue(amount_equal(10000, 9950, tolerance_rel=0.005))
+        self.assertFalse(amount_equal(10000, 9949, tolerance_rel=0.005))
+        self.assertTrue(amount_equal(100, 129, tolerance_rel=0.29))
+
+    def test_tolerance_second_pass(self):
+        d = date(2026, 2, 10)
+        b_exact = make_record("1748", "BTG", d, "NETFLIX", "netflix", Decimal("55.90"))
+        b_intl = make_record("1748", "BTG", d, "AMAZON", "amazon", Decimal("100.03"))
+        o_exact = make_record("1748", "ORGANIZE", d, "Netflix", "netflix", Decimal("-55.90"))
+        o_near = make_record("1748", "ORGANIZE", d, "Amazon", "amazon", Decimal("-100.00"))
+        o_far = make_record("1748", "ORGANIZE", d, "Outro", "outro", Decimal("-100.10"))
+
+        for engine in ("python", "numpy"):
+            off = reconcile_records([b_exact, b_intl], [o_exact, o_near, o_far], engine=engine)["1748"]
+            self.assertEqual(off.missing_in_organize, [b_intl])
+            self.assertEqual(off.tolerance_matches, [])
+
+            on = reconcile_records(
+                [b_exact, b_intl], [o_exact, o_near, o_far], engine=engine, tolerance_cents=5
+            )["1748"]
+            self.assertEqual(on.missing_in_organize, [])
+            self.assertEqual(on.extra_in_organize, [o_far])
+            self.assertEqual(len(on.tolerance_matches), 1)
+            self.assertIs(on.tolerance_matches[0][0], b_intl)
+            self.assertIs(on.tolerance_matches[0][1], o_near)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            reconcile_records([], [], engine="gpu")
+
+
+if __name__ == '__main__':
+    unittest.main()
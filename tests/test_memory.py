@@ -0,0 +1,48 @@
+import unittest
+from types import SimpleNamespace
+
+from concilia_pdfs.utils.memory import MEMORY, iter_pages, rss_bytes
+
+
+class _Page:
+    def __init__(self, n):
+        self.page_number = n
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestMemory(unittest.TestCase):
+
+    def setUp(self):
+        self.pdf = SimpleNamespace(
+            pages=[_Page(n) for n in range(1, 5)],
+            doc=SimpleNamespace(_cached_objs={1: "obj"}, _parsed_objs={2: "stream"}),
+        )
+
+    def tearDown(self):
+        MEMORY.configure(None)
+
+    def test_each_page_is_closed_before_the_next_one(self):
+        seen = []
+        for page in iter_pages(self.pdf, 1, 3):
+            # as anteriores já foram liberadas; esta ainda não
+            seen.append([p.closed for p in self.pdf.pages])
+        self.assertEqual(seen, [[False, False, False, False], [False, True, False, False]])
+        self.assertEqual([p.closed for p in self.pdf.pages], [False, True, True, False])
+        # sem teto o cache do documento fica como está
+        self.assertEqual(self.pdf.doc._cached_objs, {1: "obj"})
+
+    def test_ceiling_switches_to_low_memory_mode(self):
+        if rss_bytes() is None:
+            self.skipTest("sem /proc/self/statm")
+        MEMORY.configure(1)  # 1 MB: qualquer processo python passa do teto
+        with self.assertLogs("concilia_pdfs.utils.memory", "WARNING"):
+            list(iter_pages(self.pdf))
+        self.assertTrue(MEMORY.low_memory)
+        self.assertEqual((self.pdf.doc._cached_objs, self.pdf.doc._parsed_objs), ({}, {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from concilia_pdfs.bench.synthetic import generate_dataset, write_dataset
+from concilia_pdfs.core.pipeline import run_pipeline
+from concilia_pdfs.utils.metrics import METRICS, Metrics, call_in_worker
+
+
+class TestMetrics(unittest.TestCase):
+
+    def tearDown(self):
+        METRICS.reset(enabled=False)
+
+    def test_disabled_records_nothing(self):
+        m = Metrics()
+        with m.stage("btg.extract", key=1):
+            pass
+        m.count("btg.pages")
+        self.assertEqual(m.snapshot(), {"stages": {}, "counters": {}})
+
+    def test_stage_by_key_and_merge(self):
+        m = Metrics()
+        m.reset(enabled=True)
+        m.record("write", 0.5, key="1748")
+        m.record("write", 0.25, key="1748")
+        m.count("btg.pages", 2)
+
+        other = Metrics()
+        other.reset(enabled=True)
+        other.record("write", 1.0, key="5970")
+        other.count("btg.pages")
+        m.merge(other.snapshot())
+
+        snap = m.snapshot()
+        self.assertEqual(snap["counters"], {"btg.pages": 3})
+        self.assertEqual(snap["stages"]["write"]["calls"], 3)
+        self.assertEqual(snap["stages"]["write"]["max_s"], 1.0)
+        self.assertEqual(snap["stages"]["write"]["by_key"], {"1748": 0.75, "5970": 1.0})
+
+    def test_call_in_worker_returns_snapshot(self):
+        def job(n):
+            METRICS.count("organize.pages", n)
+            return n * 2
+
+        self.assertEqual(call_in_worker(False, job, 3), (6, None))
+        result, snap = call_in_worker(True, job, 3)
+        self.assertEqual(result, 6)
+        self.assertEqual(snap["counters"], {"organize.pages": 3})
+
+    def test_pipeline_stages_and_counters(self):
+        ds = generate_dataset(n_cards=2, tx_per_card=20, seed=3)
+        with tempfile.TemporaryDirectory() as tmp:
+            btg_path, org_dir = write_dataset(ds, Path(tmp) / "dados")
+            METRICS.reset(enabled=True)
+            run_pipeline(btg_path, org_dir, str(Path(tmp) / "saida"))
+            out = METRICS.write(Path(tmp) / "metricas.json", total_s=1.0)
+            data = json.loads(out.read_text(encoding="utf-8"))
+
+        for stage in ("open", "btg.extract", "btg.cluster", "organize.extract", "match", "reconcile", "write"):
+            self.assertIn(stage, data["stages"])
+        self.assertEqual(sorted(data["stages"]["reconcile"]["by_key"]), sorted(ds.btg))
+        self.assertEqual(data["counters"]["match.btg"], 40)
+        self.assertEqual(
+            data["counters"]["btg.regex.debit"] + data["counters"]["btg.regex.credit"]
+            + data["counters"]["btg.regex.international"],
+            40,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
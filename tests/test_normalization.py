@@ -1,7 +1,91 @@
+import random
+import re
 import unittest
-from decimal import Decimal
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
 
-from concilia_pdfs.utils.normalization import normalize_text, parse_brl_value
+import unidecode
+
+from concilia_pdfs.bench.synthetic import MERCHANTS
+from concilia_pdfs.core.records import to_cents
+from concilia_pdfs.utils.normalization import (
+    MONTH_MAP,
+    normalize_many,
+    normalize_text,
+    parse_brl_cents,
+    parse_brl_value,
+    parse_date,
+    parse_date_d_mon,
+)
+
+
+def _reference_normalize(text):
+    """Implementação original (unidecode + lower + re.sub), usada como referência."""
+    if not isinstance(text, str):
+        return ""
+    text = unidecode.unidecode(text)
+    text = text.lower()
+    text = re.sub(r'[^a-z0-9\s]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+
+def _reference_brl(value_str):
+    """parse_brl_value original (Decimal da string limpa)."""
+    cleaned = value_str.replace("R$", "").strip()
+    if re.search(r',\d{2}$', cleaned):
+        cleaned = cleaned.replace('.', '').replace(',', '.')
+    else:
+        cleaned = cleaned.replace(',', '')
+    try:
+        return Decimal(cleaned) if cleaned else None
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _reference_date(date_str, year=None):
+    """parse_date original (dois strptime e depois 'DD Mon')."""
+    cleaned = date_str.strip()
+    for fmt in ('%d/%m/%Y', '%d/%m/%y'):
+        try:
+            return datetime.strptime(cleaned, fmt).date()
+        except ValueError:
+            pass
+    try:
+        day_str, month_abbr = cleaned.split()
+        month = MONTH_MAP.get(month_abbr.lower().strip('.'))
+        if month:
+            return date(year if year else date.today().year, month, int(day_str))
+    except ValueError:
+        pass
+    return None
+
+
+def _date_money_corpus(n=30000, seed=0):
+    """Datas e valores nos formatos dos extratos, bordas (29/02, 00, 69/68) e texto aleatório."""
+    rng = random.Random(seed)
+    corpus = []
+    for d in range(0, 33):
+        for m in range(0, 14):
+            for y in ("2024", "2023", "1900", "2000", "0000", "69", "68", "00", "202"):
+                corpus += [f"{d}/{m}/{y}", f"{d:02d}/{m:02d}/{y}"]
+        for mon in list(MONTH_MAP) + ["FEV", "Set.", "xyz"]:
+            corpus += [f"{d} {mon}", f"{d:02d} {mon}", f" +{d}  {mon}. "]
+    corpus += ["1.234,56", "R$ -2.000,00", "-0,00", "+0,00", "1,000", "1_000,00", "1e3", "NaN", "1.2.3,45", "٣,٠٠"]
+    alphabet = "0123456789/ .,-+_R$FevMARdez\xa0٣"
+    corpus += ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))) for _ in range(n)]
+    return corpus
+
+
+def _corpus(n=20000, seed=0):
+    """Cada caractere até U+2FFF sozinho + textos aleatórios misturando faixas e espaços raros."""
+    rng = random.Random(seed)
+    alphabet = [chr(cp) for cp in range(0x250)]
+    alphabet += list("ÀÁÂÃÇÉÊÍÓÔÕÚÜàáâãçéêíóôõúü½©ß€™“”—\xa0\u3000\x1c\x1f\x85中文Ωж\U0001F600")
+    corpus = [chr(cp) for cp in range(0x3000)]
+    corpus += ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(n)]
+    corpus += [f"  {m} {rng.choice(['Geral', 'ALIMENTAÇÃO', '*SP', '(Internacional)'])}  " for m in MERCHANTS]
+    return corpus
 
 
 class TestNormalization(unittest.TestCase):
@@ -12,6 +96,14 @@ class TestNormalization(unittest.TestCase):
         self.assertEqual(normalize_text("!@#$Remove Caracteres Especiais$#@!"), "remove caracteres especiais")
         self.assertEqual(normalize_text("Pagamento de Conta - TÍTULO"), "pagamento de conta titulo")
         self.assertEqual(normalize_text(123), "")
+        self.assertEqual(normalize_text(["não", "hashable"]), "")
+
+    def test_normalize_text_identical_to_reference_on_corpus(self):
+        corpus = _corpus()
+        mismatches = [t for t in corpus if normalize_text(t) != _reference_normalize(t)]
+        self.assertEqual(mismatches[:5], [])
+        # segunda passada vem do cache e continua igual
+        self.assertEqual(normalize_many(corpus), [_reference_normalize(t) for t in corpus])
 
     def test_parse_brl_value(self):
         self.assertEqual(parse_brl_value("1.234,56"), Decimal("1234.56"))
@@ -23,6 +115,47 @@ class TestNormalization(unittest.TestCase):
         self.assertIsNone(parse_brl_value("invalid value"))
         self.assertIsNone(parse_brl_value("1.2.3,4"))
 
+    def test_parse_brl_value_identical_to_reference_on_corpus(self):
+        for text in _date_money_corpus():
+            expected = _reference_brl(text)
+            got = parse_brl_value(text)
+            if expected is not None and expected.is_nan():
+                self.assertTrue(got.is_nan())
+                continue
+            # mesma representação (expoente e sinal), não só o mesmo valor
+            self.assertEqual(str(got), str(expected), repr(text))
+
+    def test_parse_brl_cents(self):
+        self.assertEqual(parse_brl_cents("1.234,56"), 123456)
+        self.assertEqual(parse_brl_cents("R$ -2.000,00"), -200000)
+        self.assertEqual(parse_brl_cents("1,000"), 100000)
+        self.assertEqual(parse_brl_cents("123.455"), 12346)
+        self.assertIsNone(parse_brl_cents("NaN"))
+        self.assertIsNone(parse_brl_cents(None))
+        for text in _date_money_corpus():
+            value = _reference_brl(text)
+            try:
+                expected = to_cents(value) if value is not None else None
+            except (InvalidOperation, ValueError):  # NaN, infinito ou expoente fora do contexto ('8e5_52')
+                expected = None
+            self.assertEqual(parse_brl_cents(text), expected, repr(text))
+
+    def test_parse_date(self):
+        self.assertEqual(parse_date("25/12/2023"), date(2023, 12, 25))
+        self.assertEqual(parse_date("01/01/24"), date(2024, 1, 1))
+        self.assertEqual(parse_date("01/01/69"), date(1969, 1, 1))
+        self.assertEqual(parse_date_d_mon("20 Fev", 2024), date(2024, 2, 20))
+        self.assertEqual(parse_date("29 Fev.", 2024), date(2024, 2, 29))
+        self.assertEqual(parse_date("5 mar"), date(date.today().year, 3, 5))
+        self.assertIsNone(parse_date("29 Fev", 2023))
+        self.assertIsNone(parse_date("31/02/2024"))
+        self.assertIsNone(parse_date(None))
+
+    def test_parse_date_identical_to_reference_on_corpus(self):
+        for text in _date_money_corpus():
+            for year in (None, 2024, 2023):
+                self.assertEqual(parse_date(text, year), _reference_date(text, year), (text, year))
+
 
 if __name__ == '__main__':
     unittest.main()
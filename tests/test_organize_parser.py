@@ -0,0 +1,61 @@
+import unittest
+
+from concilia_pdfs.parsers.organize_parser import (
+    LAYOUT_TABLE,
+    LAYOUT_TEXT,
+    _PageTextCache,
+    _detect_card_from_pages,
+    _probe_layout,
+)
+
+
+class _FakePage:
+    def __init__(self, text="", tables=None):
+        self._text = text
+        self._tables = tables or []
+        self.text_calls = 0
+        self.table_calls = 0
+
+    def extract_text(self):
+        self.text_calls += 1
+        return self._text
+
+    def extract_tables(self):
+        self.table_calls += 1
+        return self._tables
+
+
+class TestOrganizeParser(unittest.TestCase):
+
+    def test_card_from_filename_skips_text_extraction(self):
+        pages = [_FakePage("Cartão Final 9999")]
+        card, _ = _detect_card_from_pages("final_1748.pdf", _PageTextCache(pages), len(pages))
+        self.assertEqual(card, "1748")
+        self.assertEqual(pages[0].text_calls, 0)
+
+    def test_card_from_text_extracts_each_page_once(self):
+        pages = [_FakePage("capa"), _FakePage("Cartão Final 5970")]
+        texts = _PageTextCache(pages)
+        card, _ = _detect_card_from_pages("extrato.pdf", texts, len(pages))
+        self.assertEqual(card, "5970")
+        texts.get(1)
+        self.assertEqual([p.text_calls for p in pages], [1, 1])
+
+    def test_probe_table_layout(self):
+        table = [["Data", "Descrição", "Valor"], ["04/02/2026", "Mercado", "R$ -19,99"]]
+        pages = [_FakePage(tables=[table])]
+        layout, idx, txs = _probe_layout("1748", pages, _PageTextCache(pages))
+        self.assertEqual((layout, idx, len(txs)), (LAYOUT_TABLE, 0, 1))
+        self.assertEqual(pages[0].text_calls, 0)
+
+    def test_probe_text_layout_reuses_text(self):
+        pages = [_FakePage("04/02/2026 Omercadeiroiii Mercado R$ -19,99")]
+        texts = _PageTextCache(pages)
+        layout, idx, txs = _probe_layout("1748", pages, texts)
+        self.assertEqual((layout, idx, len(txs)), (LAYOUT_TEXT, 0, 1))
+        texts.get(0)
+        self.assertEqual(pages[0].text_calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from concilia_pdfs.core.records import make_record
+from concilia_pdfs.utils.parse_cache import CACHE_SUFFIX, ParseCache
+
+
+def _tx(desc, amount, **extra):
+    return make_record(
+        card_final="1748",
+        source="BTG",
+        tx_date=date(2026, 2, 15),
+        description_raw=desc,
+        description_norm=desc.lower(),
+        amount=Decimal(amount),
+        raw_lines=(f"15 Fev {desc} R$ {amount}",),
+        **extra,
+    )
+
+
+class TestParseCache(unittest.TestCase):
+
+    def test_roundtrip_and_key(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf = Path(tmp) / "final_1748.pdf"
+            pdf.write_bytes(b"%PDF-1.4 conteudo")
+            cache = ParseCache(Path(tmp) / "cache")
+
+            key, txs = cache.lookup("organize", str(pdf))
+            self.assertIsNone(txs)
+
+            original = [
+                _tx("Padaria São João", "10.50"),
+                _tx("UBER (Internacional)", "169.65", foreign_currency="PEN", foreign_amount=Decimal("99.50")),
+            ]
+            cache.put(key, original)
+            self.assertEqual(cache.get(key), original)
+
+            # outro conteúdo, outro tipo de parser ou outro backend de extração -> outra chave
+            self.assertNotEqual(cache.key("btg", str(pdf)), key)
+            self.assertNotEqual(cache.key("organize", str(pdf), "pdfminer"), key)
+            pdf.write_bytes(b"%PDF-1.4 outro conteudo")
+            self.assertNotEqual(cache.key("organize", str(pdf)), key)
+
+    def test_writer_builds_the_same_entry_as_put(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ParseCache(Path(tmp))
+            txs = [_tx(f"Loja {i}", f"{i}.10") for i in range(5)]
+            writer = cache.writer("w")
+            writer.FLUSH_EVERY = 2  # força vários blocos compactados
+            for rec in txs:
+                writer.add(rec)
+            self.assertIsNone(cache.get("w"))  # só existe depois do commit
+            writer.commit()
+            self.assertEqual(cache.get("w"), txs)
+
+            empty = cache.writer("vazio")
+            empty.commit()
+            self.assertEqual(cache.get("vazio"), [])
+
+            dropped = cache.writer("descartado")
+            dropped.add(txs[0])
+            dropped.discard()
+            self.assertIsNone(cache.get("descartado"))
+            self.assertEqual(list(Path(tmp).glob("*.tmp")), [])
+
+    def test_eviction_removes_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ParseCache(Path(tmp), max_bytes=10**9)
+            txs = [_tx(f"Loja {i}", "1.00") for i in range(50)]
+            for i, key in enumerate(("a", "b", "c")):
+                cache.put(key, txs)
+                os.utime(Path(tmp) / f"{key}{CACHE_SUFFIX}", (1000 + i, 1000 + i))
+
+            cache.get("a")  # "a" passa a ser o mais recente
+            entry_size = (Path(tmp) / f"a{CACHE_SUFFIX}").stat().st_size
+            cache.max_bytes = entry_size * 2
+            cache._evict()
+
+            remaining = sorted(p.stem for p in Path(tmp).glob(f"*{CACHE_SUFFIX}"))
+            self.assertEqual(remaining, ["a", "c"])
+
+
+if __name__ == '__main__':
+    unittest.main()
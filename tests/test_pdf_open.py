@@ -0,0 +1,121 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from concilia_pdfs.bench.pdfgen import PdfCanvas
+from concilia_pdfs.core.pipeline import run_pipeline
+from concilia_pdfs.utils import pdf_open
+from concilia_pdfs.utils.metrics import METRICS
+from concilia_pdfs.utils.pdf_open import open_pdf
+
+
+class _FakeDocument:
+    def __init__(self, data):
+        self.data = data
+        self.pages = []
+
+    def close(self):
+        pass
+
+
+class TestOpenPdf(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        pdf_open._KNOWN_PASSWORDS.clear()
+        METRICS.reset(enabled=True)
+
+    def tearDown(self):
+        METRICS.reset(enabled=False)
+        pdf_open._KNOWN_PASSWORDS.clear()
+        self.tmp.cleanup()
+
+    def _attempts(self):
+        counters = METRICS.snapshot()["counters"]
+        return counters.get("open.attempts", 0), counters.get("open.failed_attempts", 0)
+
+    def _fake_encrypted(self, name):
+        path = self.dir / name
+        path.write_bytes(b"%PDF-1.4\ntrailer << /Encrypt 5 0 R >>\n%%EOF")
+        return str(path)
+
+    def test_unencrypted_opens_with_a_single_attempt(self):
+        canvas = PdfCanvas()
+        canvas.text(50, 50, "Lançamentos do cartão Final 1748")
+        path = self.dir / "simples.pdf"
+        path.write_bytes(canvas.to_bytes())
+
+        for backend in ("pdfplumber", "pdfminer"):
+            with self.subTest(backend=backend), open_pdf(str(path), password="ignorada", backend=backend) as pdf:
+                self.assertEqual(len(pdf.pages), 1)
+        self.assertEqual(self._attempts(), (2, 0))
+        # sem criptografia nada é lembrado
+        self.assertEqual(pdf_open._KNOWN_PASSWORDS, {})
+
+    def test_password_that_worked_is_tried_first_for_the_same_source(self):
+        tried = []
+
+        def opener(data, pwd):
+            tried.append(pwd)
+            if pwd != "segredo":
+                raise ValueError("senha incorreta")
+            return _FakeDocument(data)
+
+        with mock.patch.dict(pdf_open.OPENERS, {"pdfplumber": opener}):
+            open_pdf(self._fake_encrypted("btg.pdf"), password="segredo", source="BTG")
+            self.assertEqual(tried, ["segredo"])
+
+            # mesma origem, sem senha informada: a lembrada vai primeiro
+            tried.clear()
+            open_pdf(self._fake_encrypted("btg_2.pdf"), source="BTG")
+            self.assertEqual(tried, ["segredo"])
+
+            # outra origem não herda a senha
+            tried.clear()
+            with self.assertRaises(ValueError):
+                open_pdf(self._fake_encrypted("final_1748.pdf"), source="ORGANIZE")
+            self.assertEqual(tried, [""])
+
+        self.assertEqual(self._attempts(), (3, 1))
+
+    def test_bytes_already_read_are_not_read_again(self):
+        canvas = PdfCanvas()
+        canvas.text(50, 50, "Lançamentos do cartão Final 1748")
+        # o caminho não existe: só os bytes informados são usados
+        with open_pdf(str(self.dir / "nao_existe.pdf"), data=canvas.to_bytes(), backend="pdfminer") as pdf:
+            self.assertEqual(len(pdf.pages), 1)
+
+    def test_jobs_do_not_share_remembered_passwords(self):
+        tried = []
+
+        def opener(data, pwd):
+            tried.append(pwd)
+            if pwd not in ("familia_a", "familia_b"):
+                raise ValueError("senha incorreta")
+            return _FakeDocument(data)
+
+        def fake_btg(pdf_path, pdf_password=None, workers=1, backend="pdfplumber", data=None):
+            open_pdf(pdf_path, password=pdf_password, source="BTG").close()
+            return iter(())
+
+        def job(name, password):
+            btg = self._fake_encrypted(f"{name}.pdf")
+            org_dir = self.dir / name
+            org_dir.mkdir()
+            run_pipeline(Path(btg), org_dir, str(self.dir / "out" / name), pdf_password=password)
+
+        with mock.patch.dict(pdf_open.OPENERS, {"pdfplumber": opener}), \
+                mock.patch("concilia_pdfs.core.pipeline.parse_btg_records", fake_btg):
+            job("a", "familia_a")
+            self.assertEqual(pdf_open._KNOWN_PASSWORDS, {})
+
+            # o job seguinte (mesmo processo, como no pool do lote) não tenta a senha do anterior
+            tried.clear()
+            job("b", "familia_b")
+        self.assertEqual(tried, ["familia_b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from concilia_pdfs.core.pipeline import find_organize_files, run_pipeline
+from concilia_pdfs.core.records import make_record
+from concilia_pdfs.utils.parse_cache import ParseCache
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_find_organize_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Path(tmp)
+            for name in ("final_1748.pdf", "1748.pdf", "final_5970.pdf", "resumo.pdf", "final_12.pdf"):
+                (d / name).write_bytes(b"%PDF-1.4")
+            found = find_organize_files(d)
+            self.assertEqual(sorted(found), ["1748", "5970"])
+            # "1748.pdf" tem prioridade sobre "final_1748.pdf"
+            self.assertEqual(found["1748"].name, "1748.pdf")
+            self.assertEqual(found["5970"].name, "final_5970.pdf")
+
+    def test_report_written_when_card_section_closes(self):
+        d = date(2026, 2, 10)
+        with tempfile.TemporaryDirectory() as tmp:
+            org_dir, out_dir = Path(tmp) / "org", Path(tmp) / "out"
+            org_dir.mkdir()
+            for card in ("1748", "5970"):
+                (org_dir / f"{card}.pdf").write_bytes(b"%PDF-1.4")
+
+            written = []
+
+            def fake_btg(pdf_path, pdf_password=None, workers=1, backend="pdfplumber", data=None):
+                yield make_record("1748", "BTG", d, "UBER", "uber", Decimal("25.00"))
+                yield make_record("1748", "BTG", d, "IFOOD", "ifood", Decimal("40.00"))
+                yield make_record("5970", "BTG", d, "PADARIA", "padaria", Decimal("10.00"))
+                # a seção do 1748 fechou: o relatório dele já existe antes do resto do PDF
+                written.append((out_dir / "1748_diferencas.xlsx").exists())
+                yield make_record("5970", "BTG", d, "POSTO", "posto", Decimal("90.00"))
+
+            def fake_organize(pdf_path, pdf_password=None, backend="pdfplumber", data=None):
+                card = Path(pdf_path).stem
+                yield make_record(card, "ORGANIZE", d, "Uber", "uber", Decimal("-25.00"))
+
+            with mock.patch("concilia_pdfs.core.pipeline.parse_btg_records", fake_btg), \
+                    mock.patch("concilia_pdfs.core.pipeline.parse_organize_records", fake_organize):
+                results = run_pipeline(Path(tmp) / "btg.pdf", org_dir, str(out_dir), jobs=1)
+
+            self.assertEqual(written, [True])
+            self.assertEqual(sorted(results), ["1748", "5970"])
+            self.assertEqual([r.description_raw for r in results["1748"].missing_in_organize], ["IFOOD"])
+            self.assertEqual([r.description_raw for r in results["5970"].extra_in_organize], ["Uber"])
+            self.assertTrue((out_dir / "5970_diferencas.xlsx").exists())
+
+    def test_cache_miss_hands_the_hashed_bytes_to_the_parser(self):
+        d = date(2026, 2, 10)
+        with tempfile.TemporaryDirectory() as tmp:
+            org_dir = Path(tmp) / "org"
+            org_dir.mkdir()
+            (org_dir / "1748.pdf").write_bytes(b"%PDF-1.4 organize")
+            btg_file = Path(tmp) / "btg.pdf"
+            btg_file.write_bytes(b"%PDF-1.4 btg")
+            received = {}
+
+            def fake_btg(pdf_path, pdf_password=None, workers=1, backend="pdfplumber", data=None):
+                received["btg"] = data
+                yield make_record("1748", "BTG", d, "UBER", "uber", Decimal("25.00"))
+
+            def fake_organize(pdf_path, pdf_password=None, backend="pdfplumber", data=None):
+                received["organize"] = data
+                yield make_record("1748", "ORGANIZE", d, "Uber", "uber", Decimal("-25.00"))
+
+            with mock.patch("concilia_pdfs.core.pipeline.parse_btg_records", fake_btg), \
+                    mock.patch("concilia_pdfs.core.pipeline.parse_organize_records", fake_organize):
+                run_pipeline(btg_file, org_dir, str(Path(tmp) / "out"), jobs=1, cache=ParseCache(Path(tmp) / "cache"))
+
+            # os bytes lidos para a chave do cache vão para o parser (o PDF não é lido de novo)
+            self.assertEqual(received, {"btg": b"%PDF-1.4 btg", "organize": b"%PDF-1.4 organize"})
+
+    def test_btg_cache_entry_written_only_for_complete_parse(self):
+        d = date(2026, 2, 10)
+        with tempfile.TemporaryDirectory() as tmp:
+            org_dir = Path(tmp) / "org"
+            org_dir.mkdir()
+            (org_dir / "1748.pdf").write_bytes(b"%PDF-1.4 organize")
+            btg_file = Path(tmp) / "btg.pdf"
+            btg_file.write_bytes(b"%PDF-1.4 btg")
+            cache = ParseCache(Path(tmp) / "cache")
+            btg_txs = [
+                make_record("1748", "BTG", d, "UBER", "uber", Decimal("25.00")),
+                make_record("5970", "BTG", d, "PADARIA", "padaria", Decimal("10.00")),
+            ]
+
+            def broken_btg(pdf_path, pdf_password=None, workers=1, backend="pdfplumber", data=None):
+                yield btg_txs[0]
+                raise ValueError("PDF truncado")
+
+            def fake_btg(pdf_path, pdf_password=None, workers=1, backend="pdfplumber", data=None):
+                yield from btg_txs
+
+            def fake_organize(pdf_path, pdf_password=None, backend="pdfplumber", data=None):
+                yield make_record("1748", "ORGANIZE", d, "Uber", "uber", Decimal("-25.00"))
+
+            key = cache.key("btg", str(btg_file))
+            with mock.patch("concilia_pdfs.core.pipeline.parse_organize_records", fake_organize):
+                with mock.patch("concilia_pdfs.core.pipeline.parse_btg_records", broken_btg), \
+                        self.assertLogs(level="ERROR"):
+                    run_pipeline(btg_file, org_dir, str(Path(tmp) / "out"), jobs=1, cache=cache)
+                # leitura interrompida: nada no cache (nem o temporário)
+                self.assertIsNone(cache.get(key))
+                self.assertEqual(list(cache.cache_dir.glob("*.tmp")), [])
+
+                with mock.patch("concilia_pdfs.core.pipeline.parse_btg_records", fake_btg):
+                    results = run_pipeline(btg_file, org_dir, str(Path(tmp) / "out"), jobs=1, cache=cache)
+            self.assertEqual(cache.get(key), btg_txs)
+            # os pares casados são soltos depois do relatório
+            self.assertEqual(results["1748"].matched_pairs, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
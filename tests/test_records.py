@@ -0,0 +1,47 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from concilia_pdfs.core.matching import reconcile_records
+from concilia_pdfs.core.models import Source, Transaction
+from concilia_pdfs.core.records import TxRecord, make_record, to_cents
+
+
+class TestRecords(unittest.TestCase):
+
+    def test_transaction_roundtrip(self):
+        tx = Transaction(
+            card_final="1748",
+            source=Source.BTG,
+            tx_date=date(2026, 2, 12),
+            description_raw="UBER TRIP (Internacional)",
+            description_norm="uber trip",
+            amount=Decimal("169.65"),
+            foreign_currency="PEN",
+            foreign_amount=Decimal("99.50"),
+            raw_lines=["12 Fev UBER TRIP PEN 99,50", "Conversão para Real - R$ 169,65"],
+        )
+        rec = TxRecord.from_transaction(tx)
+        self.assertEqual(rec.cents, 16965)
+        self.assertEqual(rec.tx_date, date(2026, 2, 12))
+        self.assertEqual(rec.amount, Decimal("169.65"))
+        self.assertEqual(rec.to_transaction(), tx)
+
+    def test_to_cents_rounding(self):
+        self.assertEqual(to_cents(Decimal("-45.67")), -4567)
+        self.assertEqual(to_cents(Decimal("1000")), 100000)
+        self.assertEqual(to_cents(Decimal("0.005")), 0)  # ROUND_HALF_EVEN, como o _q
+
+    def test_reconcile_records_sign_inverted(self):
+        d = date(2026, 2, 10)
+        btg = [make_record("1748", "BTG", d, "Padaria", "padaria", Decimal("10.00")),
+               make_record("1748", "BTG", d, "Mercado", "mercado", Decimal("55.90"))]
+        org = [make_record("1748", "ORGANIZE", d, "Padaria", "padaria", Decimal("-10.00")),
+               make_record("1748", "ORGANIZE", d, "Cinema", "cinema", Decimal("30.00"))]
+        result = reconcile_records(btg, org)["1748"]
+        self.assertEqual([r.description_raw for r in result.missing_in_organize], ["Mercado"])
+        self.assertEqual([r.description_raw for r in result.extra_in_organize], ["Cinema"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import csv
+import importlib.util
+import json
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import openpyxl
+
+from concilia_pdfs.core.matching import CardMatch
+from concilia_pdfs.core.records import make_record
+from concilia_pdfs.reporting.excel_writer import DIFF_COLUMNS, build_card_report
+from concilia_pdfs.reporting.sinks import check_formats, generate_reports, write_card_outputs
+
+
+def _rec(source, day, desc, amount):
+    return make_record("1748", source, date(2026, 2, day), desc, desc.lower(), Decimal(amount))
+
+
+class TestSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = Path(self.tmp.name)
+        self.result = CardMatch(
+            card_final="1748",
+            missing_in_organize=[_rec("BTG", 12, "POSTO", "90.00"), _rec("BTG", 10, "UBER", "25.00")],
+            extra_in_organize=[_rec("ORGANIZE", 11, "Cinema", "-30.00")],
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_csv_and_jsonl_same_rows_as_xlsx(self):
+        report = build_card_report("1748", self.result)
+        paths = write_card_outputs(report, self.out, ("xlsx", "csv", "jsonl"))
+        self.assertEqual([p.name for p in paths],
+                         ["1748_diferencas.xlsx", "1748_diferencas.csv", "1748_diferencas.jsonl"])
+        expected = [[v.isoformat() if isinstance(v, date) else v for v in row] for row in report.rows]
+        ws = openpyxl.load_workbook(paths[0])["diferencas"]
+        self.assertEqual([r[3] for r in ws.iter_rows(min_row=2, values_only=True)], [r[3] for r in expected])
+
+        with (self.out / "1748_diferencas.csv").open(encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], DIFF_COLUMNS)
+        self.assertEqual(rows[1:], [["" if v is None else str(v) for v in row] for row in expected])
+
+        lines = (self.out / "1748_diferencas.jsonl").read_text(encoding="utf-8").splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [dict(zip(DIFF_COLUMNS, row)) for row in expected])
+        self.assertFalse((self.out / "1748_tolerancia.csv").exists())
+
+    def test_tolerance_pairs_get_own_file(self):
+        self.result.tolerance_matches.append((_rec("BTG", 10, "IFOOD", "40.00"), _rec("ORGANIZE", 10, "iFood", "-40.02")))
+        generate_reports({"1748": self.result}, str(self.out), formats=("jsonl",))
+        rows = [json.loads(line) for line in (self.out / "1748_tolerancia.jsonl").read_text().splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["data_btg"], "2026-02-10")
+        self.assertAlmostEqual(rows[0]["diferenca"], -0.02)
+
+    def test_check_formats(self):
+        with self.assertRaises(ValueError):
+            check_formats(("xlsx", "xml"))
+        if importlib.util.find_spec("pyarrow") is None:
+            with self.assertRaises(ValueError):
+                check_formats(("parquet",))
+
+    @unittest.skipIf(importlib.util.find_spec("pyarrow") is None, "pyarrow não instalado")
+    def test_parquet_schema(self):
+        import pyarrow.parquet as pq
+
+        generate_reports({"1748": self.result}, str(self.out), formats=("parquet",))
+        table = pq.read_table(self.out / "1748_diferencas.parquet")
+        self.assertEqual(table.column_names, DIFF_COLUMNS)
+        self.assertEqual(table.column("valor_brl").to_pylist(), [25.0, -30.0, 90.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
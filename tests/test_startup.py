@@ -0,0 +1,43 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Dependências pesadas que só podem ser carregadas pela etapa que as usa
+HEAVY = ("pdfplumber", "pdfminer", "openpyxl", "pydantic", "numpy", "pandas", "rapidfuzz")
+
+
+def _imported_modules(*args: str) -> set:
+    """Módulos carregados (saída de -X importtime) ao rodar o python com `args`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        stdin=subprocess.DEVNULL,
+        timeout=60,
+    )
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return modules
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_help_does_not_import_heavy_dependencies(self):
+        modules = _imported_modules("-m", "concilia_pdfs", "--help")
+        self.assertIn("concilia_pdfs", modules)
+        self.assertEqual([m for m in HEAVY if m in modules], [])
+
+    def test_pipeline_import_is_lazy(self):
+        # execução com cache não abre PDF: pdfplumber/pydantic/numpy/rapidfuzz não devem vir junto com o pipeline
+        modules = _imported_modules("-c", "import concilia_pdfs.core.pipeline, concilia_pdfs.batch")
+        self.assertEqual([m for m in HEAVY if m in modules], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
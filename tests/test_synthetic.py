@@ -0,0 +1,116 @@
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+from concilia_pdfs.bench.pdfgen import PdfCanvas
+from concilia_pdfs.bench.synthetic import generate_dataset, write_dataset
+from concilia_pdfs.core.pipeline import run_pipeline
+from concilia_pdfs.parsers.btg_parser import parse_btg_records
+from concilia_pdfs.parsers.organize_parser import parse_organize_records
+from concilia_pdfs.utils.pdf_backends import BACKENDS, resolve_backend
+
+
+def _available_backends():
+    available = []
+    for backend in BACKENDS:
+        try:
+            available.append(resolve_backend(backend))
+        except ValueError:  # pymupdf não instalado
+            pass
+    return available
+
+
+def _fields(rec):
+    return rec.card_final, rec.tx_date, rec.description_raw, rec.amount, rec.foreign_currency, rec.foreign_amount, rec.raw_lines
+
+
+class TestSyntheticStatements(unittest.TestCase):
+    """Parsers de ponta a ponta em PDFs gerados: a verdade vem do próprio gerador."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.ds = generate_dataset(n_cards=2, tx_per_card=40, seed=7)
+        cls.paths = {
+            layout: write_dataset(cls.ds, Path(cls.tmp.name) / layout, organize_layout=layout)
+            for layout in ("table", "text")
+        }
+        cls.btg_path = cls.paths["table"][0]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_btg_reads_every_generated_transaction(self):
+        expected = [tx for txs in self.ds.btg.values() for tx in txs]
+        self.assertTrue(any(tx.foreign_currency for tx in expected))
+        self.assertTrue(any(tx.amount < 0 for tx in expected))
+
+        for backend in _available_backends():
+            with self.subTest(backend=backend):
+                recs = list(parse_btg_records(str(self.btg_path), backend=backend))
+                self.assertEqual(len(recs), len(expected))
+                for rec, tx in zip(recs, expected):
+                    self.assertEqual(
+                        (rec.card_final, rec.tx_date, rec.amount, rec.foreign_currency, rec.foreign_amount),
+                        (tx.card_final, date(tx.year, tx.month, tx.day), tx.amount, tx.foreign_currency,
+                         tx.foreign_amount),
+                    )
+                    self.assertTrue(rec.description_raw.startswith(tx.description))
+
+    def test_btg_backends_same_result(self):
+        reference = [_fields(r) for r in parse_btg_records(str(self.btg_path))]
+        for backend in _available_backends():
+            with self.subTest(backend=backend):
+                self.assertEqual([_fields(r) for r in parse_btg_records(str(self.btg_path), backend=backend)], reference)
+
+    def test_backends_read_text_inside_form_xobjects(self):
+        # parte do Organize desenhada num Form XObject (LTFigure no pdfminer): todos os backends leem
+        canvas = PdfCanvas()
+        canvas.text(40, 30, "Organize - Cartão Final 1748", size=12)
+        canvas.text(40, 80, "10/02/2026 PADARIA R$ -19,99", size=8)
+        canvas.text(40, 96, "11/02/2026 POSTO IPIRANGA R$ -90,00", size=8, form=True)
+        path = Path(self.tmp.name) / "final_1748.pdf"
+        path.write_bytes(canvas.to_bytes())
+
+        reference = [(r.tx_date, r.description_raw, r.amount) for r in parse_organize_records(str(path))]
+        self.assertEqual(len(reference), 2)
+        for backend in _available_backends():
+            with self.subTest(backend=backend):
+                recs = parse_organize_records(str(path), backend=backend)
+                self.assertEqual([(r.tx_date, r.description_raw, r.amount) for r in recs], reference)
+
+    def test_btg_workers_same_result(self):
+        serial = [_fields(r) for r in parse_btg_records(str(self.btg_path))]
+        parallel = [_fields(r) for r in parse_btg_records(str(self.btg_path), workers=2)]
+        self.assertEqual(serial, parallel)
+
+    def test_organize_table_and_text_layouts(self):
+        for backend in _available_backends():
+            for layout, (_, org_dir) in self.paths.items():
+                for card, txs in self.ds.organize.items():
+                    with self.subTest(backend=backend, layout=layout, card=card):
+                        recs = list(parse_organize_records(str(org_dir / f"final_{card}.pdf"), backend=backend))
+                        self.assertEqual(
+                            [(r.card_final, r.tx_date, r.amount) for r in recs],
+                            # Organize mostra despesa negativa; internamente débito é positivo
+                            [(card, date(t.year, t.month, t.day), t.amount) for t in txs],
+                        )
+                        for rec, tx in zip(recs, txs):
+                            self.assertTrue(rec.description_raw.startswith(tx.description))
+
+    def test_pipeline_finds_generated_differences(self):
+        btg_path, org_dir = self.paths["text"]
+        results = run_pipeline(btg_path, org_dir, str(Path(self.tmp.name) / "saida"))
+        for card, btg in self.ds.btg.items():
+            org = self.ds.organize[card]
+            missing = sorted(t.amount for t in btg if not any(t is o for o in org))
+            extra = sorted(o.amount for o in org if not any(o is t for t in btg))
+            with self.subTest(card=card):
+                self.assertEqual(sorted(r.amount for r in results[card].missing_in_organize), missing)
+                self.assertEqual(sorted(r.amount for r in results[card].extra_in_organize), extra)
+
+
+if __name__ == "__main__":
+    unittest.main()